@@ -3,7 +3,6 @@ import logging
 import whisper
 import google.generativeai as genai
 import deepl
-from moviepy.editor import VideoFileClip
 from dotenv import load_dotenv
 from src.drive_manager import DriveManager
 from src.translation.translator import Translator
@@ -161,6 +160,23 @@ class YouTubeMultiLangProject:
                 logger.error(f"Ses paketi olusturma hatasi: {str(e)}")
                 return None
             
+            # Önizleme modu: yalnızca QA önizlemeleri üretilir, yükleme ve loglama yapılmaz
+            if self.video_editor.preview_mode:
+                logger.info("9. Adim: Onizlemeler olusturuluyor (PREVIEW_MODE, YouTube yuklemesi yapilmayacak)...")
+                try:
+                    previews = self.video_editor.create_previews(
+                        processed_video_path, audio_files, subtitle_files
+                    )
+                except Exception as e:
+                    logger.error(f"Onizleme olusturma hatasi: {str(e)}")
+                    return None
+
+                for lang, video_data in previews.items():
+                    logger.info(f"{lang.upper()} onizleme: {video_data.get('preview_url', video_data['path'])}")
+                # PREVIEW_SERVE_PORT verilmişse URL'ler süreç açık kaldıkça geçerlidir
+                self.video_editor.serve_previews_forever()
+                return previews
+
             # 10. Videoları montajla
             logger.info("9. Adim: Videolar montajlaniyor...")
             try:
@@ -280,22 +296,14 @@ class YouTubeMultiLangProject:
     def _remove_silence_from_video(self, video_path):
         """Videodan ses boşluklarını kaldır"""
         try:
-            logger.info("Video ses bosluklari kesiliyor...")
+            if os.getenv('REMOVE_SILENCE', 'false').lower() != 'true':
+                logger.info("Ses boslugu kesme kapali (REMOVE_SILENCE), orijinal video kullaniliyor")
+                return video_path
             
-            # Video yükle
-            video = VideoFileClip(video_path)
-            
-            # Ses boşluklarını tespit et ve kaldır
-            # Basit implementasyon - geliştirilmesi gerekebilir
-            audio = video.audio
+            logger.info("Video ses bosluklari kesiliyor...")
             
-            # Ses seviyesi düşük olan kısımları tespit et
-            # Bu kısım daha gelişmiş algoritma gerektirebilir
-            processed_video_path = video_path.replace('.mp4', '_processed.mp4')
-            
-            # Şimdilik orijinal videoyu döndür - ses kesme algoritması eklenebilir
-            video.close()
-            return video_path
+            # Kesim smart render ile yapılır: yalnızca kesim noktalarındaki GOP'lar yeniden kodlanır
+            return self.video_editor.remove_silence(video_path)
             
         except Exception as e:
             logger.error(f"Video ses kesme hatasi: {str(e)}")
@@ -507,8 +515,13 @@ class YouTubeMultiLangProject:
         except Exception as e:
             logger.error(f"Google Sheets loglama hatası: {str(e)}")
             raise
+    
+    def close(self):
+        """Arka plan kaynaklarını serbest bırak (TTS sağlayıcı havuzları)"""
+        self.tts_generator.close()
 
 if __name__ == "__main__":
+    project = None
     try:
         logger.info("Uygulama baslatiliyor...")
         project = YouTubeMultiLangProject()
@@ -523,4 +536,7 @@ if __name__ == "__main__":
         logger.info("Uygulama kullanici tarafindan durduruldu")
     except Exception as e:
         logger.error(f"Uygulama hatasi: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        if project is not None:
+            project.close()
\ No newline at end of file
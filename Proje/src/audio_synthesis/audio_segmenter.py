@@ -1,25 +1,42 @@
 import os
-import json
 import logging
 from pydub import AudioSegment
-import srt
-from datetime import timedelta
-from gtts import gTTS
-import tempfile
-import re
+from pydub.silence import detect_silence
+from datetime import datetime
+import hashlib
+from difflib import SequenceMatcher
+import numpy as np
 from elevenlabs.client import ElevenLabs
 from elevenlabs import play
 from dotenv import load_dotenv
+from ..media_probe import get_media_probe
+from .tts_providers import GTTSProvider, create_provider, words_from_alignment, shift_alignment
+from .timing_model import TimingTrack, TIMING_SUFFIX
+from .provider_router import ProviderRouter
+from .loudness import normalize_loudness
+from ..subtitles.subtitle_io import SubtitleTrack
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+
+def sentence_hash(text):
+    """Artımlı karşılaştırma için cümle metninin kararlı hash'i"""
+    return hashlib.sha1(text.strip().encode('utf-8')).hexdigest()[:16]
+
+
 class AudioSegmenter:
     """Cümle bazlı ses segmentasyonu ve mükemmel altyazı senkronizasyonu sınıfı"""
     
-    def __init__(self, output_dir="data/audio"):
+    # Paketlenen cümleler arasına konan ayraç (TTS doğal duraklama yapar)
+    BATCH_SEPARATOR = '. '
+    
+    # Cümle arası sessizlik (ms)
+    SENTENCE_GAP_MS = 300
+    
+    def __init__(self, output_dir="data/audio", provider=None, use_timestamps=None, batch_chars=None):
         self.output_dir = output_dir
         self.segments_data = {}
         os.makedirs(output_dir, exist_ok=True)
@@ -44,42 +61,128 @@ class AudioSegmenter:
             self.elevenlabs_client = None
             logger.info("[TTS] Google TTS (gTTS) kullanılacak")
         
-    def create_segmented_audio_with_timing(self, sentences, language='tr', output_filename_base='audio'):
-        """Cümle bazlı ses dosyaları oluştur ve mükemmel zamanlamayı hesapla"""
+        # TTS sağlayıcıları (test için dışarıdan sahte sağlayıcı verilebilir)
+        if provider is not None:
+            self.provider = provider
+        elif os.getenv('TTS_PROVIDER'):
+            self.provider = create_provider(os.getenv('TTS_PROVIDER'), self.elevenlabs_client, self.elevenlabs_voice_id)
+        elif self.elevenlabs_client:
+            self.provider = create_provider('elevenlabs', self.elevenlabs_client, self.elevenlabs_voice_id)
+        else:
+            self.provider = GTTSProvider()
+        self.fallback_provider = GTTSProvider()
+        
+        # ElevenLabs -> gTTS yedeği: süre sınırı, hedged istek ve devre kesici
+        providers = [self.provider]
+        if self.provider.name != self.fallback_provider.name:
+            providers.append(self.fallback_provider)
+        self.router = ProviderRouter(providers)
+        
+        # Kelime düzeyinde zamanlama (text-to-speech-with-timestamps)
+        if use_timestamps is None:
+            use_timestamps = os.getenv('USE_TTS_TIMESTAMPS', 'false').lower() == 'true'
+        self.use_timestamps = use_timestamps and self.provider.supports_timestamps
+        if self.use_timestamps:
+            logger.info(f"[TTS] Kelime düzeyinde zamanlama aktif ({self.provider.name})")
+        
+        # Zamanlama verisi bellekte taşınır; JSON yalnızca istenirse yazılır
+        self.export_timing_json = os.getenv('EXPORT_TIMING_JSON', 'false').lower() == 'true'
+        
+        # Çok cümleli istek paketleme (0 = her cümle için ayrı istek)
+        if batch_chars is None:
+            batch_chars = int(os.getenv('TTS_BATCH_CHARS', '0'))
+        self.batch_chars = batch_chars
+        
+        # Ses yüksekliği paket aşamasında bir kez ölçülüp uygulanır (render'da loudnorm gerekmez)
+        self.precompute_loudness = os.getenv('PRECOMPUTE_LOUDNESS', 'true').lower() == 'true'
+        self.loudness_target_i = float(os.getenv('AUDIO_LOUDNESS_TARGET', '-24'))
+        self.loudness_target_tp = float(os.getenv('AUDIO_TRUE_PEAK_TARGET', '-2'))
+        
+        # Birleşik ses formatı: mp3 ya da render'da kopyalanabilen AAC/M4A
+        self.package_format = os.getenv('AUDIO_PACKAGE_FORMAT', 'mp3').lower()
+        self.package_bitrate = os.getenv('AUDIO_BITRATE', '128k')
+        self.package_sample_rate = int(os.getenv('AUDIO_SAMPLE_RATE', '48000'))
+        
+        # Artımlı yeniden oluşturma için normalize edilmemiş cümle klipleri (kayıpsız WAV)
+        self.clip_cache_dir = os.getenv('AUDIO_CLIP_CACHE_DIR', 'data/cache/audio_clips')
+        
+    def close(self):
+        """Sağlayıcı iş parçacığı havuzlarını kapat"""
+        self.router.close()
+        
+    def create_segmented_audio_with_timing(self, sentences, language='tr', output_filename_base='audio', incremental=False):
+        """Cümle bazlı ses dosyaları oluştur ve mükemmel zamanlamayı hesapla
+
+        incremental=True ise önceki zamanlama dosyasıyla cümle hash'leri karşılaştırılır,
+        yalnızca değişen cümleler sentezlenip mevcut ses dosyasına eklenir.
+        """
         try:
             logger.info(f"Cümle bazlı ses segmentasyonu başlatılıyor - {len(sentences)} cümle")
             
-            # Her cümle için ayrı ses dosyası oluştur ve gerçek sürelerini hesapla
-            sentence_segments = self._create_individual_sentence_audio_files(sentences, language)
+            incremental_result = None
+            if incremental:
+                incremental_result = self._create_incremental_audio(sentences, language, output_filename_base)
             
-            # Ana ses dosyasını birleştir ve zamanlamaları hesapla
-            main_audio_path, timing_data = self._combine_audio_files_with_timing(sentence_segments, output_filename_base, language)
+            if incremental_result is not None:
+                main_audio_path, timing = incremental_result
+            else:
+                # Her cümle için ses oluştur ve gerçek sürelerini hesapla
+                if self.batch_chars > 0:
+                    sentence_segments = self._create_batched_sentence_audio_files(sentences, language)
+                else:
+                    sentence_segments = self._create_individual_sentence_audio_files(sentences, language)
+                
+                # Ana ses dosyasını birleştir ve zamanlamaları hesapla
+                main_audio_path, timing = self._combine_audio_files_with_timing(sentence_segments, output_filename_base, language)
+                
+                # Sonraki artımlı çalıştırmalar klipleri kayıplı birleşik dosyadan değil önbellekten alır
+                if incremental:
+                    self._store_sentence_clips(
+                        output_filename_base, language,
+                        {segment['text']: segment['audio_segment'] for segment in sentence_segments}
+                    )
             
-            # JSON dosyasına kaydet
-            json_path = self._save_timing_data_to_json(timing_data, output_filename_base, language)
+            # Kompakt ikili biçimde kaydet (JSON yalnızca istenirse)
+            timing_path = self._save_timing_data(timing, output_filename_base, language)
+            json_path = None
+            if self.export_timing_json:
+                json_path = self._save_timing_data_to_json(timing, output_filename_base, language)
             
             logger.info(f"Segmentasyon tamamlandı: {main_audio_path}")
-            logger.info(f"Zamanlama verileri kaydedildi: {json_path}")
+            logger.info(f"Zamanlama verileri kaydedildi: {timing_path}")
             
             return {
                 'audio_path': main_audio_path,
+                'timing': timing,
+                'timing_path': timing_path,
                 'json_path': json_path,
-                'segments': timing_data['segments'],
-                'total_duration': timing_data['total_duration']
+                'segments': timing.segments,
+                'total_duration': timing.total_duration,
+                'has_word_timing': timing.has_word_timing
             }
             
         except Exception as e:
             logger.error(f"Ses segmentasyon hatası: {str(e)}")
             raise
     
-    def _create_individual_sentence_audio_files(self, sentences, language):
+    def _synthesize_with_fallback(self, text, language):
+        """Yönlendirici üzerinden geçici dosyaya sentezle (süre sınırı, yedek istek, devre kesici)"""
+        synthesis = self.router.synthesize(text, language, with_timestamps=self.use_timestamps)
+        logger.debug(f"{synthesis['provider']} ile ses oluşturuldu: {text[:30]}...")
+        return synthesis
+    
+    def get_provider_stats(self):
+        """TTS sağlayıcılarının gecikme, hata ve devre durumu istatistikleri"""
+        return self.router.get_stats()
+    
+    def _create_individual_sentence_audio_files(self, sentences, language, start_index=0):
         """Her cümle için ayrı ses dosyası oluştur ve gerçek sürelerini hesapla"""
         sentence_segments = []
         temp_audio_files = []
         
         logger.info(f"Her cümle için ayrı ses dosyaları oluşturuluyor...")
         
-        for i, sentence in enumerate(sentences):
+        for i, sentence in enumerate(sentences, start=start_index):
             try:
                 # Cümleyi temizle
                 clean_sentence = sentence.strip()
@@ -89,39 +192,12 @@ class AudioSegmenter:
                 logger.debug(f"Cümle {i+1}/{len(sentences)}: {clean_sentence[:50]}...")
                 
                 # TTS ile ses oluştur
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-                temp_audio_path = temp_file.name
-                temp_file.close()
-                
-                if self.use_elevenlabs and self.elevenlabs_client:
-                    try:
-                        # ElevenLabs ile ses oluştur (yeni API)
-                        audio_generator = self.elevenlabs_client.text_to_speech.convert(
-                            text=clean_sentence,
-                            voice_id=self.elevenlabs_voice_id,
-                            model_id="eleven_multilingual_v2",
-                            output_format="mp3_44100_128"
-                        )
-                        # Generator'dan bytes verisini topla ve dosyaya kaydet
-                        with open(temp_audio_path, 'wb') as f:
-                            for chunk in audio_generator:
-                                if chunk:
-                                    f.write(chunk)
-                        logger.debug(f"ElevenLabs ile ses oluşturuldu: {clean_sentence[:30]}...")
-                    except Exception as elevenlabs_error:
-                        logger.warning(f"ElevenLabs hatası, gTTS'ye geçiliyor: {str(elevenlabs_error)}")
-                        # ElevenLabs başarısız olursa gTTS kullan
-                        tts = gTTS(text=clean_sentence, lang=language, slow=False)
-                        tts.save(temp_audio_path)
-                else:
-                    # Google TTS kullan
-                    tts = gTTS(text=clean_sentence, lang=language, slow=False)
-                    tts.save(temp_audio_path)
-                
+                synthesis = self._synthesize_with_fallback(clean_sentence, language)
+                temp_audio_path = synthesis['audio_path']
                 temp_audio_files.append(temp_audio_path)
                 
                 # Ses dosyasını yükle ve süresini hesapla
-                sentence_audio = AudioSegment.from_mp3(temp_audio_path)
+                sentence_audio = AudioSegment.from_file(temp_audio_path)
                 duration_ms = len(sentence_audio)
                 duration_seconds = duration_ms / 1000.0
                 
@@ -131,7 +207,8 @@ class AudioSegmenter:
                     'duration_seconds': round(duration_seconds, 3),
                     'duration_ms': duration_ms,
                     'audio_path': temp_audio_path,
-                    'audio_segment': sentence_audio
+                    'audio_segment': sentence_audio,
+                    'alignment': synthesis.get('alignment')
                 }
                 
                 sentence_segments.append(segment_data)
@@ -157,72 +234,199 @@ class AudioSegmenter:
         logger.info(f"Toplam {len(sentence_segments)} cümle ses dosyası oluşturuldu")
         return sentence_segments
     
+    def _pack_sentence_batches(self, sentences):
+        """Ardışık cümleleri sağlayıcının ideal istek boyutuna göre paketle"""
+        batches = []
+        current = []
+        current_length = 0
+        
+        for i, sentence in enumerate(sentences):
+            clean_sentence = sentence.strip()
+            if not clean_sentence:
+                continue
+            
+            added_length = len(clean_sentence) + (len(self.BATCH_SEPARATOR) if current else 0)
+            if current and current_length + added_length > self.batch_chars:
+                batches.append(current)
+                current = []
+                current_length = 0
+                added_length = len(clean_sentence)
+            
+            current.append((i, clean_sentence))
+            current_length += added_length
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _create_batched_sentence_audio_files(self, sentences, language):
+        """Cümleleri paketler halinde sentezle ve zamanlamaya göre cümle kliplerine geri böl"""
+        sentence_segments = []
+        batches = self._pack_sentence_batches(sentences)
+        
+        logger.info(f"{len(sentences)} cümle {len(batches)} TTS isteğinde paketlendi")
+        
+        for batch in batches:
+            batch_text = self.BATCH_SEPARATOR.join(text for _, text in batch)
+            batch_audio_path = None
+            
+            try:
+                synthesis = self._synthesize_with_fallback(batch_text, language)
+                batch_audio_path = synthesis['audio_path']
+                batch_audio = AudioSegment.from_file(batch_audio_path)
+                
+                if synthesis.get('alignment'):
+                    clips = self._split_batch_by_alignment(batch, batch_audio, synthesis['alignment'])
+                else:
+                    clips = self._split_batch_by_silence(batch, batch_audio)
+                
+                if clips is None:
+                    raise ValueError("Paket ses cümlelere bölünemedi")
+                
+                for (i, text), (clip, alignment) in zip(batch, clips):
+                    sentence_segments.append({
+                        'index': i + 1,
+                        'text': text,
+                        'duration_seconds': round(len(clip) / 1000.0, 3),
+                        'duration_ms': len(clip),
+                        'audio_path': None,
+                        'audio_segment': clip,
+                        'alignment': alignment
+                    })
+                
+            except Exception as e:
+                # Paket başarısız olursa bu paketin cümlelerini tek tek sentezle
+                logger.warning(f"Paket sentezi başarısız, cümle bazlı moda geçiliyor: {str(e)}")
+                for i, text in batch:
+                    sentence_segments.extend(self._create_individual_sentence_audio_files([text], language, start_index=i))
+            finally:
+                if batch_audio_path and os.path.exists(batch_audio_path):
+                    os.unlink(batch_audio_path)
+        
+        logger.info(f"Toplam {len(sentence_segments)} cümle ses klibi oluşturuldu")
+        return sentence_segments
+    
+    def _split_batch_by_alignment(self, batch, batch_audio, alignment):
+        """Sağlayıcı karakter zaman damgalarıyla paket sesi cümle kliplerine böl"""
+        starts = alignment['character_start_times_seconds']
+        ends = alignment['character_end_times_seconds']
+        total_seconds = len(batch_audio) / 1000.0
+        
+        # Her cümlenin paket metnindeki karakter aralığı
+        spans = []
+        offset = 0
+        for _, text in batch:
+            spans.append((offset, offset + len(text) - 1))
+            offset += len(text) + len(self.BATCH_SEPARATOR)
+        
+        if spans[-1][1] >= len(starts):
+            return None
+        
+        # Cümleler arası doğal duraklama kliplere dahil edilmez; birleştirmede
+        # SENTENCE_GAP_MS eklendiği için klipler ilk ve son karakterde kesilir.
+        # Paketin baş ve son sessizliği tek cümlelik istekteki gibi korunur.
+        clip_starts = [0.0] + [starts[first] for first, _ in spans[1:]]
+        clip_ends = [ends[last] for _, last in spans[:-1]] + [total_seconds]
+        
+        clips = []
+        for (first, last), clip_start, clip_end in zip(spans, clip_starts, clip_ends):
+            clip = batch_audio[int(clip_start * 1000):int(clip_end * 1000)]
+            local_alignment = {
+                'characters': alignment['characters'][first:last + 1],
+                'character_start_times_seconds': [round(t - clip_start, 3) for t in starts[first:last + 1]],
+                'character_end_times_seconds': [round(t - clip_start, 3) for t in ends[first:last + 1]]
+            }
+            clips.append((clip, local_alignment))
+        return clips
+    
+    def _split_batch_by_silence(self, batch, batch_audio):
+        """Zaman damgası yoksa sessizlik tespitiyle paket sesi cümle kliplerine böl"""
+        if len(batch) == 1:
+            return [(batch_audio, None)]
+        
+        silences = detect_silence(batch_audio, min_silence_len=150, silence_thresh=batch_audio.dBFS - 16)
+        if len(silences) < len(batch) - 1:
+            return None
+        
+        # Beklenen kesim zamanları: karakter sayısıyla orantılı konum
+        total_chars = sum(len(text) for _, text in batch)
+        expected_cuts = []
+        cumulative = 0
+        for _, text in batch[:-1]:
+            cumulative += len(text)
+            expected_cuts.append(len(batch_audio) * cumulative / total_chars)
+        
+        # Her beklenen kesime sırayı bozmadan en yakın sessizliği ata; sessizlik
+        # kliplere dahil edilmez (cümle arası boşluk birleştirmede eklenir)
+        clip_starts = [0]
+        clip_ends = []
+        next_candidate = 0
+        for k, expected in enumerate(expected_cuts):
+            remaining = len(expected_cuts) - k - 1
+            candidates = silences[next_candidate:len(silences) - remaining]
+            best = min(range(len(candidates)), key=lambda j: abs((candidates[j][0] + candidates[j][1]) / 2 - expected))
+            silence_start, silence_end = candidates[best]
+            clip_ends.append(silence_start)
+            clip_starts.append(silence_end)
+            next_candidate += best + 1
+        clip_ends.append(len(batch_audio))
+        
+        return [(batch_audio[start:end], None) for start, end in zip(clip_starts, clip_ends)]
+    
     def _combine_audio_files_with_timing(self, sentence_segments, output_filename_base, language):
         """Cümle ses dosyalarını birleştir ve mükemmel zamanlamayı hesapla"""
         try:
             logger.info("Ses dosyaları birleştiriliyor ve zamanlama hesaplanıyor...")
             
-            # Ana ses dosyasını oluştur
-            combined_audio = AudioSegment.empty()
-            timing_segments = []
+            timing = TimingTrack(language=language, created_at=datetime.now().isoformat())
+            timing.metadata['synthesis'] = self._synthesis_signature()
+            clips = []
             current_time = 0.0
             
-            # Cümle arası sessizlik (300ms)
-            silence_between_sentences = AudioSegment.silent(duration=300)
-            
             for i, segment in enumerate(sentence_segments):
                 if segment['audio_segment'] is None:
                     # Hata durumunda sessizlik ekle
-                    error_silence = AudioSegment.silent(duration=segment['duration_ms'])
-                    combined_audio += error_silence
+                    clips.append(AudioSegment.silent(duration=segment['duration_ms']))
                     
-                    timing_segments.append({
-                        'index': segment['index'],
-                        'text': segment['text'],
-                        'start_time': round(current_time, 3),
-                        'end_time': round(current_time + segment['duration_seconds'], 3),
-                        'duration': segment['duration_seconds'],
-                        'status': 'error',
-                        'error': segment.get('error', 'Unknown error')
-                    })
+                    timing.append_segment(
+                        index=segment['index'],
+                        text=segment['text'],
+                        start=round(current_time, 3),
+                        end=round(current_time + segment['duration_seconds'], 3),
+                        duration=segment['duration_seconds'],
+                        status='error',
+                        error=segment.get('error', 'Unknown error')
+                    )
                     
                     current_time += segment['duration_seconds']
                 else:
                     # Gerçek ses dosyasını ekle
                     sentence_audio = segment['audio_segment']
                     actual_duration = len(sentence_audio) / 1000.0
+                    clips.append(sentence_audio)
                     
-                    combined_audio += sentence_audio
+                    # Sağlayıcı hizalaması varsa birleşik ses dosyasına göre kaydır
+                    alignment = segment.get('alignment')
                     
-                    timing_segments.append({
-                        'index': segment['index'],
-                        'text': segment['text'],
-                        'start_time': round(current_time, 3),
-                        'end_time': round(current_time + actual_duration, 3),
-                        'duration': round(actual_duration, 3),
-                        'status': 'success'
-                    })
+                    timing.append_segment(
+                        index=segment['index'],
+                        text=segment['text'],
+                        start=round(current_time, 3),
+                        end=round(current_time + actual_duration, 3),
+                        duration=round(actual_duration, 3),
+                        status='success',
+                        words=words_from_alignment(alignment, offset=current_time) if alignment else None,
+                        alignment=shift_alignment(alignment, current_time) if alignment else None
+                    )
                     
                     current_time += actual_duration
                 
-                # Cümle arası sessizlik ekle (son cümle hariç)
+                # Cümle arası sessizlik (son cümle hariç)
                 if i < len(sentence_segments) - 1:
-                    combined_audio += silence_between_sentences
-                    current_time += 0.3  # 300ms sessizlik
+                    current_time += self.SENTENCE_GAP_MS / 1000.0
             
-            # Ana ses dosyasını kaydet
-            output_audio_path = os.path.join(self.output_dir, f"{output_filename_base}_{language}.mp3")
-            combined_audio.export(output_audio_path, format="mp3")
-            
-            # Zamanlama verilerini hazırla
-            timing_data = {
-                'language': language,
-                'total_duration': round(current_time, 3),
-                'total_segments': len(timing_segments),
-                'audio_file': output_audio_path,
-                'created_at': str(timedelta(seconds=0)),  # Şu anki zaman
-                'segments': timing_segments
-            }
+            timing.total_duration = round(current_time, 3)
+            output_audio_path = self._assemble_combined_audio(clips, timing, output_filename_base, language)
             
             # Geçici dosyaları temizle
             self._cleanup_temp_files(sentence_segments)
@@ -230,20 +434,290 @@ class AudioSegmenter:
             logger.info(f"Ana ses dosyası oluşturuldu: {output_audio_path}")
             logger.info(f"Toplam süre: {current_time:.3f} saniye")
             
-            return output_audio_path, timing_data
+            return output_audio_path, timing
             
         except Exception as e:
             logger.error(f"Ses birleştirme hatası: {str(e)}")
             raise
     
-    def _save_timing_data_to_json(self, timing_data, output_filename_base, language):
+    def _assemble_combined_audio(self, clips, timing, output_filename_base, language):
+        """Cümle kliplerini aralarda sessizlikle birleştir, normalize et ve kaydet
+
+        Tam ve artımlı oluşturma aynı yolu kullanır; zamanlamadaki önceki ses
+        yüksekliği ölçümü yeni birleşik sese göre yenilenir ya da kaldırılır.
+        """
+        combined_audio = AudioSegment.empty()
+        silence_between_sentences = AudioSegment.silent(duration=self.SENTENCE_GAP_MS)
+        for i, clip in enumerate(clips):
+            if i > 0:
+                combined_audio += silence_between_sentences
+            combined_audio += clip
+        
+        # Ses yüksekliğini iki geçişte ölç ve hassas kazanç uygula
+        timing.metadata.pop('loudness', None)
+        if self.precompute_loudness:
+            try:
+                combined_audio, loudness = normalize_loudness(
+                    combined_audio, self.loudness_target_i, self.loudness_target_tp
+                )
+                timing.metadata['loudness'] = loudness
+                logger.info(f"Ses yüksekliği normalize edildi: {loudness['integrated']:.1f} -> {loudness['output_integrated']:.1f} LUFS")
+            except Exception as e:
+                logger.warning(f"Ses yüksekliği ölçülemedi, render sırasında normalize edilecek: {str(e)}")
+        
+        output_audio_path = self._export_combined_audio(combined_audio, output_filename_base, language)
+        timing.audio_file = output_audio_path
+        return output_audio_path
+    
+    def _export_combined_audio(self, combined_audio, output_filename_base, language):
+        """Birleşik sesi paket formatında kaydet
+
+        m4a seçiliyse son konteynerle uyumlu örnekleme hızı ve bit hızında AAC
+        üretilir; render'lar sesi yeniden kodlamadan kopyalayabilir.
+        """
+        if self.package_format == 'm4a':
+            output_audio_path = os.path.join(self.output_dir, f"{output_filename_base}_{language}.m4a")
+            combined_audio.export(
+                output_audio_path,
+                format="ipod",
+                codec="aac",
+                bitrate=self.package_bitrate,
+                parameters=["-ar", str(self.package_sample_rate), "-movflags", "+faststart"]
+            )
+        else:
+            output_audio_path = os.path.join(self.output_dir, f"{output_filename_base}_{language}.mp3")
+            combined_audio.export(output_audio_path, format="mp3")
+        return output_audio_path
+    
+    def _synthesis_signature(self):
+        """Artımlı yeniden kullanım için ses üretim ayarlarının imzası"""
+        return {
+            'provider': self.provider.name,
+            'voice_id': self.elevenlabs_voice_id if self.provider.name == 'elevenlabs' else None,
+            'timestamps': self.use_timestamps
+        }
+    
+    def _create_incremental_audio(self, sentences, language, output_filename_base):
+        """Yalnızca değişen cümleleri sentezleyip mevcut ses dosyasına ekle
+
+        Önceki zamanlama ya da cümle klip önbelleği yoksa veya ses üretim
+        ayarları değiştiyse None döner ve tam yeniden oluşturma yapılır.
+        """
+        timing_path = os.path.join(self.output_dir, f"{output_filename_base}_{language}_timing{TIMING_SUFFIX}")
+        if not os.path.exists(timing_path):
+            logger.info("Önceki zamanlama dosyası yok, tam yeniden oluşturma yapılıyor")
+            return None
+        
+        previous = TimingTrack.load(timing_path)
+        if previous.metadata.get('synthesis') != self._synthesis_signature():
+            logger.info("Ses üretim ayarları değişmiş, tam yeniden oluşturma yapılıyor")
+            return None
+        if not previous.audio_file or not os.path.exists(previous.audio_file):
+            logger.info("Önceki ses dosyası bulunamadı, tam yeniden oluşturma yapılıyor")
+            return None
+        
+        clean_sentences = [(i, s.strip()) for i, s in enumerate(sentences) if s.strip()]
+        
+        # Cümle hash'lerini karşılaştır (hatalı önceki satırlar her zaman yeniden sentezlenir)
+        previous_hashes = [
+            sentence_hash(text) if previous.is_success(row) else None
+            for row, text in enumerate(previous.texts)
+        ]
+        new_hashes = [sentence_hash(text) for _, text in clean_sentences]
+        
+        reused_rows = {}
+        matcher = SequenceMatcher(None, previous_hashes, new_hashes, autojunk=False)
+        for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+            if tag == 'equal':
+                for k in range(a_end - a_start):
+                    reused_rows[b_start + k] = a_start + k
+        
+        changed = [pos for pos in range(len(clean_sentences)) if pos not in reused_rows]
+        logger.info(f"Artımlı yeniden oluşturma: {len(changed)} değişen, {len(reused_rows)} yeniden kullanılan cümle")
+        
+        # Yeniden kullanılan cümleler kayıpsız klip önbelleğinden okunur; kayıplı birleşik
+        # dosyadan kesip yeniden kodlamak her düzenlemede bir kuşak kalite kaybı demektir
+        reused_clips = {}
+        for pos in reused_rows:
+            clip_path = self._sentence_clip_path(output_filename_base, language, clean_sentences[pos][1])
+            if not os.path.exists(clip_path):
+                logger.info("Cümle klip önbelleği eksik, tam yeniden oluşturma yapılıyor")
+                return None
+            reused_clips[pos] = AudioSegment.from_file(clip_path)
+        
+        # Değişen cümleleri sentezle (normalize edilmemiş; kazanç birleşik ses üzerinde yeniden ölçülür)
+        new_segments = {}
+        for pos in changed:
+            i, text = clean_sentences[pos]
+            new_segments[pos] = self._create_individual_sentence_audio_files([text], language, start_index=i)[0]
+        
+        timing = self._splice_timing(previous, clean_sentences, reused_rows, new_segments, language)
+        
+        # Ses dosyasını önbellekteki kliplerden ve yeni cümlelerden yeniden birleştir
+        ordered_clips = []
+        clips = {}
+        for pos in range(len(clean_sentences)):
+            if pos in reused_clips:
+                clip = reused_clips[pos]
+            elif new_segments[pos]['audio_segment'] is not None:
+                clip = new_segments[pos]['audio_segment']
+            else:
+                ordered_clips.append(AudioSegment.silent(duration=new_segments[pos]['duration_ms']))
+                continue
+            clips[clean_sentences[pos][1]] = clip
+            ordered_clips.append(clip)
+        
+        output_audio_path = self._assemble_combined_audio(ordered_clips, timing, output_filename_base, language)
+        
+        self._store_sentence_clips(output_filename_base, language, clips)
+        self._cleanup_temp_files(list(new_segments.values()))
+        logger.info(f"Artımlı ses dosyası oluşturuldu: {output_audio_path}")
+        return output_audio_path, timing
+    
+    def _sentence_clip_path(self, output_filename_base, language, text):
+        """Cümle klibinin kayıpsız önbellekteki yolu (cümle hash'i ile)"""
+        return os.path.join(self.clip_cache_dir, f"{output_filename_base}_{language}", f"{sentence_hash(text)}.wav")
+    
+    def _store_sentence_clips(self, output_filename_base, language, clips):
+        """Normalize edilmemiş cümle kliplerini WAV olarak önbelleğe yaz, artık kullanılmayanları sil"""
+        try:
+            clip_dir = os.path.join(self.clip_cache_dir, f"{output_filename_base}_{language}")
+            os.makedirs(clip_dir, exist_ok=True)
+            
+            current = set()
+            for text, clip in clips.items():
+                if clip is None:
+                    continue
+                clip_path = self._sentence_clip_path(output_filename_base, language, text)
+                current.add(os.path.basename(clip_path))
+                if not os.path.exists(clip_path):
+                    clip.export(clip_path, format='wav')
+            
+            for name in os.listdir(clip_dir):
+                if name not in current:
+                    os.unlink(os.path.join(clip_dir, name))
+        except Exception as e:
+            # Önbellek yazılamazsa sonraki artımlı çalıştırma tam yeniden oluşturma yapar
+            logger.warning(f"Cümle klip önbelleği yazılamadı: {str(e)}")
+    
+    def _splice_timing(self, previous, clean_sentences, reused_rows, new_segments, language):
+        """Yeni cümle sırasına göre zamanlamaları tek vektörel geçişte yeniden hesapla"""
+        count = len(clean_sentences)
+        gap = self.SENTENCE_GAP_MS / 1000.0
+        
+        previous_durations = np.frombuffer(previous.durations, dtype=np.float64)
+        previous_starts = np.frombuffer(previous.starts, dtype=np.float64)
+        
+        positions = np.arange(count)
+        reused_positions = np.array(sorted(reused_rows), dtype=np.int64)
+        source_rows = np.array([reused_rows[pos] for pos in reused_positions], dtype=np.int64)
+        
+        durations = np.empty(count, dtype=np.float64)
+        durations[reused_positions] = previous_durations[source_rows]
+        for pos, segment in new_segments.items():
+            durations[pos] = segment['duration_seconds']
+        
+        # Başlangıçlar: önceki cümlelerin süre + sessizlik toplamı
+        starts = np.zeros(count, dtype=np.float64)
+        if count > 1:
+            starts[1:] = np.cumsum(durations[:-1] + gap)
+        starts = np.round(starts, 3)
+        ends = np.round(starts + durations, 3)
+        
+        # Eski satır -> yeni satır ve kaydırma miktarı
+        old_to_new = np.full(len(previous), -1, dtype=np.int64)
+        old_to_new[source_rows] = reused_positions
+        shifts = np.zeros(len(previous), dtype=np.float64)
+        shifts[source_rows] = starts[reused_positions] - previous_starts[source_rows]
+        
+        timing = TimingTrack(language=language, total_duration=round(float(ends[-1]), 3) if count else 0.0,
+                             created_at=datetime.now().isoformat(), metadata=dict(previous.metadata))
+        timing.metadata['incremental'] = {'reused': len(reused_rows), 'synthesized': len(new_segments)}
+        
+        for pos in positions:
+            i, text = clean_sentences[pos]
+            segment = new_segments.get(pos)
+            status = 'error' if segment is not None and segment['audio_segment'] is None else 'success'
+            timing.append_segment(
+                index=i + 1,
+                text=text,
+                start=float(starts[pos]),
+                end=float(ends[pos]),
+                duration=round(float(durations[pos]), 3),
+                status=status,
+                error=segment.get('error') if segment is not None else None
+            )
+        
+        # Yeniden kullanılan kelime ve karakter zamanlamalarını topluca kaydır
+        word_columns = self._shift_columns(previous.word_segments, previous.word_starts, previous.word_ends,
+                                           previous.word_texts, old_to_new, shifts)
+        char_columns = self._shift_columns(previous.char_segments, previous.char_starts, previous.char_ends,
+                                           previous.chars, old_to_new, shifts)
+        
+        # Yeni sentezlenen cümlelerin hizalamalarını ekle
+        for pos, segment in new_segments.items():
+            alignment = segment.get('alignment')
+            if not alignment or segment['audio_segment'] is None:
+                continue
+            offset = float(starts[pos])
+            for word in words_from_alignment(alignment, offset=offset):
+                word_columns.append((pos, word['start'], word['end'], word['text']))
+            shifted = shift_alignment(alignment, offset)
+            for char, c_start, c_end in zip(shifted['characters'], shifted['character_start_times_seconds'],
+                                            shifted['character_end_times_seconds']):
+                char_columns.append((pos, c_start, c_end, char))
+        
+        word_columns.sort(key=lambda item: (item[0], item[1]))
+        char_columns.sort(key=lambda item: (item[0], item[1]))
+        for row, start, end, text in word_columns:
+            timing.word_segments.append(row)
+            timing.word_starts.append(start)
+            timing.word_ends.append(end)
+            timing.word_texts.append(text)
+        for row, start, end, char in char_columns:
+            timing.char_segments.append(row)
+            timing.char_starts.append(start)
+            timing.char_ends.append(end)
+            timing.chars.append(char)
+        
+        return timing
+    
+    def _shift_columns(self, segments, starts, ends, texts, old_to_new, shifts):
+        """Eski satırlara ait zaman sütunlarını yeni satırlara vektörel olarak taşı"""
+        if not len(segments):
+            return []
+        
+        old_rows = np.frombuffer(segments, dtype=np.int32).astype(np.int64)
+        new_rows = old_to_new[old_rows]
+        keep = np.flatnonzero(new_rows >= 0)
+        
+        row_shift = shifts[old_rows[keep]]
+        new_starts = np.round(np.frombuffer(starts, dtype=np.float64)[keep] + row_shift, 3)
+        new_ends = np.round(np.frombuffer(ends, dtype=np.float64)[keep] + row_shift, 3)
+        
+        return [
+            (int(row), float(start), float(end), texts[k])
+            for row, start, end, k in zip(new_rows[keep], new_starts, new_ends, keep)
+        ]
+    
+    def _save_timing_data(self, timing, output_filename_base, language):
+        """Zamanlama verilerini kompakt ikili dosyaya kaydet"""
+        try:
+            timing_path = os.path.join(self.output_dir, f"{output_filename_base}_{language}_timing{TIMING_SUFFIX}")
+            timing.save(timing_path)
+            return timing_path
+            
+        except Exception as e:
+            logger.error(f"Zamanlama kaydetme hatası: {str(e)}")
+            raise
+    
+    def _save_timing_data_to_json(self, timing, output_filename_base, language):
         """Zamanlama verilerini JSON dosyasına kaydet"""
         try:
             json_filename = f"{output_filename_base}_{language}_timing.json"
             json_path = os.path.join(self.output_dir, json_filename)
             
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(timing_data, f, ensure_ascii=False, indent=2)
+            timing.export_json(json_path)
             
             logger.info(f"Zamanlama verileri JSON'a kaydedildi: {json_path}")
             return json_path
@@ -263,32 +737,23 @@ class AudioSegmenter:
             logger.warning(f"Geçici dosya temizleme hatası: {str(e)}")
     
     def create_synchronized_subtitles_from_json(self, json_path, output_path):
-        """JSON zamanlama verilerinden mükemmel senkronize altyazı oluştur"""
+        """JSON (ya da ikili) zamanlama dosyasından mükemmel senkronize altyazı oluştur"""
+        return self.create_synchronized_subtitles_from_timing(TimingTrack.load(json_path), output_path)
+    
+    def create_synchronized_subtitles_from_timing(self, timing, output_path):
+        """Bellekteki zamanlama modelinden mükemmel senkronize altyazı oluştur"""
         try:
-            # JSON dosyasını oku
-            with open(json_path, 'r', encoding='utf-8') as f:
-                timing_data = json.load(f)
-            
-            subtitles = []
-            
-            for segment in timing_data['segments']:
-                # Sadece başarılı segmentleri altyazıya ekle
-                if segment.get('status') == 'success':
-                    start_time = timedelta(seconds=segment['start_time'])
-                    end_time = timedelta(seconds=segment['end_time'])
-                    
-                    subtitle = srt.Subtitle(
-                        index=segment['index'],
-                        start=start_time,
-                        end=end_time,
-                        content=segment['text']
-                    )
-                    
-                    subtitles.append(subtitle)
+            # Sadece başarılı segmentleri altyazıya ekle
+            rows = [row for row in range(len(timing)) if timing.is_success(row)]
+            subtitles = SubtitleTrack.from_cues(
+                [timing.starts[row] for row in rows],
+                [timing.ends[row] for row in rows],
+                [timing.texts[row] for row in rows],
+                [timing.indices[row] for row in rows]
+            )
             
             # SRT dosyasını kaydet
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(srt.compose(subtitles))
+            subtitles.write(output_path)
             
             logger.info(f"Mükemmel senkronize altyazı dosyası oluşturuldu: {output_path}")
             logger.info(f"Toplam {len(subtitles)} altyazı segmenti oluşturuldu")
@@ -301,24 +766,15 @@ class AudioSegmenter:
     def create_synchronized_subtitles(self, segments, output_path):
         """Segmentlerden senkronize altyazı dosyası oluştur (eski metot - uyumluluk için)"""
         try:
-            subtitles = []
-            
-            for segment in segments:
-                start_time = timedelta(seconds=segment['start_time'])
-                end_time = timedelta(seconds=segment['end_time'])
-                
-                subtitle = srt.Subtitle(
-                    index=segment['index'],
-                    start=start_time,
-                    end=end_time,
-                    content=segment['text']
-                )
-                
-                subtitles.append(subtitle)
+            subtitles = SubtitleTrack.from_cues(
+                [segment['start_time'] for segment in segments],
+                [segment['end_time'] for segment in segments],
+                [segment['text'] for segment in segments],
+                [segment['index'] for segment in segments]
+            )
             
             # SRT dosyasını kaydet
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(srt.compose(subtitles))
+            subtitles.write(output_path)
             
             logger.info(f"Senkronize altyazı dosyası oluşturuldu: {output_path}")
             return output_path
@@ -327,39 +783,38 @@ class AudioSegmenter:
             logger.error(f"Altyazı oluşturma hatası: {str(e)}")
             raise
     
-    def validate_perfect_synchronization(self, json_path):
+    def validate_perfect_synchronization(self, json_path=None, timing=None):
         """Mükemmel senkronizasyon kalitesini doğrula"""
         try:
-            # JSON dosyasını oku
-            with open(json_path, 'r', encoding='utf-8') as f:
-                timing_data = json.load(f)
+            # Bellekte model yoksa dosyadan oku
+            if timing is None:
+                timing = TimingTrack.load(json_path)
             
             # Ses dosyasını kontrol et
-            audio_path = timing_data['audio_file']
+            audio_path = timing.audio_file
             if not os.path.exists(audio_path):
                 return {'is_synchronized': False, 'error': 'Ses dosyası bulunamadı'}
             
-            audio = AudioSegment.from_mp3(audio_path)
-            actual_audio_duration = len(audio) / 1000.0
-            expected_duration = timing_data['total_duration']
+            actual_audio_duration = get_media_probe().duration(audio_path)
+            expected_duration = timing.total_duration
             
             # Süre farkını hesapla
             duration_diff = abs(actual_audio_duration - expected_duration)
             
             # Başarılı segmentleri say
-            successful_segments = [s for s in timing_data['segments'] if s.get('status') == 'success']
-            error_segments = [s for s in timing_data['segments'] if s.get('status') == 'error']
+            successful_segments = sum(1 for status in timing.statuses if status)
+            error_segments = timing.total_segments - successful_segments
             
             validation_result = {
                 'is_perfectly_synchronized': duration_diff <= 0.5,  # 500ms tolerans
                 'actual_audio_duration': round(actual_audio_duration, 3),
                 'expected_duration': expected_duration,
                 'duration_difference': round(duration_diff, 3),
-                'total_segments': timing_data['total_segments'],
-                'successful_segments': len(successful_segments),
-                'error_segments': len(error_segments),
-                'success_rate': round(len(successful_segments) / timing_data['total_segments'] * 100, 2),
-                'language': timing_data['language'],
+                'total_segments': timing.total_segments,
+                'successful_segments': successful_segments,
+                'error_segments': error_segments,
+                'success_rate': round(successful_segments / timing.total_segments * 100, 2),
+                'language': timing.language,
                 'audio_file': audio_path,
                 'json_file': json_path
             }
@@ -372,10 +827,16 @@ class AudioSegmenter:
             return {'is_perfectly_synchronized': False, 'error': str(e)}
     
     def get_timing_data(self, json_path):
-        """JSON dosyasından zamanlama verilerini al"""
+        """Zamanlama dosyasından (ikili ya da JSON) zamanlama modelini al"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return TimingTrack.load(json_path)
         except Exception as e:
-            logger.error(f"JSON okuma hatası: {str(e)}")
-            return None
\ No newline at end of file
+            logger.error(f"Zamanlama dosyası okuma hatası: {str(e)}")
+            return None
+    
+    def get_word_timings(self, json_path):
+        """Zamanlama dosyasından birleşik ses dosyasına göre kelime zamanlamalarını al"""
+        timing = self.get_timing_data(json_path)
+        if timing is None:
+            return []
+        return timing.words()
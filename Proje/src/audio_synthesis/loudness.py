@@ -0,0 +1,91 @@
+import os
+import re
+import json
+import logging
+import tempfile
+import numpy as np
+from pydub import AudioSegment
+from ..video_processing.ffmpeg_runner import FFmpegRunner
+
+logger = logging.getLogger(__name__)
+
+# ffmpeg loudnorm varsayılanlarıyla aynı hedefler (EBU R128)
+DEFAULT_TARGET_I = -24.0
+DEFAULT_TARGET_TP = -2.0
+
+
+def measure_loudness(audio_path, runner=None):
+    """ffmpeg loudnorm analiz geçişiyle entegre ses yüksekliği ve true-peak ölç"""
+    cmd = [
+        AudioSegment.converter, '-hide_banner', '-i', audio_path,
+        '-af', 'loudnorm=print_format=json', '-f', 'null', '-'
+    ]
+    stderr_tail = (runner or FFmpegRunner()).run(cmd)
+
+    # JSON bloğu stderr'in sonunda yer alır
+    match = re.search(r'\{[^{}]*"input_i"[^{}]*\}', stderr_tail)
+    if not match:
+        raise ValueError("loudnorm ölçüm çıktısı okunamadı")
+    stats = json.loads(match.group(0))
+    return {
+        'integrated': float(stats['input_i']),
+        'true_peak': float(stats['input_tp']),
+        'lra': float(stats['input_lra']),
+        'threshold': float(stats['input_thresh'])
+    }
+
+
+def apply_gain(audio, gain_db):
+    """PCM örneklerine vektörel kazanç uygula (kırpma sınırlarıyla)"""
+    samples = np.array(audio.get_array_of_samples())
+    limit = float(2 ** (8 * audio.sample_width - 1))
+    scaled = samples.astype(np.float64) * (10.0 ** (gain_db / 20.0))
+    np.clip(scaled, -limit, limit - 1, out=scaled)
+    return audio._spawn(scaled.astype(samples.dtype).tobytes())
+
+
+def normalize_loudness(audio, target_i=None, target_tp=None, runner=None):
+    """İki geçişli ses yüksekliği normalizasyonu
+
+    1. geçiş kaynağı ölçer, hassas kazanç true-peak sınırını aşmayacak şekilde
+    hesaplanıp PCM üzerine uygulanır, 2. geçiş sonucu doğrular.
+    (normalize edilmiş ses, ölçüm sözlüğü) döndürür.
+    """
+    target_i = DEFAULT_TARGET_I if target_i is None else target_i
+    target_tp = DEFAULT_TARGET_TP if target_tp is None else target_tp
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+    temp_path = temp_file.name
+    temp_file.close()
+
+    try:
+        audio.export(temp_path, format='wav')
+        measured = measure_loudness(temp_path, runner)
+
+        # Sessiz ses için kazanç uygulanmaz
+        if not np.isfinite(measured['integrated']) or measured['integrated'] <= -70.0:
+            return audio, dict(measured, gain_db=0.0, target_i=target_i, target_tp=target_tp,
+                               output_integrated=measured['integrated'], output_true_peak=measured['true_peak'])
+
+        gain_db = target_i - measured['integrated']
+        # True-peak hedefini aşmamak için kazancı sınırla
+        gain_db = min(gain_db, target_tp - measured['true_peak'])
+
+        normalized = apply_gain(audio, gain_db)
+        normalized.export(temp_path, format='wav')
+        output = measure_loudness(temp_path, runner)
+
+        return normalized, {
+            'integrated': measured['integrated'],
+            'true_peak': measured['true_peak'],
+            'lra': measured['lra'],
+            'threshold': measured['threshold'],
+            'gain_db': round(gain_db, 2),
+            'target_i': target_i,
+            'target_tp': target_tp,
+            'output_integrated': output['integrated'],
+            'output_true_peak': output['true_peak']
+        }
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
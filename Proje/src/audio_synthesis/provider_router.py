@@ -0,0 +1,299 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Ardışık hatalardan sonra sağlayıcıyı bekleme süresi boyunca devre dışı bırakır"""
+
+    def __init__(self, failure_threshold=3, cooldown_seconds=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                return 'half_open'
+            return 'open'
+
+    def allow_request(self):
+        """Kapalı ya da yarı açık durumdaysa isteğe izin ver"""
+        return self.state != 'open'
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            # Yarı açık durumda tek hata devreyi yeniden açar
+            if self.consecutive_failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class ProviderStats:
+    """Sağlayıcı başına gecikme ve hata istatistikleri"""
+
+    def __init__(self, window=200):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_hedge(self):
+        with self._lock:
+            self.hedges += 1
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    @property
+    def sample_count(self):
+        with self._lock:
+            return len(self.latencies)
+
+    def record(self, latency=None, success=True, timeout=False):
+        with self._lock:
+            self.requests += 1
+            if success:
+                self.successes += 1
+                self.latencies.append(latency)
+            else:
+                self.failures += 1
+                if timeout:
+                    self.timeouts += 1
+
+    def percentile(self, q):
+        """Başarılı isteklerin gecikme yüzdeliği (örnek yoksa None)"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        position = min(int(round(q * (len(samples) - 1))), len(samples) - 1)
+        return samples[position]
+
+    def as_dict(self):
+        with self._lock:
+            counters = {
+                'requests': self.requests,
+                'successes': self.successes,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins
+            }
+        return dict(counters, p50_latency=self.percentile(0.5), p95_latency=self.percentile(0.95))
+
+
+class ProviderRouter:
+    """Çağrı başına süre sınırı, hedged istek ve devre kesici ile TTS sağlayıcı yönlendirici
+
+    Sağlayıcılar öncelik sırasıyla denenir. Birincil istek, geçmiş gecikme
+    yüzdeliğini aşarsa sıradaki sağlayıcıya yedek (hedged) istek gönderilir ve
+    ilk başarılı yanıt kullanılır. Süre sınırını aşan ya da hata veren
+    sağlayıcılar devre kesici üzerinden bekleme süresi boyunca atlanır.
+
+    Her sağlayıcının kendi iş parçacığı havuzu vardır ve süre sınırını aşıp
+    terk edilen istekler bitene kadar o sağlayıcının kapasitesinden düşülür;
+    takılan bir sağlayıcı diğerlerinin isteklerini kuyrukta bekletmez.
+    """
+
+    def __init__(self, providers, deadline_seconds=None, hedge_percentile=None, hedge_min_samples=5,
+                 failure_threshold=None, cooldown_seconds=None, max_inflight=None):
+        self.providers = list(providers)
+        self.deadline_seconds = deadline_seconds or float(os.getenv('TTS_DEADLINE_SECONDS', '30'))
+        self.hedge_percentile = hedge_percentile or float(os.getenv('TTS_HEDGE_PERCENTILE', '0.95'))
+        self.hedge_min_samples = hedge_min_samples
+        failure_threshold = failure_threshold or int(os.getenv('TTS_BREAKER_FAILURES', '3'))
+        cooldown_seconds = cooldown_seconds or float(os.getenv('TTS_BREAKER_COOLDOWN', '60'))
+
+        self.breakers = {p.name: CircuitBreaker(failure_threshold, cooldown_seconds) for p in self.providers}
+        self.stats = {p.name: ProviderStats() for p in self.providers}
+        # Sağlayıcı başına eşzamanlı istek sınırı (terk edilen istekler dahil)
+        self.max_inflight = max_inflight or int(os.getenv('TTS_MAX_INFLIGHT', '4'))
+        self._executors = {
+            p.name: ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix=f'tts-{p.name}')
+            for p in self.providers
+        }
+        self._inflight = {p.name: 0 for p in self.providers}
+        self._inflight_lock = threading.Lock()
+
+    def _hedge_delay(self, provider):
+        """Yedek isteğin gönderileceği gecikme eşiği"""
+        stats = self.stats[provider.name]
+        if stats.sample_count < self.hedge_min_samples:
+            return None
+        return stats.percentile(self.hedge_percentile)
+
+    def _submit(self, provider, text, language, with_timestamps):
+        """İsteği sağlayıcının havuzuna gönder; kapasite doluysa None döndür
+
+        Kapasite, istek gerçekten bitene kadar (süre sınırını aşıp terk edilse
+        bile) dolu sayılır; yeni istekler takılmış işlerin arkasında beklemez.
+        """
+        with self._inflight_lock:
+            if self._inflight[provider.name] >= self.max_inflight:
+                return None
+            self._inflight[provider.name] += 1
+
+        def release(_):
+            with self._inflight_lock:
+                self._inflight[provider.name] -= 1
+
+        future = self._executors[provider.name].submit(self._call, provider, text, language, with_timestamps)
+        future.add_done_callback(release)
+        return future
+
+    def _call(self, provider, text, language, with_timestamps):
+        """Sağlayıcıyı kendi geçici dosyasıyla çağır"""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=provider.audio_suffix)
+        temp_audio_path = temp_file.name
+        temp_file.close()
+
+        started = time.monotonic()
+        try:
+            result = provider.synthesize(
+                text, language, temp_audio_path,
+                with_timestamps=with_timestamps and provider.supports_timestamps
+            )
+        except Exception:
+            if os.path.exists(temp_audio_path):
+                os.unlink(temp_audio_path)
+            raise
+        result['provider'] = provider.name
+        result['latency'] = time.monotonic() - started
+        return result
+
+    def _discard_late_result(self, future, provider=None):
+        """Kaybeden isteğin geçici dosyasını tamamlandığında sil
+
+        provider verilirse yarışı kaybeden isteğin gerçek sonucu istatistiğe işlenir.
+        """
+        def cleanup(done_future):
+            if provider is not None:
+                self._settle(provider, done_future)
+            if done_future.cancelled() or done_future.exception() is not None:
+                return
+            audio_path = done_future.result().get('audio_path')
+            if audio_path and os.path.exists(audio_path):
+                os.unlink(audio_path)
+        future.add_done_callback(cleanup)
+
+    def _settle(self, provider, future, timed_out=False):
+        """Tamamlanan isteğin sonucunu istatistik ve devre kesiciye işle"""
+        if timed_out:
+            self.stats[provider.name].record(success=False, timeout=True)
+            self.breakers[provider.name].record_failure()
+            return None
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.warning(f"{provider.name} TTS hatası: {str(e)}")
+            self.stats[provider.name].record(success=False)
+            self.breakers[provider.name].record_failure()
+            return None
+        self.stats[provider.name].record(latency=result['latency'])
+        self.breakers[provider.name].record_success()
+        return result
+
+    def synthesize(self, text, language, with_timestamps=False):
+        """Metni ilk sağlıklı sağlayıcıyla sentezle; hedged istek ve süre sınırı uygula
+
+        Süre sınırı çağrının tamamı içindir: hata veren sağlayıcıdan sonra
+        denenen sağlayıcılar kalan süreyi kullanır. Yedek isteğin gönderildiği
+        sağlayıcı aday listesinden çıkarılır; aynı metin aynı sağlayıcıya iki
+        kez gönderilmez.
+        """
+        candidates = [p for p in self.providers if self.breakers[p.name].allow_request()]
+        if not candidates:
+            # Tüm devreler açıksa en yüksek öncelikli sağlayıcıyı yine de dene
+            candidates = self.providers[:1]
+
+        deadline = time.monotonic() + self.deadline_seconds
+        pending = {}
+        primary, hedge_at = None, None
+        while True:
+            # Bekleyen istek kalmadıysa sıradaki sağlayıcı birincil olur
+            while not pending and candidates:
+                provider = candidates.pop(0)
+                future = self._submit(provider, text, language, with_timestamps)
+                if future is None:
+                    logger.warning(f"{provider.name} kapasitesi dolu ({self.max_inflight} bekleyen istek), atlanıyor")
+                    continue
+                primary, pending[future] = provider, provider
+                hedge_delay = self._hedge_delay(provider)
+                hedge_at = time.monotonic() + hedge_delay if hedge_delay is not None else None
+
+            now = time.monotonic()
+            if not pending or now >= deadline:
+                break
+
+            # Birincil istek gecikme yüzdeliğini aşarsa sıradaki sağlayıcıya yedek isteği gönder;
+            # aynı sağlayıcıya yinelenen istek yalnızca yükü artıracağından tek sağlayıcıda yedek yoktur
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if candidates:
+                    hedge_provider = candidates.pop(0)
+                    hedge_future = self._submit(hedge_provider, text, language, with_timestamps)
+                    if hedge_future is not None:
+                        logger.info(f"{primary.name} {hedge_delay:.2f}s eşiğini aştı, {hedge_provider.name} ile yedek istek gönderiliyor")
+                        self.stats[primary.name].record_hedge()
+                        pending[hedge_future] = hedge_provider
+
+            wake_at = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, _ = wait(pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                result = self._settle(provider, future)
+                if result is not None:
+                    if provider is not primary:
+                        self.stats[primary.name].record_hedge_win()
+                    for late_future, late_provider in pending.items():
+                        self._discard_late_result(late_future, late_provider)
+                    return result
+            if done:
+                candidates = [p for p in candidates if self.breakers[p.name].allow_request()]
+
+        # Süre sınırı aşıldı: kalan istekleri zaman aşımı say
+        for late_future, late_provider in pending.items():
+            logger.warning(f"{late_provider.name} {self.deadline_seconds:g}s süre sınırını aştı")
+            self._settle(late_provider, late_future, timed_out=True)
+            self._discard_late_result(late_future)
+
+        raise RuntimeError("Hiçbir TTS sağlayıcısı yanıt vermedi")
+
+    def close(self):
+        """Sağlayıcı havuzlarını beklemeden kapat; kuyruktaki istekler iptal edilir
+
+        Çalışmakta olan çağrılar sağlayıcının kendi HTTP süre sınırıyla biter.
+        """
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        """Sağlayıcı başına istatistik ve devre durumlarını döndür"""
+        with self._inflight_lock:
+            inflight = dict(self._inflight)
+        return {
+            name: dict(stats.as_dict(), circuit=self.breakers[name].state, inflight=inflight[name])
+            for name, stats in self.stats.items()
+        }
@@ -0,0 +1,311 @@
+import sys
+import json
+import struct
+import logging
+from array import array
+
+logger = logging.getLogger(__name__)
+
+TIMING_MAGIC = b'TTRK'
+TIMING_VERSION = 1
+TIMING_SUFFIX = '.ttrk'
+
+_STATUS_CODES = {'error': 0, 'success': 1}
+_STATUS_NAMES = {code: name for name, code in _STATUS_CODES.items()}
+
+
+def _pack_array(values):
+    """array'i little-endian bayt dizisine çevir"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return struct.pack('<I', len(values)) + values.tobytes()
+
+
+def _unpack_array(typecode, buffer, offset):
+    """Bayt dizisinden array oku, (array, yeni offset) döndür"""
+    (count,) = struct.unpack_from('<I', buffer, offset)
+    offset += 4
+    values = array(typecode)
+    size = count * values.itemsize
+    values.frombytes(buffer[offset:offset + size])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values, offset + size
+
+
+def _pack_strings(strings):
+    """Metin listesini uzunluk önekli UTF-8 bloğa çevir"""
+    lengths = array('I')
+    encoded = []
+    for text in strings:
+        data = text.encode('utf-8')
+        lengths.append(len(data))
+        encoded.append(data)
+    return _pack_array(lengths) + b''.join(encoded)
+
+
+def _unpack_strings(buffer, offset):
+    lengths, offset = _unpack_array('I', buffer, offset)
+    strings = []
+    for length in lengths:
+        strings.append(bytes(buffer[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return strings, offset
+
+
+class TimingTrack:
+    """Cümle, kelime ve karakter zamanlamalarının sütunlu bellek içi modeli
+
+    Aşamalar arasında bellekte taşınır; diske kompakt ikili formatta yazılır,
+    JSON yalnızca istendiğinde üretilir.
+    """
+
+    __slots__ = (
+        'language', 'audio_file', 'total_duration', 'created_at', 'metadata',
+        'indices', 'starts', 'ends', 'durations', 'statuses', 'texts', 'errors',
+        'word_segments', 'word_starts', 'word_ends', 'word_texts',
+        'char_segments', 'char_starts', 'char_ends', 'chars'
+    )
+
+    def __init__(self, language='', audio_file=None, total_duration=0.0, created_at=None, metadata=None):
+        self.language = language
+        self.audio_file = audio_file
+        self.total_duration = total_duration
+        self.created_at = created_at
+        self.metadata = metadata or {}
+
+        # Cümle sütunları
+        self.indices = array('i')
+        self.starts = array('d')
+        self.ends = array('d')
+        self.durations = array('d')
+        self.statuses = array('b')
+        self.texts = []
+        self.errors = {}
+
+        # Kelime sütunları (word_segments: ait olduğu cümlenin satır numarası)
+        self.word_segments = array('i')
+        self.word_starts = array('d')
+        self.word_ends = array('d')
+        self.word_texts = []
+
+        # Karakter hizalaması sütunları
+        self.char_segments = array('i')
+        self.char_starts = array('d')
+        self.char_ends = array('d')
+        self.chars = []
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def has_word_timing(self):
+        return len(self.word_starts) > 0
+
+    @property
+    def total_segments(self):
+        return len(self.indices)
+
+    def append_segment(self, index, text, start, end, duration, status='success', error=None,
+                       words=None, alignment=None):
+        """Bir cümle satırı ve varsa kelime/karakter zamanlamalarını ekle"""
+        row = len(self.indices)
+        self.indices.append(index)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.durations.append(duration)
+        self.statuses.append(_STATUS_CODES.get(status, 0))
+        self.texts.append(text)
+        if error is not None:
+            self.errors[row] = error
+
+        for word in words or []:
+            self.word_segments.append(row)
+            self.word_starts.append(word['start'])
+            self.word_ends.append(word['end'])
+            self.word_texts.append(word['text'])
+
+        if alignment:
+            for char, c_start, c_end in zip(alignment['characters'],
+                                            alignment['character_start_times_seconds'],
+                                            alignment['character_end_times_seconds']):
+                self.char_segments.append(row)
+                self.char_starts.append(c_start)
+                self.char_ends.append(c_end)
+                self.chars.append(char)
+
+    def is_success(self, row):
+        return self.statuses[row] == _STATUS_CODES['success']
+
+    def words(self):
+        """Tüm kelimeleri {'text', 'start', 'end'} sözlükleri olarak döndür"""
+        return [
+            {'text': text, 'start': start, 'end': end}
+            for text, start, end in zip(self.word_texts, self.word_starts, self.word_ends)
+        ]
+
+    def segment(self, row):
+        """Tek bir cümle satırını eski JSON segment biçiminde döndür"""
+        segment = {
+            'index': self.indices[row],
+            'text': self.texts[row],
+            'start_time': round(self.starts[row], 3),
+            'end_time': round(self.ends[row], 3),
+            'duration': round(self.durations[row], 3),
+            'status': _STATUS_NAMES[self.statuses[row]]
+        }
+        if row in self.errors:
+            segment['error'] = self.errors[row]
+        return segment
+
+    @property
+    def segments(self):
+        """Geriye dönük uyumluluk için segment sözlükleri (kelime/karakter hariç)"""
+        return [self.segment(row) for row in range(len(self.indices))]
+
+    def to_dict(self):
+        """Eski zamanlama JSON biçimine çevir"""
+        segments = self.segments
+
+        for row, text, start, end in zip(self.word_segments, self.word_texts, self.word_starts, self.word_ends):
+            segments[row].setdefault('words', []).append({'text': text, 'start': start, 'end': end})
+
+        for row, char, start, end in zip(self.char_segments, self.chars, self.char_starts, self.char_ends):
+            alignment = segments[row].setdefault('alignment', {
+                'characters': [],
+                'character_start_times_seconds': [],
+                'character_end_times_seconds': []
+            })
+            alignment['characters'].append(char)
+            alignment['character_start_times_seconds'].append(start)
+            alignment['character_end_times_seconds'].append(end)
+
+        data = {
+            'language': self.language,
+            'total_duration': round(self.total_duration, 3),
+            'total_segments': self.total_segments,
+            'audio_file': self.audio_file,
+            'created_at': self.created_at,
+            'has_word_timing': self.has_word_timing,
+            'segments': segments
+        }
+        if self.metadata:
+            data['metadata'] = self.metadata
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Eski zamanlama JSON sözlüğünden model oluştur"""
+        track = cls(
+            language=data.get('language', ''),
+            audio_file=data.get('audio_file'),
+            total_duration=data.get('total_duration', 0.0),
+            created_at=data.get('created_at'),
+            metadata=data.get('metadata')
+        )
+        for segment in data.get('segments', []):
+            track.append_segment(
+                index=segment['index'],
+                text=segment['text'],
+                start=segment['start_time'],
+                end=segment['end_time'],
+                duration=segment['duration'],
+                status=segment.get('status', 'success'),
+                error=segment.get('error'),
+                words=segment.get('words'),
+                alignment=segment.get('alignment')
+            )
+        return track
+
+    def to_bytes(self):
+        """Kompakt ikili biçime serileştir"""
+        header = json.dumps({
+            'language': self.language,
+            'audio_file': self.audio_file,
+            'total_duration': self.total_duration,
+            'created_at': self.created_at,
+            'metadata': self.metadata,
+            'errors': {str(row): error for row, error in self.errors.items()}
+        }, ensure_ascii=False).encode('utf-8')
+
+        parts = [
+            TIMING_MAGIC,
+            struct.pack('<HI', TIMING_VERSION, len(header)),
+            header,
+            _pack_array(self.indices),
+            _pack_array(self.starts),
+            _pack_array(self.ends),
+            _pack_array(self.durations),
+            _pack_array(self.statuses),
+            _pack_strings(self.texts),
+            _pack_array(self.word_segments),
+            _pack_array(self.word_starts),
+            _pack_array(self.word_ends),
+            _pack_strings(self.word_texts),
+            _pack_array(self.char_segments),
+            _pack_array(self.char_starts),
+            _pack_array(self.char_ends),
+            _pack_strings(self.chars)
+        ]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """İkili biçimden model oluştur"""
+        buffer = memoryview(data)
+        if bytes(buffer[:4]) != TIMING_MAGIC:
+            raise ValueError("Geçersiz zamanlama dosyası")
+        version, header_length = struct.unpack_from('<HI', buffer, 4)
+        if version != TIMING_VERSION:
+            raise ValueError(f"Desteklenmeyen zamanlama sürümü: {version}")
+
+        offset = 10
+        header = json.loads(bytes(buffer[offset:offset + header_length]).decode('utf-8'))
+        offset += header_length
+
+        track = cls(
+            language=header['language'],
+            audio_file=header['audio_file'],
+            total_duration=header['total_duration'],
+            created_at=header.get('created_at'),
+            metadata=header.get('metadata')
+        )
+        track.errors = {int(row): error for row, error in header.get('errors', {}).items()}
+
+        track.indices, offset = _unpack_array('i', buffer, offset)
+        track.starts, offset = _unpack_array('d', buffer, offset)
+        track.ends, offset = _unpack_array('d', buffer, offset)
+        track.durations, offset = _unpack_array('d', buffer, offset)
+        track.statuses, offset = _unpack_array('b', buffer, offset)
+        track.texts, offset = _unpack_strings(buffer, offset)
+        track.word_segments, offset = _unpack_array('i', buffer, offset)
+        track.word_starts, offset = _unpack_array('d', buffer, offset)
+        track.word_ends, offset = _unpack_array('d', buffer, offset)
+        track.word_texts, offset = _unpack_strings(buffer, offset)
+        track.char_segments, offset = _unpack_array('i', buffer, offset)
+        track.char_starts, offset = _unpack_array('d', buffer, offset)
+        track.char_ends, offset = _unpack_array('d', buffer, offset)
+        track.chars, offset = _unpack_strings(buffer, offset)
+        return track
+
+    def save(self, path):
+        """İkili biçimde kaydet"""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        return path
+
+    def export_json(self, path):
+        """İstek üzerine JSON biçiminde dışa aktar"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """İkili ya da eski JSON zamanlama dosyasını yükle"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] == TIMING_MAGIC:
+            return cls.from_bytes(data)
+        return cls.from_dict(json.loads(data.decode('utf-8')))
@@ -4,8 +4,6 @@ from gtts import gTTS
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 from pydub.utils import which
-import srt
-from datetime import timedelta
 import re
 from .audio_segmenter import AudioSegmenter
 
@@ -33,9 +31,18 @@ class TTSGenerator:
         
         self.segmenter = AudioSegmenter(output_dir=self.audio_dir)
         
-    def generate_segmented_audio_files(self, translations):
+        # Yalnızca değişen cümleleri yeniden sentezle
+        self.incremental_rebuild = os.getenv('INCREMENTAL_AUDIO_REBUILD', 'false').lower() == 'true'
+        
+    def close(self):
+        """TTS sağlayıcı havuzlarını kapat; takılan istekler çıkışı engellemez"""
+        self.segmenter.close()
+        
+    def generate_segmented_audio_files(self, translations, incremental=None):
         """Her dil için cümle bazlı segmentli ses dosyaları oluştur - ElevenLabs optimize edilmiş"""
         audio_files = {}
+        if incremental is None:
+            incremental = self.incremental_rebuild
         
         # ElevenLabs kullanım durumunu kontrol et
         if self.segmenter.use_elevenlabs:
@@ -57,21 +64,26 @@ class TTSGenerator:
                 segmentation_result = self.segmenter.create_segmented_audio_with_timing(
                     sentences=sentences,
                     language=lang_code,
-                    output_filename_base='audio'
+                    output_filename_base='audio',
+                    incremental=incremental
                 )
                 
                 audio_files[lang_code] = {
                     'path': segmentation_result['audio_path'],
+                    'timing': segmentation_result['timing'],
+                    'timing_path': segmentation_result['timing_path'],
                     'json_path': segmentation_result['json_path'],
                     'duration': segmentation_result['total_duration'],
                     'segments': segmentation_result['segments'],
                     'language': lang_code,
                     'total_segments': len(segmentation_result['segments']),
+                    'has_word_timing': segmentation_result['has_word_timing'],
+                    'loudness': segmentation_result['timing'].metadata.get('loudness'),
                     'tts_engine': 'ElevenLabs' if self.segmenter.use_elevenlabs else 'Google TTS'
                 }
                 
                 logger.info(f"[BASARILI] {lang_code.upper()} segmentli ses dosyası oluşturuldu: {segmentation_result['audio_path']}")
-                logger.info(f"[JSON] {lang_code.upper()} zamanlama JSON'u: {segmentation_result['json_path']}")
+                logger.info(f"[ZAMANLAMA] {lang_code.upper()} zamanlama dosyası: {segmentation_result['timing_path']}")
                 logger.info(f"[SURE] {lang_code.upper()} toplam süre: {segmentation_result['total_duration']:.2f} saniye")
                 
             except Exception as e:
@@ -82,6 +94,7 @@ class TTSGenerator:
         total_duration = sum(audio['duration'] for audio in audio_files.values())
         logger.info(f"[TTS] Toplam {len(audio_files)} dil için ses dosyaları oluşturuldu")
         logger.info(f"[SURE] Toplam ses süresi: {total_duration:.2f} saniye")
+        logger.info(f"[TTS] Sağlayıcı istatistikleri: {self.segmenter.get_provider_stats()}")
         
         return audio_files
     
@@ -93,18 +106,19 @@ class TTSGenerator:
             try:
                 logger.info(f"{lang_code} için mükemmel senkronize altyazı oluşturuluyor...")
                 
-                json_path = audio_data['json_path']
+                timing = audio_data['timing']
                 
-                # Altyazı dosyası oluştur
+                # Altyazı dosyası oluştur (zamanlama bellekte aktarılır)
                 subtitle_path = os.path.join(self.subtitle_dir, f'subtitle_{lang_code}.srt')
-                self.segmenter.create_synchronized_subtitles_from_json(json_path, subtitle_path)
+                self.segmenter.create_synchronized_subtitles_from_timing(timing, subtitle_path)
                 
                 # Mükemmel senkronizasyon kalitesini doğrula
-                validation = self.segmenter.validate_perfect_synchronization(json_path)
+                validation = self.segmenter.validate_perfect_synchronization(timing=timing)
                 
                 subtitle_files[lang_code] = {
                     'path': subtitle_path,
-                    'json_path': json_path,
+                    'timing_path': audio_data['timing_path'],
+                    'json_path': audio_data['json_path'],
                     'language': lang_code,
                     'total_segments': audio_data['total_segments'],
                     'synchronization_quality': validation,
@@ -128,8 +142,10 @@ class TTSGenerator:
         """Belirli bir dil için zamanlama verilerini al"""
         try:
             if lang_code in audio_files:
-                json_path = audio_files[lang_code]['json_path']
-                return self.segmenter.get_timing_data(json_path)
+                audio_data = audio_files[lang_code]
+                if audio_data.get('timing') is not None:
+                    return audio_data['timing']
+                return self.segmenter.get_timing_data(audio_data['timing_path'])
             return None
         except Exception as e:
             logger.error(f"{lang_code} zamanlama verisi alma hatası: {str(e)}")
@@ -142,13 +158,16 @@ class TTSGenerator:
             timing_data[lang_code] = self.get_timing_data(lang_code, audio_files)
         return timing_data
     
-    def create_complete_audio_package(self, translations):
-        """Tüm diller için ses, altyazı ve zamanlama verilerini içeren tam paket oluştur"""
+    def create_complete_audio_package(self, translations, incremental=None):
+        """Tüm diller için ses, altyazı ve zamanlama verilerini içeren tam paket oluştur
+
+        incremental=True ise yalnızca değişen cümleler sentezlenip mevcut ses dosyasına eklenir.
+        """
         try:
             logger.info("Tüm diller için tam ses paketi oluşturuluyor...")
             
             # Segmentli ses dosyaları oluştur
-            audio_files = self.generate_segmented_audio_files(translations)
+            audio_files = self.generate_segmented_audio_files(translations, incremental=incremental)
             
             # Mükemmel senkronize altyazılar oluştur
             subtitle_files = self.generate_perfect_synchronized_subtitles(audio_files)
@@ -0,0 +1,199 @@
+import os
+import base64
+import logging
+import math
+import wave
+import struct
+from gtts import gTTS
+
+logger = logging.getLogger(__name__)
+
+
+def words_from_alignment(alignment, offset=0.0):
+    """Karakter hizalamasından kelime zamanlamalarını çıkar"""
+    words = []
+    if not alignment:
+        return words
+
+    characters = alignment.get('characters', [])
+    starts = alignment.get('character_start_times_seconds', [])
+    ends = alignment.get('character_end_times_seconds', [])
+
+    current_text = ''
+    current_start = None
+    current_end = None
+
+    for char, start, end in zip(characters, starts, ends):
+        if char.isspace():
+            if current_text:
+                words.append({
+                    'text': current_text,
+                    'start': round(current_start + offset, 3),
+                    'end': round(current_end + offset, 3)
+                })
+            current_text = ''
+            current_start = None
+            continue
+
+        if current_start is None:
+            current_start = start
+        current_text += char
+        current_end = end
+
+    if current_text:
+        words.append({
+            'text': current_text,
+            'start': round(current_start + offset, 3),
+            'end': round(current_end + offset, 3)
+        })
+
+    return words
+
+
+def shift_alignment(alignment, offset):
+    """Karakter hizalamasını birleşik ses dosyasındaki konuma kaydır"""
+    if not alignment:
+        return None
+    return {
+        'characters': list(alignment.get('characters', [])),
+        'character_start_times_seconds': [
+            round(t + offset, 3) for t in alignment.get('character_start_times_seconds', [])
+        ],
+        'character_end_times_seconds': [
+            round(t + offset, 3) for t in alignment.get('character_end_times_seconds', [])
+        ]
+    }
+
+
+def request_timeout():
+    """Sağlayıcı HTTP isteklerinin süre sınırı (saniye)"""
+    return float(os.getenv('TTS_REQUEST_TIMEOUT_SECONDS', '60'))
+
+
+class GTTSProvider:
+    """Google TTS sağlayıcısı (zaman damgası desteği yok)"""
+
+    name = 'gtts'
+    audio_suffix = '.mp3'
+    supports_timestamps = False
+
+    def __init__(self, timeout=None):
+        # HTTP isteği süre sınırı; takılan çağrı yönlendiricinin iş parçacığını süresiz tutmaz
+        self.timeout = timeout or request_timeout()
+
+    def synthesize(self, text, language, output_path, with_timestamps=False):
+        """Metni sese çevir ve dosyaya kaydet"""
+        tts = gTTS(text=text, lang=language, slow=False, timeout=self.timeout)
+        tts.save(output_path)
+        return {'audio_path': output_path, 'alignment': None}
+
+
+class ElevenLabsProvider:
+    """ElevenLabs TTS sağlayıcısı (text-to-speech-with-timestamps destekli)"""
+
+    name = 'elevenlabs'
+    audio_suffix = '.mp3'
+    supports_timestamps = True
+
+    def __init__(self, client, voice_id, model_id="eleven_multilingual_v2", output_format="mp3_44100_128",
+                 timeout=None):
+        self.client = client
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.output_format = output_format
+        self.request_options = {'timeout_in_seconds': int(math.ceil(timeout or request_timeout()))}
+
+    def synthesize(self, text, language, output_path, with_timestamps=False):
+        """Metni sese çevir; istenirse karakter hizalamasını da döndür"""
+        if with_timestamps:
+            response = self.client.text_to_speech.convert_with_timestamps(
+                text=text,
+                voice_id=self.voice_id,
+                model_id=self.model_id,
+                output_format=self.output_format,
+                request_options=self.request_options
+            )
+            with open(output_path, 'wb') as f:
+                f.write(base64.b64decode(response.audio_base_64))
+
+            alignment = None
+            if response.alignment is not None:
+                alignment = {
+                    'characters': list(response.alignment.characters),
+                    'character_start_times_seconds': list(response.alignment.character_start_times_seconds),
+                    'character_end_times_seconds': list(response.alignment.character_end_times_seconds)
+                }
+            return {'audio_path': output_path, 'alignment': alignment}
+
+        audio_generator = self.client.text_to_speech.convert(
+            text=text,
+            voice_id=self.voice_id,
+            model_id=self.model_id,
+            output_format=self.output_format,
+            request_options=self.request_options
+        )
+        # Generator'dan bytes verisini topla ve dosyaya kaydet
+        with open(output_path, 'wb') as f:
+            for chunk in audio_generator:
+                if chunk:
+                    f.write(chunk)
+        return {'audio_path': output_path, 'alignment': None}
+
+
+class FakeTTSProvider:
+    """Testler için yerel sahte TTS sağlayıcısı
+
+    Ağ erişimi olmadan, karakter başına sabit süreli WAV dosyası üretir ve
+    ElevenLabs formatında karakter hizalaması döndürür.
+    """
+
+    name = 'fake'
+    audio_suffix = '.wav'
+    supports_timestamps = True
+
+    def __init__(self, char_duration=0.06, sample_rate=22050, frequency=220.0):
+        self.char_duration = char_duration
+        self.sample_rate = sample_rate
+        self.frequency = frequency
+
+    def synthesize(self, text, language, output_path, with_timestamps=False):
+        """Metin uzunluğuna göre ton üret; boşluk karakterleri sessiz kalır"""
+        samples_per_char = int(self.char_duration * self.sample_rate)
+        frames = bytearray()
+        starts = []
+        ends = []
+
+        for i, char in enumerate(text):
+            starts.append(round(i * self.char_duration, 3))
+            ends.append(round((i + 1) * self.char_duration, 3))
+            amplitude = 0 if char.isspace() else 8000
+            for n in range(samples_per_char):
+                value = int(amplitude * math.sin(2 * math.pi * self.frequency * n / self.sample_rate))
+                frames += struct.pack('<h', value)
+
+        with wave.open(output_path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(bytes(frames))
+
+        alignment = None
+        if with_timestamps:
+            alignment = {
+                'characters': list(text),
+                'character_start_times_seconds': starts,
+                'character_end_times_seconds': ends
+            }
+        return {'audio_path': output_path, 'alignment': alignment}
+
+
+def create_provider(name, elevenlabs_client=None, voice_id=None):
+    """İsme göre TTS sağlayıcısı oluştur"""
+    name = (name or '').lower()
+    if name == 'fake':
+        return FakeTTSProvider(char_duration=float(os.getenv('FAKE_TTS_CHAR_DURATION', '0.06')))
+    if name == 'elevenlabs':
+        if elevenlabs_client is None:
+            raise ValueError("ElevenLabs istemcisi yapılandırılmamış")
+        return ElevenLabsProvider(elevenlabs_client, voice_id)
+    return GTTSProvider()
@@ -0,0 +1,161 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from fractions import Fraction
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+
+def parse_rational(value, default=0.0):
+    """'30000/1001' gibi ffprobe oranlarını güvenli şekilde float'a çevir"""
+    try:
+        if value in (None, '', '0/0'):
+            return default
+        return float(Fraction(str(value)))
+    except (ValueError, ZeroDivisionError):
+        return default
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """ffprobe sonucunun tipli özeti"""
+    path: str
+    duration: float
+    size: int
+    format_name: str = ''
+    bit_rate: int = 0
+    video_codec: str = None
+    audio_codec: str = None
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    pix_fmt: str = None
+    video_profile: str = None
+    sample_rate: int = 0
+    channels: int = 0
+    audio_bit_rate: int = 0
+    streams: list = field(default_factory=list)
+
+    @property
+    def has_video(self):
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self):
+        return self.audio_codec is not None
+
+    @classmethod
+    def from_probe(cls, path, probe, size):
+        """ffmpeg.probe çıktısından MediaInfo oluştur"""
+        streams = probe.get('streams', [])
+        fmt = probe.get('format', {})
+        video_stream = next((s for s in streams if s.get('codec_type') == 'video'), None)
+        audio_stream = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+        duration = float(fmt.get('duration') or 0.0)
+        if not duration:
+            for stream in streams:
+                duration = max(duration, float(stream.get('duration') or 0.0))
+
+        info = {
+            'path': path,
+            'duration': duration,
+            'size': size,
+            'format_name': fmt.get('format_name', ''),
+            'bit_rate': int(fmt.get('bit_rate') or 0),
+            'streams': streams
+        }
+        if video_stream is not None:
+            info.update({
+                'video_codec': video_stream.get('codec_name'),
+                'width': int(video_stream.get('width') or 0),
+                'height': int(video_stream.get('height') or 0),
+                'fps': parse_rational(video_stream.get('avg_frame_rate')) or parse_rational(video_stream.get('r_frame_rate')),
+                'pix_fmt': video_stream.get('pix_fmt'),
+                'video_profile': video_stream.get('profile')
+            })
+        if audio_stream is not None:
+            info.update({
+                'audio_codec': audio_stream.get('codec_name'),
+                'sample_rate': int(audio_stream.get('sample_rate') or 0),
+                'channels': int(audio_stream.get('channels') or 0),
+                'audio_bit_rate': int(audio_stream.get('bit_rate') or 0)
+            })
+        return cls(**info)
+
+
+class MediaProbe:
+    """(path, size, mtime) anahtarlı, bellek içi ve disk önbellekli medya probe servisi"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.getenv('MEDIA_PROBE_CACHE_DIR', 'data/cache/probe')
+        self._memory_cache = {}
+        self._lock = threading.Lock()
+
+    def _cache_key(self, path):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    def _disk_cache_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def probe(self, path):
+        """Dosyayı probe et; aynı içerik için önbellekten döndür"""
+        key = self._cache_key(path)
+
+        with self._lock:
+            cached = self._memory_cache.get(key)
+        if cached is not None:
+            return cached
+
+        disk_path = self._disk_cache_path(key)
+        raw_probe = None
+        if os.path.exists(disk_path):
+            try:
+                with open(disk_path, 'r', encoding='utf-8') as f:
+                    raw_probe = json.load(f)
+            except Exception as e:
+                logger.warning(f"Probe önbelleği okunamadı, yeniden probe ediliyor: {str(e)}")
+
+        if raw_probe is None:
+            raw_probe = ffmpeg.probe(path)
+            try:
+                # Klasör ilk yazımda oluşturulur; salt okuma kullanımları iz bırakmaz
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(disk_path, 'w', encoding='utf-8') as f:
+                    json.dump(raw_probe, f)
+            except Exception as e:
+                logger.warning(f"Probe önbelleği yazılamadı: {str(e)}")
+
+        info = MediaInfo.from_probe(path, raw_probe, key[1])
+        with self._lock:
+            self._memory_cache[key] = info
+        return info
+
+    def duration(self, path):
+        """Medya süresini saniye cinsinden döndür"""
+        return self.probe(path).duration
+
+    def clear(self):
+        """Bellek içi önbelleği temizle"""
+        with self._lock:
+            self._memory_cache.clear()
+
+
+_shared_probe = None
+_shared_probe_lock = threading.Lock()
+
+
+def get_media_probe():
+    """Süreç genelinde paylaşılan MediaProbe örneğini döndür"""
+    global _shared_probe
+    with _shared_probe_lock:
+        if _shared_probe is None:
+            _shared_probe = MediaProbe()
+        return _shared_probe
+
@@ -0,0 +1 @@
+# Subtitle I/O module
\ No newline at end of file
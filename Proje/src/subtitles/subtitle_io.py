@@ -0,0 +1,258 @@
+import os
+import re
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tek geçişte tüm blokları yakalayan SRT/VTT deseni (zaman kodunda ',' ya da '.';
+# WebVTT'de saat alanı isteğe bağlıdır: '00:01.000')
+_CUE_PATTERN = re.compile(
+    r'(?:^|\n)(?:(\d+)[ \t]*\n)?'
+    r'[ \t]*(?:(\d+):)?(\d{2}):(\d{2})[,.](\d{3})[ \t]*-->'
+    r'[ \t]*(?:(\d+):)?(\d{2}):(\d{2})[,.](\d{3})[^\n]*\n'
+    r'(.*?)(?=\n[ \t]*\n|\Z)',
+    re.DOTALL
+)
+_BLOCK_SEPARATOR = re.compile(r'\n[ \t]*\n')
+
+DEFAULT_ASS_STYLE = {
+    'Fontname': 'Arial',
+    'Fontsize': 22,
+    'PrimaryColour': '&H00FFFFFF',
+    'SecondaryColour': '&H00FFFFFF',
+    'OutlineColour': '&H00000000',
+    'BackColour': '&H80000000',
+    'Outline': 2,
+    'Shadow': 1,
+    'Alignment': 2,
+    'MarginV': 30
+}
+
+
+def seconds_to_ms(seconds):
+    """Saniyeyi (skaler ya da dizi) en yakın tamsayı milisaniyeye çevir"""
+    return np.rint(np.asarray(seconds, dtype=np.float64) * 1000.0).astype(np.int64)
+
+
+def format_timestamp(ms, separator=','):
+    """Tamsayı milisaniyeyi 'SS:DD:ss,mmm' biçimine çevir"""
+    ms = max(int(ms), 0)
+    seconds, millis = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return '%02d:%02d:%02d%s%03d' % (hours, minutes, seconds, separator, millis)
+
+
+def format_srt_time(seconds):
+    """Saniyeyi SRT zaman biçimine çevir"""
+    return format_timestamp(seconds_to_ms(seconds), ',')
+
+
+def parse_timestamp(value):
+    """'SS:DD:ss,mmm' ya da 'DD:ss.mmm' zaman kodunu tamsayı milisaniyeye çevir"""
+    time_part, _, millis = value.strip().replace('.', ',').partition(',')
+    hours, minutes, seconds = ([0] + [int(part) for part in time_part.split(':')])[-3:]
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + int(millis or 0)
+
+
+def _split_timestamps(ms):
+    """Milisaniye dizisini saat, dakika, saniye, milisaniye sütunlarına ayır"""
+    ms = np.maximum(ms, 0)
+    return ms // 3600000, (ms // 60000) % 60, (ms // 1000) % 60, ms % 1000
+
+
+def _pack_texts(texts):
+    """Metinleri tek metin bloğuna ve (n + 1) uzunluklu ofset dizisine dönüştür"""
+    texts = [text.strip() for text in texts]
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return ''.join(texts), offsets
+
+
+class SubtitleTrack:
+    """Altyazıların sütunlu bellek içi modeli
+
+    Zamanlar tamsayı milisaniye dizilerinde, metinler tek bir metin bloğunda
+    ofset dizisiyle tutulur. SRT/VTT tek geçişte ayrıştırılır; SRT, WebVTT
+    ve ASS biçimlerine yazılır.
+    """
+
+    __slots__ = ('indices', 'start_ms', 'end_ms', 'text_blob', 'text_offsets')
+
+    def __init__(self, indices, start_ms, end_ms, text_blob, text_offsets):
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.start_ms = np.asarray(start_ms, dtype=np.int64)
+        self.end_ms = np.asarray(end_ms, dtype=np.int64)
+        self.text_blob = text_blob
+        self.text_offsets = np.asarray(text_offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.start_ms)
+
+    @classmethod
+    def from_cues(cls, starts, ends, texts, indices=None):
+        """Saniye cinsinden zamanlar ve metin listesinden model oluştur"""
+        text_blob, text_offsets = _pack_texts(texts)
+        if indices is None:
+            indices = np.arange(1, len(text_offsets))
+        return cls(indices, seconds_to_ms(starts), seconds_to_ms(ends), text_blob, text_offsets)
+
+    @classmethod
+    def from_dicts(cls, subtitles):
+        """{'index', 'start', 'end', 'text'} sözlük listesinden model oluştur"""
+        return cls.from_cues(
+            [subtitle['start'] for subtitle in subtitles],
+            [subtitle['end'] for subtitle in subtitles],
+            [subtitle['text'] for subtitle in subtitles],
+            [subtitle.get('index', i + 1) for i, subtitle in enumerate(subtitles)]
+        )
+
+    @classmethod
+    def parse(cls, content):
+        """SRT ya da WebVTT içeriğini tek geçişte ayrıştır"""
+        content = content.lstrip('﻿').replace('\r\n', '\n').replace('\r', '\n')
+
+        matches = _CUE_PATTERN.findall(content)
+
+        # Zaman kodu içerip desene uymayan bloklar sessizce kaybolmasın
+        cue_blocks = sum(1 for block in _BLOCK_SEPARATOR.split(content) if '-->' in block)
+        if cue_blocks > len(matches):
+            logger.warning(f"Altyazı ayrıştırma: {cue_blocks - len(matches)} blok zaman kodu okunamadığı için atlandı")
+
+        if not matches:
+            return cls([], [], [], '', [0])
+
+        # Sayısal grupları tek seferde diziye çevir (eksik saat alanı 0)
+        numbers = np.array([[group or 0 for group in match[1:9]] for match in matches], dtype=np.int64)
+        start_ms = ((numbers[:, 0] * 60 + numbers[:, 1]) * 60 + numbers[:, 2]) * 1000 + numbers[:, 3]
+        end_ms = ((numbers[:, 4] * 60 + numbers[:, 5]) * 60 + numbers[:, 6]) * 1000 + numbers[:, 7]
+        indices = np.array([int(match[0]) if match[0] else i + 1 for i, match in enumerate(matches)], dtype=np.int64)
+
+        text_blob, text_offsets = _pack_texts(match[9] for match in matches)
+        return cls(indices, start_ms, end_ms, text_blob, text_offsets)
+
+    @classmethod
+    def read(cls, path):
+        """SRT ya da VTT dosyasını oku"""
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return cls.parse(f.read())
+
+    @property
+    def starts(self):
+        """Başlangıç zamanları (saniye)"""
+        return self.start_ms / 1000.0
+
+    @property
+    def ends(self):
+        """Bitiş zamanları (saniye)"""
+        return self.end_ms / 1000.0
+
+    @property
+    def durations(self):
+        return (self.end_ms - self.start_ms) / 1000.0
+
+    def text(self, row):
+        return self.text_blob[self.text_offsets[row]:self.text_offsets[row + 1]]
+
+    def texts(self):
+        offsets = self.text_offsets.tolist()
+        return [self.text_blob[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+    def text_lengths(self):
+        """Altyazı başına karakter sayısı (ofsetlerden, metin okunmadan)"""
+        return np.diff(self.text_offsets)
+
+    def with_times(self, starts, ends):
+        """Aynı metinlerle, saniye cinsinden yeni zamanlara sahip kopya döndür"""
+        return SubtitleTrack(self.indices, seconds_to_ms(starts), seconds_to_ms(ends),
+                             self.text_blob, self.text_offsets)
+
+    def with_millis(self, start_ms, end_ms):
+        """Aynı metinlerle, milisaniye cinsinden yeni zamanlara sahip kopya döndür"""
+        return SubtitleTrack(self.indices, start_ms, end_ms, self.text_blob, self.text_offsets)
+
+    def with_texts(self, texts):
+        """Aynı zamanlarla, yeni metinlere sahip kopya döndür"""
+        text_blob, text_offsets = _pack_texts(texts)
+        return SubtitleTrack(self.indices, self.start_ms, self.end_ms, text_blob, text_offsets)
+
+    def take(self, rows):
+        """Verilen satırlardan (sıra ya da maske) oluşan alt parça döndür"""
+        texts = self.texts()
+        rows = np.arange(len(self))[rows]
+        text_blob, text_offsets = _pack_texts(texts[row] for row in rows.tolist())
+        return SubtitleTrack(self.indices[rows], self.start_ms[rows], self.end_ms[rows], text_blob, text_offsets)
+
+    def to_dicts(self):
+        """Eski {'index', 'start', 'end', 'text'} sözlük listesi biçimine çevir"""
+        return [
+            {'index': index, 'start': start, 'end': end, 'text': text}
+            for index, start, end, text in zip(self.indices.tolist(), self.starts.tolist(),
+                                               self.ends.tolist(), self.texts())
+        ]
+
+    def _cue_lines(self, separator, renumber):
+        start_columns = [column.tolist() for column in _split_timestamps(self.start_ms)]
+        end_columns = [column.tolist() for column in _split_timestamps(self.end_ms)]
+        indices = range(1, len(self) + 1) if renumber else self.indices.tolist()
+        template = '%d\n%02d:%02d:%02d' + separator + '%03d --> %02d:%02d:%02d' + separator + '%03d\n%s\n'
+        return [
+            template % (index, sh, sm, ss, sms, eh, em, es, ems, text)
+            for index, sh, sm, ss, sms, eh, em, es, ems, text in zip(
+                indices, *start_columns, *end_columns, self.texts()
+            )
+        ]
+
+    def to_srt(self, renumber=False):
+        """SRT metni üret"""
+        return '\n'.join(self._cue_lines(',', renumber))
+
+    def to_vtt(self):
+        """WebVTT metni üret"""
+        return 'WEBVTT\n\n' + '\n'.join(self._cue_lines('.', True))
+
+    def to_ass(self, style=None, play_res=(1280, 720)):
+        """ASS (Advanced SubStation Alpha) metni üret"""
+        style = dict(DEFAULT_ASS_STYLE, **(style or {}))
+        header = [
+            '[Script Info]',
+            'ScriptType: v4.00+',
+            f'PlayResX: {play_res[0]}',
+            f'PlayResY: {play_res[1]}',
+            '',
+            '[V4+ Styles]',
+            'Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, '
+            'Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, '
+            'Shadow, Alignment, MarginL, MarginR, MarginV, Encoding',
+            'Style: Default,{Fontname},{Fontsize},{PrimaryColour},{SecondaryColour},{OutlineColour},'
+            '{BackColour},0,0,0,0,100,100,0,0,1,{Outline},{Shadow},{Alignment},10,10,{MarginV},1'.format(**style),
+            '',
+            '[Events]',
+            'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text'
+        ]
+
+        # ASS zaman kodu santisaniye hassasiyetindedir
+        start_columns = [column.tolist() for column in _split_timestamps(self.start_ms)]
+        end_columns = [column.tolist() for column in _split_timestamps(self.end_ms)]
+        events = [
+            'Dialogue: 0,%d:%02d:%02d.%02d,%d:%02d:%02d.%02d,Default,,0,0,0,,%s'
+            % (sh, sm, ss, sms // 10, eh, em, es, ems // 10, text.replace('\n', '\\N'))
+            for sh, sm, ss, sms, eh, em, es, ems, text in zip(*start_columns, *end_columns, self.texts())
+        ]
+        return '\n'.join(header + events) + '\n'
+
+    def write(self, path, subtitle_format=None, **kwargs):
+        """Dosya uzantısına (ya da subtitle_format) göre SRT, VTT ya da ASS yaz"""
+        subtitle_format = (subtitle_format or os.path.splitext(path)[1].lstrip('.') or 'srt').lower()
+        if subtitle_format == 'vtt':
+            content = self.to_vtt()
+        elif subtitle_format in ('ass', 'ssa'):
+            content = self.to_ass(**kwargs)
+        else:
+            content = self.to_srt(**kwargs)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
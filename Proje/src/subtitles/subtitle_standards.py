@@ -0,0 +1,237 @@
+import os
+import logging
+import textwrap
+import numpy as np
+from dataclasses import dataclass, field
+from .subtitle_io import SubtitleTrack, _pack_texts
+
+logger = logging.getLogger(__name__)
+
+_NEWLINE = ord('\n')
+
+
+@dataclass(frozen=True)
+class SubtitleStandards:
+    """Altyazı kalite kuralları (varsayılanlar Netflix zamanlama kurallarıdır)"""
+    min_duration_ms: int = 833     # 20 kare @ 24fps
+    max_duration_ms: int = 7000
+    min_gap_ms: int = 125          # 3 kare @ 24fps
+    max_chars_per_second: float = 17.0
+    max_line_length: int = 42
+    max_lines: int = 2
+    max_shift_ms: int = 500        # Otomatik düzeltmede bir başlangıcın en fazla ileri kayması
+
+    @classmethod
+    def from_env(cls):
+        """Kuralları ortam değişkenlerinden oku"""
+        return cls(
+            min_duration_ms=int(float(os.getenv('SUBTITLE_MIN_DURATION', '0.833')) * 1000),
+            max_duration_ms=int(float(os.getenv('SUBTITLE_MAX_DURATION', '7.0')) * 1000),
+            min_gap_ms=int(float(os.getenv('SUBTITLE_MIN_GAP', '0.125')) * 1000),
+            max_chars_per_second=float(os.getenv('SUBTITLE_MAX_CPS', '17')),
+            max_line_length=int(os.getenv('SUBTITLE_MAX_LINE_LENGTH', '42')),
+            max_lines=int(os.getenv('SUBTITLE_MAX_LINES', '2')),
+            max_shift_ms=int(float(os.getenv('SUBTITLE_MAX_SHIFT', '0.5')) * 1000)
+        )
+
+
+NETFLIX_STANDARDS = SubtitleStandards()
+
+
+@dataclass
+class StandardsReport:
+    """Doğrulama sonucu: kural başına ihlal eden satırlar ve özet oranlar
+
+    validity_ratio eski doğrulama puanlamasını korur: süre kuralına uyan
+    altyazılar, her boşluk ihlali için 0.5 penaltı. Okuma hızı ve satır
+    kuralları raporlanır ancak puana katılmaz.
+    """
+    total: int
+    violations: dict = field(default_factory=dict)
+    validity_ratio: float = 0.0
+    sync_ratio: float = None
+    min_validity: float = 0.80
+    min_sync_ratio: float = 0.95
+
+    @property
+    def passed(self):
+        if self.total == 0:
+            return False
+        if self.sync_ratio is not None and self.sync_ratio < self.min_sync_ratio:
+            return False
+        return self.validity_ratio >= self.min_validity
+
+    def counts(self):
+        return {rule: int(len(rows)) for rule, rows in self.violations.items()}
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'passed': self.passed,
+            'validity_ratio': self.validity_ratio,
+            'sync_ratio': self.sync_ratio,
+            'violations': {rule: rows.tolist() for rule, rows in self.violations.items()}
+        }
+
+    def summary(self):
+        counts = ', '.join(f"{rule}={count}" for rule, count in self.counts().items() if count)
+        return f"{self.total} altyazı, uyum {self.validity_ratio:.2%}" + (f" ({counts})" if counts else '')
+
+
+def line_statistics(track):
+    """Altyazı başına satır sayısı, en uzun satır ve satır sonu hariç karakter sayısı
+
+    Metin bloğu kod noktası dizisine çevrilir; satır sınırları satır sonları
+    ile altyazı ofsetlerinin birleşimidir ve tüm satırlar tek seferde ölçülür.
+    """
+    cue_count = len(track)
+    if cue_count == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    codepoints = np.frombuffer(track.text_blob.encode('utf-32-le'), dtype=np.uint32)
+    newlines = np.flatnonzero(codepoints == _NEWLINE)
+    # Satır sonunun ait olduğu altyazı
+    newline_cues = np.searchsorted(track.text_offsets, newlines, side='right') - 1
+    newline_counts = np.bincount(newline_cues, minlength=cue_count)
+
+    # Satır başlangıçları: altyazı başları ve satır sonlarından sonraki konumlar
+    line_starts = np.concatenate((track.text_offsets[:-1], newlines + 1))
+    line_ends = np.concatenate((track.text_offsets[1:], newlines))
+    line_cues = np.concatenate((np.arange(cue_count), newline_cues))
+    order = np.lexsort((line_starts, line_cues))
+    line_starts, line_cues = line_starts[order], line_cues[order]
+    # Bir satırın sonu: aynı altyazıdaki bir sonraki satır sonu ya da altyazı sonu
+    line_ends = np.sort(line_ends)
+
+    line_lengths = line_ends - line_starts
+    longest = np.zeros(cue_count, dtype=np.int64)
+    np.maximum.at(longest, line_cues, line_lengths)
+
+    characters = track.text_lengths() - newline_counts
+    return newline_counts + 1, longest, characters
+
+
+def validate_track(track, standards=NETFLIX_STANDARDS, audio_duration=None):
+    """Tüm kuralları vektörel geçişlerle denetle ve StandardsReport döndür"""
+    total = len(track)
+    if total == 0:
+        return StandardsReport(total=0)
+
+    durations = track.end_ms - track.start_ms
+    gaps = track.start_ms[1:] - track.end_ms[:-1]
+    line_counts, longest_lines, characters = line_statistics(track)
+    reading_speed = characters * 1000.0 / np.maximum(durations, 1)
+
+    violations = {
+        'too_short': np.flatnonzero(durations < standards.min_duration_ms),
+        'too_long': np.flatnonzero(durations > standards.max_duration_ms),
+        # İhlal, boşluktan önceki altyazıya yazılır
+        'gap': np.flatnonzero(gaps < standards.min_gap_ms),
+        'overlap': np.flatnonzero(gaps < 0),
+        'reading_speed': np.flatnonzero(reading_speed > standards.max_chars_per_second),
+        'line_length': np.flatnonzero(longest_lines > standards.max_line_length),
+        'line_count': np.flatnonzero(line_counts > standards.max_lines)
+    }
+
+    valid_durations = total - len(violations['too_short']) - len(violations['too_long'])
+    validity_ratio = (valid_durations - 0.5 * len(violations['gap'])) / total
+
+    sync_ratio = None
+    if audio_duration:
+        last_end = track.end_ms[-1] / 1000.0
+        sync_ratio = min(last_end, audio_duration) / max(last_end, audio_duration)
+
+    return StandardsReport(total=total, violations=violations, validity_ratio=float(validity_ratio),
+                           sync_ratio=sync_ratio)
+
+
+def wrap_text(text, max_line_length):
+    """Satırları kelime sınırlarından max_line_length karakterde böl"""
+    lines = []
+    for line in text.split('\n'):
+        lines.extend(textwrap.wrap(line, max_line_length, break_long_words=False) or [''])
+    return '\n'.join(lines)
+
+
+def merge_dense_cues(track, standards=NETFLIX_STANDARDS):
+    """Bir öncekine (min süre + min boşluk) kadar yakın başlayan altyazıları birleştir
+
+    Birleşen altyazının süresi max süreyi, satır sayısı max satırı aşmaz;
+    sığmayan altyazılar olduğu gibi bırakılır. Track başlangıca göre sıralı olmalıdır.
+    """
+    if len(track) < 2:
+        return track
+
+    spacing = standards.min_duration_ms + standards.min_gap_ms
+    starts, ends = track.start_ms.tolist(), track.end_ms.tolist()
+    line_counts = line_statistics(track)[0].tolist()
+
+    # (ilk satır, son satırdan sonraki, grup bitişi)
+    groups = []
+    first, group_end, group_lines = 0, ends[0], line_counts[0]
+    for row in range(1, len(track)):
+        merged_end = max(group_end, ends[row])
+        if (starts[row] - starts[first] < spacing
+                and merged_end - starts[first] <= standards.max_duration_ms
+                and group_lines + line_counts[row] <= standards.max_lines):
+            group_end, group_lines = merged_end, group_lines + line_counts[row]
+            continue
+        groups.append((first, row, group_end))
+        first, group_end, group_lines = row, ends[row], line_counts[row]
+    groups.append((first, len(track), group_end))
+
+    if len(groups) == len(track):
+        return track
+
+    texts = track.texts()
+    text_blob, text_offsets = _pack_texts('\n'.join(texts[first:last]) for first, last, _ in groups)
+    # Birleşen altyazılar yeniden numaralanır
+    return SubtitleTrack(
+        np.arange(1, len(groups) + 1),
+        track.start_ms[[group[0] for group in groups]],
+        np.array([group[2] for group in groups], dtype=np.int64),
+        text_blob, text_offsets
+    )
+
+
+def fix_track(track, standards=NETFLIX_STANDARDS):
+    """Zamanlama kurallarını tek geçişte uygula, uzun satırları böl; (yeni track, rapor)
+
+    Altyazılar başlangıca göre sıralanır ve sıkışık komşular sınırlar içinde
+    birleştirilir. Ardışık başlangıçlar arasında en az c = (min süre + min
+    boşluk) olmalıdır; s'[i] = max(s[i], s'[i-1] + c) zinciri
+    s'[i] - i*c = cummax(s[i] - i*c) ile tek seferde çözülür, ancak kayma
+    max_shift_ms ile sınırlanır ki yoğun bölümlerde altyazılar sesten
+    kopmasın. Sonra süreler sınırlanır ve her bitiş bir sonraki başlangıçtan
+    min boşluk kadar önceye çekilir; bu yüzden kuralı hâlâ sağlamayan
+    altyazılar kısalır ve raporda ihlal olarak kalır.
+    """
+    if len(track) == 0:
+        return track, validate_track(track, standards)
+
+    order = np.argsort(track.start_ms, kind='stable')
+    if np.any(order != np.arange(len(track))):
+        track = track.take(order)
+    track = merge_dense_cues(track, standards)
+
+    spacing = standards.min_duration_ms + standards.min_gap_ms
+    steps = np.arange(len(track), dtype=np.int64) * spacing
+    pushed = np.maximum.accumulate(track.start_ms - steps) + steps
+    starts = np.maximum(np.minimum(pushed, track.start_ms + standards.max_shift_ms), 0)
+
+    ends = np.clip(track.end_ms, starts + standards.min_duration_ms, starts + standards.max_duration_ms)
+    ends[:-1] = np.minimum(ends[:-1], starts[1:] - standards.min_gap_ms)
+    ends = np.maximum(ends, starts)
+    fixed = track.with_millis(starts, ends)
+
+    # Satır uzunluğu: yalnızca ihlal eden altyazılar yeniden sarılır
+    _, longest_lines, _ = line_statistics(fixed)
+    long_rows = np.flatnonzero(longest_lines > standards.max_line_length)
+    if len(long_rows):
+        texts = fixed.texts()
+        for row in long_rows.tolist():
+            texts[row] = wrap_text(texts[row], standards.max_line_length)
+        fixed = fixed.with_texts(texts)
+
+    return fixed, validate_track(fixed, standards)
@@ -0,0 +1,204 @@
+import logging
+import numpy as np
+from scipy.fft import dct
+from .speech_activity import iter_audio_blocks
+
+logger = logging.getLogger(__name__)
+
+FEATURE_SAMPLE_RATE = 16000
+FEATURE_N_FFT = 512
+FEATURE_HOP_SECONDS = 0.02
+FEATURE_N_MELS = 40
+FEATURE_N_MFCC = 13
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+def mel_filterbank(sample_rate=FEATURE_SAMPLE_RATE, n_fft=FEATURE_N_FFT, n_mels=FEATURE_N_MELS):
+    """Üçgen mel filtre bankası (n_mels x n_fft // 2 + 1)"""
+    bin_freqs = np.linspace(0, sample_rate / 2, n_fft // 2 + 1)
+    mel_points = _mel_to_hz(np.linspace(_hz_to_mel(0.0), _hz_to_mel(sample_rate / 2), n_mels + 2))
+    lower, center, upper = mel_points[:-2, None], mel_points[1:-1, None], mel_points[2:, None]
+    rising = (bin_freqs - lower) / (center - lower)
+    falling = (upper - bin_freqs) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling))
+
+
+def mfcc_features(audio_path, sample_rate=FEATURE_SAMPLE_RATE, hop_seconds=FEATURE_HOP_SECONDS,
+                  n_fft=FEATURE_N_FFT, n_mfcc=FEATURE_N_MFCC, block_seconds=60.0):
+    """Sesi blok blok çözerek MFCC matrisi (kare x katsayı) çıkar
+
+    Kareler blok sınırlarında kesilmez; her bloğun artan örnekleri sonraki
+    bloğa taşınır. Dosya başına ortalama/varyans normalizasyonu uygulanır ki
+    farklı kayıtlar karşılaştırılabilsin.
+    """
+    hop_length = int(round(hop_seconds * sample_rate))
+    window = np.hanning(n_fft).astype(np.float32)
+    filterbank = mel_filterbank(sample_rate, n_fft)
+
+    blocks = []
+    carry = np.zeros(0, dtype=np.float32)
+    for block in iter_audio_blocks(audio_path, sample_rate, block_seconds):
+        buffer = np.concatenate((carry, block))
+        if len(buffer) < n_fft:
+            carry = buffer
+            continue
+
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, n_fft)[::hop_length]
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+        log_mel = np.log(power @ filterbank.T + 1e-10)
+        blocks.append(dct(log_mel, type=2, axis=1, norm='ortho')[:, :n_mfcc])
+        carry = buffer[len(frames) * hop_length:]
+
+    if not blocks:
+        return np.zeros((0, n_mfcc))
+
+    features = np.concatenate(blocks)
+    features -= features.mean(axis=0)
+    features /= features.std(axis=0) + 1e-8
+    return features
+
+
+def _frame_costs(reference, target, row, lo, hi):
+    """Referans karesi ile hedef pencere kareleri arasındaki Öklid uzaklıkları"""
+    return np.sqrt(np.square(target[lo:hi + 1] - reference[row]).sum(axis=1))
+
+
+def _windowed_dtw(reference, target, lows, highs):
+    """Satır başına [lo, hi] pencereleriyle DTW; yalnızca pencere içi maliyetler tutulur
+
+    Satır içindeki yatay bağımlılık D[j] = c[j] + min(A[j], D[j-1]) önek
+    toplamı ve kümülatif minimumla vektörel çözülür:
+    D[j] = S[j] + min_k<=j(A[k] - S[k-1]).
+    """
+    rows = len(reference)
+    costs = []
+
+    prev = None
+    prev_lo = prev_hi = 0
+    for i in range(rows):
+        lo, hi = lows[i], highs[i]
+        local = _frame_costs(reference, target, i, lo, hi)
+
+        if prev is None:
+            # İlk satırda yalnızca yatay ilerleme mümkün
+            accumulated = np.cumsum(local)
+        else:
+            columns = np.arange(lo, hi + 1)
+            # Üst (i-1, j) ve çapraz (i-1, j-1) komşularının minimumu
+            up = np.full(len(columns), np.inf)
+            overlap = (columns >= prev_lo) & (columns <= prev_hi)
+            up[overlap] = prev[columns[overlap] - prev_lo]
+            diag = np.full(len(columns), np.inf)
+            valid = (columns - 1 >= prev_lo) & (columns - 1 <= prev_hi)
+            diag[valid] = prev[columns[valid] - 1 - prev_lo]
+            entry = np.minimum(up, diag)
+
+            prefix = np.cumsum(local)
+            accumulated = prefix + np.minimum.accumulate(entry - (prefix - local))
+
+        costs.append(accumulated)
+        prev, prev_lo, prev_hi = accumulated, lo, hi
+
+    # Geri izleme: (rows-1, cols-1) noktasından (0, 0)'a
+    path = []
+    i, j = rows - 1, highs[-1]
+    while True:
+        path.append((i, j))
+        if i == 0 and j == lows[0]:
+            break
+        candidates = []
+        if i > 0:
+            prev_costs, p_lo, p_hi = costs[i - 1], lows[i - 1], highs[i - 1]
+            if p_lo <= j - 1 <= p_hi:
+                candidates.append((prev_costs[j - 1 - p_lo], i - 1, j - 1))
+            if p_lo <= j <= p_hi:
+                candidates.append((prev_costs[j - p_lo], i - 1, j))
+        if j - 1 >= lows[i]:
+            candidates.append((costs[i][j - 1 - lows[i]], i, j - 1))
+        _, i, j = min(candidates)
+
+    path.reverse()
+    return np.array(path, dtype=np.int64)
+
+
+def _sakoe_chiba_window(rows, cols, radius):
+    """Ölçeklenmiş köşegen etrafında Sakoe-Chiba bandı"""
+    centers = np.round(np.arange(rows) * (cols - 1) / max(rows - 1, 1)).astype(np.int64)
+    return np.clip(centers - radius, 0, cols - 1), np.clip(centers + radius, 0, cols - 1)
+
+
+def _project_path(path, rows, cols, radius):
+    """Kaba çözünürlükteki yolu ince çözünürlüğe taşı ve radius kadar genişlet"""
+    lows = np.full(rows, cols, dtype=np.int64)
+    highs = np.full(rows, -1, dtype=np.int64)
+    for offset_i in (0, 1):
+        fine_rows = np.minimum(path[:, 0] * 2 + offset_i, rows - 1)
+        np.minimum.at(lows, fine_rows, np.minimum(path[:, 1] * 2, cols - 1))
+        np.maximum.at(highs, fine_rows, np.minimum(path[:, 1] * 2 + 1, cols - 1))
+
+    # Boş kalan satırları komşularından doldur, pencereleri monoton yap
+    highs = np.maximum.accumulate(highs)
+    lows = np.minimum.accumulate(lows[::-1])[::-1]
+    lows = np.clip(lows - radius, 0, cols - 1)
+    highs = np.clip(highs + radius, 0, cols - 1)
+    lows[0] = 0
+    highs[-1] = cols - 1
+    return lows, highs
+
+
+def _coarsen(features):
+    """Ardışık kare çiftlerinin ortalamasıyla çözünürlüğü yarıya indir"""
+    if len(features) % 2:
+        features = np.vstack((features, features[-1:]))
+    return (features[0::2] + features[1::2]) / 2.0
+
+
+def multiscale_dtw(reference, target, radius=10, min_size=200):
+    """Kabadan inceye çok ölçekli, bantlı DTW
+
+    En kaba seviyede Sakoe-Chiba bandıyla çözülür; her seviyede yol bir üst
+    çözünürlüğe taşınıp radius kadar genişletilir. Bellek ve süre kare
+    sayısıyla doğrusal ölçeklenir. (referans karesi, hedef karesi) yolunu döndürür.
+    """
+    rows, cols = len(reference), len(target)
+    if rows <= min_size or cols <= min_size:
+        band = max(radius, abs(rows - cols) + radius, int(0.1 * max(rows, cols)))
+        lows, highs = _sakoe_chiba_window(rows, cols, band)
+        return _windowed_dtw(reference, target, lows, highs)
+
+    coarse_path = multiscale_dtw(_coarsen(reference), _coarsen(target), radius, min_size)
+    lows, highs = _project_path(coarse_path, rows, cols, radius)
+    return _windowed_dtw(reference, target, lows, highs)
+
+
+def build_time_map(path, hop_seconds=FEATURE_HOP_SECONDS):
+    """DTW yolundan referans zamanı -> hedef zamanı eşlemesi (monoton) üret"""
+    rows = path[-1, 0] + 1
+    target_frames = np.zeros(rows)
+    counts = np.zeros(rows)
+    np.add.at(target_frames, path[:, 0], path[:, 1])
+    np.add.at(counts, path[:, 0], 1)
+    # Aynı referans karesine düşen hedef karelerin ortalaması
+    mapped = target_frames / np.maximum(counts, 1)
+    mapped = np.maximum.accumulate(mapped)
+    reference_times = np.arange(rows) * hop_seconds
+    return reference_times, mapped * hop_seconds
+
+
+def align_audio(reference_audio_path, target_audio_path, radius=10):
+    """İki ses dosyası arasında MFCC tabanlı DTW; (referans zamanları, hedef zamanları) döndürür"""
+    reference = mfcc_features(reference_audio_path)
+    target = mfcc_features(target_audio_path)
+    if len(reference) == 0 or len(target) == 0:
+        raise ValueError("DTW için ses özellikleri çıkarılamadı")
+
+    logger.info(f"DTW: {len(reference)} referans, {len(target)} hedef karesi")
+    path = multiscale_dtw(reference, target, radius)
+    return build_time_map(path)
@@ -0,0 +1,153 @@
+import time
+import logging
+import threading
+import subprocess
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class FFmpegRunError(Exception):
+    """ffmpeg hatası; stderr'in yalnızca son satırlarını taşır"""
+
+    def __init__(self, message, stderr_tail='', returncode=None):
+        super().__init__(message)
+        self.stderr_tail = stderr_tail
+        self.returncode = returncode
+
+
+class FFmpegCancelled(FFmpegRunError):
+    """Render iptal edildi ya da süre sınırını aştı"""
+
+
+def _parse_out_time(value):
+    """'00:01:02.500000' biçimindeki out_time değerini saniyeye çevir"""
+    try:
+        hours, minutes, seconds = value.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _parse_speed(value):
+    try:
+        return float(value.rstrip('x'))
+    except (ValueError, AttributeError):
+        return None
+
+
+class FFmpegRunner:
+    """ffmpeg'i -progress pipe ile çalıştırır; ilerleme, ETA, iptal ve süre sınırı sağlar
+
+    stdout'taki anahtar=değer ilerleme blokları satır satır işlenir, stderr ise
+    sınırlı bir kuyrukta tutulur; uzun render'larda bellek kullanımı büyümez.
+    """
+
+    def __init__(self, progress_callback=None, timeout=None, cancel_event=None, stderr_tail_lines=200):
+        self.progress_callback = progress_callback
+        self.timeout = timeout
+        self.cancel_event = cancel_event
+        self.stderr_tail_lines = stderr_tail_lines
+
+    def run_stream(self, stream, total_duration=None):
+        """ffmpeg-python çıktı grafiğini çalıştır"""
+        return self.run(stream.compile(overwrite_output=True), total_duration)
+
+    def run(self, args, total_duration=None):
+        """ffmpeg argüman listesini çalıştır"""
+        args = [args[0], '-nostats', '-progress', 'pipe:1'] + list(args[1:])
+        stderr_tail = deque(maxlen=self.stderr_tail_lines)
+
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='ignore'
+        )
+
+        stderr_thread = threading.Thread(target=self._drain_stderr, args=(process, stderr_tail), daemon=True)
+        stdout_thread = threading.Thread(target=self._read_progress, args=(process, total_duration), daemon=True)
+        stderr_thread.start()
+        stdout_thread.start()
+
+        started = time.monotonic()
+        stop_reason = None
+        while process.poll() is None:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                stop_reason = 'iptal edildi'
+            elif self.timeout and time.monotonic() - started > self.timeout:
+                stop_reason = f"{self.timeout:.0f}s süre sınırını aştı"
+            if stop_reason:
+                self._terminate(process)
+                break
+            time.sleep(0.2)
+
+        process.wait()
+        stdout_thread.join()
+        stderr_thread.join()
+
+        tail = '\n'.join(stderr_tail)
+        if stop_reason:
+            raise FFmpegCancelled(f"FFmpeg {stop_reason}", tail, process.returncode)
+        if process.returncode != 0:
+            raise FFmpegRunError(f"FFmpeg {process.returncode} koduyla sonlandı", tail, process.returncode)
+        return tail
+
+    def _terminate(self, process):
+        """Önce nazikçe sonlandır, yanıt vermezse öldür"""
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def _drain_stderr(self, process, tail):
+        for line in process.stderr:
+            tail.append(line.rstrip())
+
+    def _read_progress(self, process, total_duration):
+        """İlerleme bloklarını ayrıştır ve her blok sonunda callback'i çağır"""
+        block = {}
+        for line in process.stdout:
+            key, sep, value = line.strip().partition('=')
+            if not sep:
+                continue
+            block[key] = value
+            if key != 'progress':
+                continue
+
+            if self.progress_callback is not None:
+                try:
+                    self.progress_callback(self._build_progress(block, total_duration))
+                except Exception as e:
+                    logger.warning(f"İlerleme callback hatası: {str(e)}")
+            block = {}
+
+    def _build_progress(self, block, total_duration):
+        out_time = _parse_out_time(block.get('out_time'))
+        speed = _parse_speed(block.get('speed'))
+
+        percent = None
+        eta = None
+        if total_duration and out_time is not None:
+            percent = min(100.0, 100.0 * out_time / total_duration)
+            if speed:
+                eta = max(0.0, (total_duration - out_time) / speed)
+
+        try:
+            fps = float(block.get('fps', 0))
+        except ValueError:
+            fps = None
+
+        return {
+            'frame': int(block.get('frame', 0) or 0),
+            'fps': fps,
+            'speed': speed,
+            'out_time': out_time,
+            'percent': percent,
+            'eta': eta,
+            'done': block.get('progress') == 'end'
+        }
@@ -0,0 +1,116 @@
+import os
+import hashlib
+import logging
+import threading
+import subprocess
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def scan_video_packets(video_path):
+    """ffprobe paket taramasıyla video paketlerinin zamanlarını ve anahtar kare bayraklarını oku
+
+    Kareler çözülmez, yalnızca konteyner paket başlıkları okunur; saatlik
+    video için birkaç saniye sürer. (pts zamanları, anahtar kare maskesi)
+    dizilerini sunum sırasına göre döndürür.
+    """
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Paket taraması başarısız: {result.stderr[-500:]}")
+
+    times = []
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if not pts_time or pts_time == 'N/A':
+            continue
+        times.append(float(pts_time))
+        keyframes.append('K' in flags)
+
+    times = np.array(times, dtype=np.float64)
+    keyframes = np.array(keyframes, dtype=bool)
+    order = np.argsort(times, kind='stable')
+    return times[order], keyframes[order]
+
+
+def keyframe_times(video_path):
+    """Anahtar karelerin sunum zamanları (saniye, artan)"""
+    times, keyframes = scan_video_packets(video_path)
+    return times[keyframes]
+
+
+class KeyframeIndex:
+    """(path, size, mtime) anahtarlı, bellek içi ve disk önbellekli paket/anahtar kare indeksi
+
+    Kaynak başına bir kez paket taraması yapılır; sonraki kesimler ve
+    uyumluluk denetimleri indeksi önbellekten okur.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.getenv('KEYFRAME_INDEX_CACHE_DIR', 'data/cache/keyframes')
+        self._memory_cache = {}
+        self._lock = threading.Lock()
+
+    def _cache_key(self, path):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    def _disk_cache_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    def packets(self, video_path):
+        """(pts zamanları, anahtar kare maskesi); aynı dosya için önbellekten döndür"""
+        key = self._cache_key(video_path)
+
+        with self._lock:
+            cached = self._memory_cache.get(key)
+        if cached is not None:
+            return cached
+
+        disk_path = self._disk_cache_path(key)
+        packets = None
+        if os.path.exists(disk_path):
+            try:
+                with np.load(disk_path) as data:
+                    packets = (data['times'], data['keyframes'])
+            except Exception as e:
+                logger.warning(f"Anahtar kare önbelleği okunamadı, yeniden taranıyor: {str(e)}")
+
+        if packets is None:
+            packets = scan_video_packets(video_path)
+            logger.info(f"Anahtar kare indeksi oluşturuldu: {os.path.basename(video_path)} "
+                        f"({len(packets[0])} kare, {int(packets[1].sum())} anahtar kare)")
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(disk_path, 'wb') as f:
+                    np.savez(f, times=packets[0], keyframes=packets[1])
+            except Exception as e:
+                logger.warning(f"Anahtar kare önbelleği yazılamadı: {str(e)}")
+
+        with self._lock:
+            self._memory_cache[key] = packets
+        return packets
+
+    def keyframes(self, video_path):
+        """Anahtar karelerin sunum zamanları (saniye, artan)"""
+        times, keyframes = self.packets(video_path)
+        return times[keyframes]
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_keyframe_index():
+    """Süreç genelinde paylaşılan KeyframeIndex örneğini döndür"""
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = KeyframeIndex()
+        return _shared_index
@@ -0,0 +1,56 @@
+import logging
+import numpy as np
+from scipy.fft import next_fast_len
+
+logger = logging.getLogger(__name__)
+
+
+def cue_activity_envelope(starts, ends, frame_times):
+    """Altyazı aralıklarından kare ızgarasında 0/1 konuşma beklentisi sinyali üret"""
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    # Her karenin kaç altyazı aralığının içinde kaldığı: başlangıç sayısı - bitiş sayısı
+    opened = np.searchsorted(np.sort(starts), frame_times, side='right')
+    closed = np.searchsorted(np.sort(ends), frame_times, side='right')
+    return ((opened - closed) > 0).astype(np.float64)
+
+
+def _parabolic_peak(values, index):
+    """Tepe etrafındaki üç noktaya parabol uydurarak alt-kare konum düzeltmesi"""
+    if index <= 0 or index >= len(values) - 1:
+        return 0.0
+    left, center, right = values[index - 1], values[index], values[index + 1]
+    denominator = left - 2.0 * center + right
+    if denominator == 0:
+        return 0.0
+    return 0.5 * (left - right) / denominator
+
+
+def estimate_offset(signal, reference, frame_rate, max_lag_seconds=None):
+    """FFT çapraz korelasyonuyla signal'in reference'a göre gecikmesini bul
+
+    signal(t) ~ reference(t - offset) olacak şekilde offset (saniye) ve
+    normalize edilmiş korelasyon tepesini (güven, -1..1) döndürür.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    signal = signal - signal.mean()
+    reference = reference - reference.mean()
+
+    norm = np.linalg.norm(signal) * np.linalg.norm(reference)
+    if norm == 0:
+        return 0.0, 0.0
+
+    size = next_fast_len(len(signal) + len(reference) - 1)
+    correlation = np.fft.irfft(np.fft.rfft(signal, size) * np.conj(np.fft.rfft(reference, size)), size)
+
+    # Negatif gecikmeler dizinin sonunda yer alır; gecikme sırasına diz
+    max_lag = len(signal) - 1 if max_lag_seconds is None else int(max_lag_seconds * frame_rate)
+    max_positive = min(max_lag, len(signal) - 1)
+    max_negative = min(max_lag, len(reference) - 1)
+    lags = np.concatenate((np.arange(-max_negative, 0), np.arange(0, max_positive + 1)))
+    values = correlation[lags % size]
+
+    peak = int(np.argmax(values))
+    refined_lag = lags[peak] + _parabolic_peak(values, peak)
+    return float(refined_lag / frame_rate), float(values[peak] / norm)
@@ -0,0 +1,250 @@
+import os
+import re
+import json
+import time
+import logging
+import platform
+import tempfile
+import threading
+from datetime import datetime
+from dataclasses import dataclass, asdict
+import ffmpeg
+from ..media_probe import get_media_probe
+from .ffmpeg_runner import FFmpegRunner, FFmpegCancelled
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """libx264 kodlama profili"""
+    name: str
+    preset: str
+    crf: int = 23
+
+    def output_args(self):
+        return {'preset': self.preset, 'crf': self.crf}
+
+
+DEFAULT_PROFILE = RenderProfile('medium', 'medium', 23)
+
+# Önbellek kaydı biçimi; ölçüm yöntemi değişince eski kararlar yeniden ölçülür
+_CACHE_VERSION = 2
+
+# Hızlıdan yavaşa aday profiller
+CANDIDATE_PROFILES = [
+    RenderProfile('ultrafast', 'ultrafast', 23),
+    RenderProfile('veryfast', 'veryfast', 23),
+    RenderProfile('faster', 'faster', 23),
+    RenderProfile('fast', 'fast', 23),
+    RenderProfile('medium', 'medium', 23),
+    RenderProfile('slow', 'slow', 23)
+]
+
+
+def get_profile(name):
+    """İsme göre aday profili döndür"""
+    for profile in CANDIDATE_PROFILES:
+        if profile.name == name:
+            return profile
+    raise ValueError(f"Bilinmeyen render profili: {name}")
+
+
+def host_key():
+    """Benchmark sonuçlarının geçerli olduğu makine anahtarı"""
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
+
+
+def content_type_key(width, height, fps, codec):
+    """Kaynak içerik türü anahtarı (hedef çözünürlük, kare hızı, kaynak codec)"""
+    return f"{width}x{height}@{round(fps or 0)}|{codec or 'unknown'}"
+
+
+class RenderProfileTuner:
+    """Kaynağın kısa bir örneği üzerinde aday profilleri hedef kalitede ölçüp uygun olanı seçer
+
+    Hedef kalite varsayılan profilin (medium, CRF 23) örnekteki SSIM'idir. Her
+    aday ön ayar için CRF, bu kaliteye ulaşana kadar düşürülür; böylece adaylar
+    aynı kalitede karşılaştırılır. Süre sınırı verilmişse sınıra sığan en küçük
+    çıktıyı üreten, verilmemişse çıktısı referansın RENDER_MAX_SIZE_RATIO
+    katını aşmayan en hızlı profil seçilir. Süre sınırı yoksa varsayılandan
+    yavaş ön ayarlar ölçülmez. Karar makine ve içerik türü başına önbelleklenir;
+    ölçüm yalnızca ilk çalıştırmada yapılır. Ölçüm kodlamaları verilen
+    FFmpegRunner ile çalışır; editörün süre sınırı ve iptal olayı geçerlidir.
+    """
+
+    def __init__(self, cache_path=None, sample_seconds=None, min_ssim=None, deadline_factor=None,
+                 candidates=None, max_size_ratio=None, runner=None):
+        self.cache_path = cache_path or os.getenv('RENDER_PROFILE_CACHE', 'data/cache/render_profiles.json')
+        self.sample_seconds = sample_seconds or float(os.getenv('RENDER_BENCHMARK_SECONDS', '5'))
+        # Mutlak kalite tabanı; hedef, referans kalitesi ile bu tabanın büyüğüdür
+        self.min_ssim = min_ssim or float(os.getenv('RENDER_MIN_SSIM', '0.95'))
+        # Çıktının saniyesi başına izin verilen kodlama süresi (0: sınır yok)
+        self.deadline_factor = deadline_factor if deadline_factor is not None else float(os.getenv('RENDER_DEADLINE_FACTOR', '0'))
+        # Süre sınırı yokken kabul edilen en büyük çıktı boyutu (referans bit hızına oranla)
+        self.max_size_ratio = max_size_ratio or float(os.getenv('RENDER_MAX_SIZE_RATIO', '1.25'))
+        self.candidates = candidates or CANDIDATE_PROFILES
+        # Kalite eşlemesi: SSIM farkı toleransı, CRF adımı ve en düşük CRF
+        self.ssim_tolerance = 0.002
+        self.crf_step = 3
+        self.min_crf = 14
+        self.runner = runner or FFmpegRunner()
+        self._lock = threading.Lock()
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Render profil önbelleği okunamadı: {str(e)}")
+            return {}
+
+    def _save_cache(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"Render profil önbelleği yazılamadı: {str(e)}")
+
+    def benchmark(self, video_path, width, height, profile):
+        """Profili örnek üzerinde kodla; hız, bit hızı ve SSIM ölç"""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+        sample_path = temp_file.name
+        temp_file.close()
+
+        try:
+            stream = ffmpeg.input(video_path, t=self.sample_seconds)['v']
+            stream = ffmpeg.filter(stream, 'scale', width, height)
+            out = ffmpeg.output(stream, sample_path, vcodec='libx264', pix_fmt='yuv420p',
+                                **profile.output_args())
+
+            started = time.monotonic()
+            self.runner.run_stream(out, self.sample_seconds)
+            elapsed = time.monotonic() - started
+
+            sample_info = get_media_probe().probe(sample_path)
+            ssim = self._measure_ssim(video_path, sample_path, width, height)
+            return {
+                'profile': profile.name,
+                'profile_args': asdict(profile),
+                'encode_seconds': round(elapsed, 3),
+                'speed': round(sample_info.duration / elapsed, 3) if elapsed > 0 else 0.0,
+                'bit_rate': sample_info.bit_rate,
+                'size': sample_info.size,
+                'ssim': ssim
+            }
+        finally:
+            if os.path.exists(sample_path):
+                os.unlink(sample_path)
+
+    def _measure_ssim(self, source_path, sample_path, width, height):
+        """Örneği aynı çözünürlüğe ölçeklenmiş kaynakla karşılaştır"""
+        cmd = [
+            'ffmpeg', '-hide_banner',
+            '-i', sample_path, '-t', str(self.sample_seconds), '-i', source_path,
+            '-lavfi', f'[1:v]scale={width}:{height}[ref];[0:v][ref]ssim',
+            '-f', 'null', '-'
+        ]
+        # SSIM özeti stderr'in son satırlarındadır
+        stderr_tail = self.runner.run(cmd, self.sample_seconds)
+        match = re.search(r'All:([0-9.]+)', stderr_tail)
+        return float(match.group(1)) if match else 0.0
+
+    def _candidate_profiles(self):
+        """Ölçülecek ön ayarlar; süre sınırı yoksa varsayılandan yavaş olanlar atlanır"""
+        if self.deadline_factor > 0:
+            return list(self.candidates)
+        names = [profile.name for profile in self.candidates]
+        if DEFAULT_PROFILE.name not in names:
+            return list(self.candidates)
+        return list(self.candidates)[:names.index(DEFAULT_PROFILE.name) + 1]
+
+    def _match_quality(self, video_path, width, height, profile, target_ssim, reference=None):
+        """Ön ayarın CRF'ini hedef SSIM'e ulaşana kadar düşürerek ölç; son ölçümü döndür"""
+        crf = profile.crf
+        result = reference
+        if result is None or result['profile_args'] != asdict(profile):
+            result = self.benchmark(video_path, width, height, profile)
+        while result['ssim'] < target_ssim and crf - self.crf_step >= self.min_crf:
+            crf -= self.crf_step
+            result = self.benchmark(video_path, width, height, RenderProfile(profile.name, profile.preset, crf))
+        return result
+
+    def choose(self, results, reference):
+        """Hedef kalitedeki ölçüm sonuçlarından profili seç"""
+        passing = [r for r in results if r['ssim'] >= reference['target_ssim']]
+        if not passing:
+            return reference
+
+        if self.deadline_factor > 0:
+            within_deadline = [r for r in passing if r['speed'] > 0 and 1.0 / r['speed'] <= self.deadline_factor]
+            if within_deadline:
+                return min(within_deadline, key=lambda r: r['bit_rate'])
+
+        # Aynı kalitede çıktısı çok büyüyen hızlı ön ayarlar kabul edilmez
+        size_limit = reference['bit_rate'] * self.max_size_ratio
+        compact = [r for r in passing if not reference['bit_rate'] or r['bit_rate'] <= size_limit]
+        return max(compact or [reference], key=lambda r: r['speed'])
+
+    def select(self, video_path, width, height):
+        """Kaynak için render profilini döndür (önbellekten ya da benchmark ile)"""
+        info = get_media_probe().probe(video_path)
+        content_type = content_type_key(width, height, info.fps, info.video_codec)
+        host = host_key()
+
+        with self._lock:
+            cache = self._load_cache()
+            cached = cache.get(host, {}).get(content_type)
+            # Kalite tabanı, süre sınırı ya da boyut sınırı değiştiyse karar yeniden ölçülür
+            if (cached and cached.get('version') == _CACHE_VERSION
+                    and cached.get('min_ssim') == self.min_ssim
+                    and cached.get('deadline_factor') == self.deadline_factor
+                    and cached.get('max_size_ratio') == self.max_size_ratio):
+                profile = RenderProfile(**cached['profile_args'])
+                logger.info(f"Önbellekteki render profili kullanılıyor: {profile.name} CRF {profile.crf} ({content_type})")
+                return profile
+
+            logger.info(f"Render profilleri ölçülüyor ({content_type}, {self.sample_seconds:.0f}s örnek)...")
+            try:
+                reference = self.benchmark(video_path, width, height, DEFAULT_PROFILE)
+            except FFmpegCancelled:
+                raise
+            except Exception as e:
+                logger.warning(f"Referans profil ölçülemedi: {str(e)}")
+                return DEFAULT_PROFILE
+            target_ssim = max(self.min_ssim, reference['ssim'] - self.ssim_tolerance)
+            reference['target_ssim'] = target_ssim
+            logger.info(f"Hedef kalite: SSIM {target_ssim:.4f} ({DEFAULT_PROFILE.name} CRF {DEFAULT_PROFILE.crf})")
+
+            results = []
+            for profile in self._candidate_profiles():
+                try:
+                    result = self._match_quality(video_path, width, height, profile, target_ssim, reference)
+                    logger.info(f"{profile.name} CRF {result['profile_args']['crf']}: {result['speed']}x hız, "
+                                f"{result['bit_rate']} bps, SSIM {result['ssim']:.4f}")
+                    results.append(result)
+                except FFmpegCancelled:
+                    raise
+                except Exception as e:
+                    logger.warning(f"{profile.name} profili ölçülemedi: {str(e)}")
+
+            chosen = self.choose(results, reference)
+            cache.setdefault(host, {})[content_type] = {
+                'version': _CACHE_VERSION,
+                'profile': chosen['profile'],
+                'min_ssim': self.min_ssim,
+                'deadline_factor': self.deadline_factor,
+                'max_size_ratio': self.max_size_ratio,
+                'target_ssim': target_ssim,
+                'results': results,
+                'profile_args': chosen['profile_args'],
+                'created_at': datetime.now().isoformat()
+            }
+            self._save_cache(cache)
+
+        profile = RenderProfile(**chosen['profile_args'])
+        logger.info(f"Seçilen render profili: {profile.name} CRF {profile.crf}")
+        return profile
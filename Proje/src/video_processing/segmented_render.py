@@ -0,0 +1,59 @@
+import os
+import re
+import logging
+import ffmpeg
+from .ffmpeg_runner import FFmpegRunner
+
+logger = logging.getLogger(__name__)
+
+
+def plan_chunks(duration, fps, chunk_seconds):
+    """Zaman çizelgesini kare sınırlarına hizalı parçalara böl
+
+    Her parça bağımsız kodlandığı için bir IDR kare ile başlar; parça sınırları
+    tam kare sayısına yuvarlanır ki birleştirmede kayma oluşmasın.
+    (başlangıç saniyesi, kare sayısı) listesi döndürür.
+    """
+    total_frames = max(int(round(duration * fps)), 1)
+    frames_per_chunk = max(int(round(chunk_seconds * fps)), 1)
+
+    chunks = []
+    for first_frame in range(0, total_frames, frames_per_chunk):
+        frame_count = min(frames_per_chunk, total_frames - first_frame)
+        chunks.append((first_frame / fps, frame_count))
+    return chunks
+
+
+def concat_chunks(chunk_paths, output_path, runner=None):
+    """Parçaları concat demuxer ile yeniden kodlamadan birleştir"""
+    list_path = output_path + '.concat.txt'
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for chunk_path in chunk_paths:
+            escaped = os.path.abspath(chunk_path).replace('\\', '/').replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    try:
+        out = ffmpeg.output(
+            ffmpeg.input(list_path, format='concat', safe=0),
+            output_path,
+            c='copy'
+        )
+        (runner or FFmpegRunner()).run_stream(out)
+    finally:
+        os.unlink(list_path)
+    return output_path
+
+
+def measure_ssim(reference_path, distorted_path, runner=None):
+    """İki videonun ortalama SSIM değerini ffmpeg ssim filtresiyle ölç"""
+    cmd = [
+        'ffmpeg', '-hide_banner',
+        '-i', distorted_path, '-i', reference_path,
+        '-lavfi', '[0:v][1:v]ssim', '-f', 'null', '-'
+    ]
+    # SSIM özeti stderr'in son satırlarındadır
+    stderr_tail = (runner or FFmpegRunner()).run(cmd)
+    match = re.search(r'All:([0-9.]+)', stderr_tail)
+    if not match:
+        raise ValueError("SSIM çıktısı okunamadı")
+    return float(match.group(1))
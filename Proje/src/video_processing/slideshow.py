@@ -0,0 +1,139 @@
+import os
+import re
+import hashlib
+import logging
+import subprocess
+import ffmpeg
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+# Önbellek anahtarına girer; ölçekleme filtresi değişirse eski kareler kullanılmaz
+_FRAME_FILTER_VERSION = 1
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def list_images(images_dir):
+    """Klasördeki resimleri doğal sıralamayla (image2 < image10) listele"""
+    if not os.path.isdir(images_dir):
+        return []
+    names = [name for name in os.listdir(images_dir) if name.lower().endswith(IMAGE_EXTENSIONS)]
+    return [os.path.join(images_dir, name) for name in sorted(names, key=_natural_key)]
+
+
+def plan_slides(segment_starts, total_duration, min_slide_seconds):
+    """Slayt geçişlerini zamanlama segmentlerinin başlangıçlarına hizala
+
+    Slayt sayısı segment sayısı ve min_slide_seconds ile sınırlanır; her geçiş,
+    eşit aralıklı hedef zamana en yakın segment başlangıcına yerleştirilir.
+    Slayt başına süre dizisini döndürür (toplamı total_duration).
+    """
+    starts = np.unique(np.clip(np.asarray(segment_starts, dtype=np.float64), 0.0, total_duration))
+    starts = starts[starts < total_duration]
+    if len(starts) == 0 or starts[0] > 0:
+        starts = np.concatenate(([0.0], starts))
+
+    slide_count = max(1, min(len(starts), int(total_duration // max(min_slide_seconds, 0.1))))
+    targets = np.arange(slide_count) * (total_duration / slide_count)
+
+    # Hedefe en yakın segment başlangıcı
+    right = np.clip(np.searchsorted(starts, targets), 0, len(starts) - 1)
+    left = np.clip(right - 1, 0, len(starts) - 1)
+    nearest = np.where(np.abs(starts[left] - targets) <= np.abs(starts[right] - targets), left, right)
+    boundaries = starts[np.unique(nearest)]
+    boundaries[0] = 0.0
+
+    return np.diff(np.concatenate((boundaries, [total_duration])))
+
+
+def _frame_cache_key(image_path, width, height):
+    digest = hashlib.sha1()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(f"|{width}x{height}|v{_FRAME_FILTER_VERSION}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SlideshowBuilder:
+    """Resimlerden düşük kare hızlı arka plan akışı hazırlar
+
+    Her resim hedef çözünürlüğe bir kez ölçeklenip kenarlıklarla doldurulur
+    ve içerik hash'i ile anahtarlanan önbelleğe yazılır; aynı resimler sonraki
+    çalıştırmalarda ve diğer dillerde yeniden işlenmez. Hazır kareler concat
+    demuxer ile okunur; input_stream bu girişi render grafiğine doğrudan
+    bağlar, böylece ara video kodlanmaz.
+    """
+
+    def __init__(self, cache_dir=None, workers=None, fps=None):
+        self.cache_dir = cache_dir or os.getenv('SLIDESHOW_CACHE_DIR', 'data/cache/slides')
+        self.workers = workers or int(os.getenv('SLIDESHOW_WORKERS', '0')) or (os.cpu_count() or 1)
+        self.fps = fps or float(os.getenv('SLIDESHOW_FPS', '5'))
+
+    def prepare_frame(self, image_path, width, height):
+        """Resmi en-boy oranını koruyarak ölçekle, ortala ve önbelleğe yaz"""
+        frame_path = os.path.join(self.cache_dir, f"{_frame_cache_key(image_path, width, height)}.png")
+        if os.path.exists(frame_path):
+            return frame_path
+
+        # Yarım kalan yazımlar önbelleğe girmesin
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = frame_path + f".{os.getpid()}.tmp.png"
+        cmd = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', image_path,
+            '-vf', (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black,setsar=1,format=rgb24"),
+            '-frames:v', '1', temp_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Resim hazırlanamadı ({os.path.basename(image_path)}): {result.stderr[-300:]}")
+        os.replace(temp_path, frame_path)
+        return frame_path
+
+    def prepare_frames(self, image_paths, width, height):
+        """Tüm resimleri paralel hazırla; okunamayan resimler atlanır"""
+        def prepare(image_path):
+            try:
+                return self.prepare_frame(image_path, width, height)
+            except Exception as e:
+                logger.warning(f"Resim atlandı: {str(e)}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            frames = list(executor.map(prepare, image_paths))
+        return [frame for frame in frames if frame]
+
+    def write_concat_list(self, frames, durations, list_path):
+        """concat demuxer listesi; slaytlar için resimler sırayla tekrar kullanılır"""
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for i, duration in enumerate(durations):
+                escaped = os.path.abspath(frames[i % len(frames)]).replace('\\', '/').replace("'", "'\\''")
+                f.write(f"file '{escaped}'\nduration {duration:.3f}\n")
+            # Son girdinin süresinin uygulanması için dosya bir kez daha yazılır
+            f.write(f"file '{escaped}'\n")
+        return list_path
+
+    def prepare(self, image_paths, segment_starts, total_duration, width, height, list_path,
+                min_slide_seconds=4.0):
+        """Kareleri hazırla, slaytları segment başlangıçlarına hizala ve concat listesini yaz"""
+        frames = self.prepare_frames(image_paths, width, height)
+        if not frames:
+            raise ValueError("Slayt gösterisi için kullanılabilir resim yok")
+
+        durations = plan_slides(segment_starts, total_duration, min_slide_seconds)
+        logger.info(f"Slayt gösterisi: {len(frames)} resim, {len(durations)} slayt, {total_duration:.2f}s @ {self.fps:g}fps")
+        return self.write_concat_list(frames, durations, list_path)
+
+    def input_stream(self, list_path):
+        """concat listesinden sabit kare hızlı video akışı (ffmpeg-python)"""
+        stream = ffmpeg.input(list_path, format='concat', safe=0)['v']
+        stream = ffmpeg.filter(stream, 'fps', fps=self.fps)
+        return ffmpeg.filter(stream, 'format', 'yuv420p')
+
@@ -0,0 +1,241 @@
+import os
+import shutil
+import logging
+import tempfile
+import numpy as np
+from fractions import Fraction
+from concurrent.futures import ThreadPoolExecutor
+from ..media_probe import get_media_probe
+from .keyframe_index import get_keyframe_index
+from .ffmpeg_runner import FFmpegRunner, FFmpegRunError, FFmpegCancelled
+
+logger = logging.getLogger(__name__)
+
+# Stream copy ile taşınabilen codec'ler (kenar parçaları aynı codec'le kodlanır)
+SMART_CUT_CODECS = {'h264': 'libx264'}
+
+# ffprobe profil adı -> libx264 -profile:v değeri
+_X264_PROFILES = {
+    'constrained baseline': 'baseline',
+    'baseline': 'baseline',
+    'main': 'main',
+    'high': 'high',
+    'high 10': 'high10',
+    'high 4:2:2': 'high422',
+    'high 4:4:4 predictive': 'high444'
+}
+
+# Ses aselect'ten önce bu büyüklükte bloklara bölünür; AAC çerçevesi (1024 örnek)
+# kesim sınırı için kabadır. 48 kHz'de 25/30/50 fps kare süresi bu bloğun katıdır.
+AUDIO_SELECT_BLOCK = 64
+
+
+def merge_ranges(keep_ranges, duration):
+    """Aralıkları sırala, kaynak süresine kırp ve kesişen/bitişik olanları birleştir"""
+    ranges = np.array(sorted((max(float(start), 0.0), min(float(end), duration)) for start, end in keep_ranges),
+                      dtype=np.float64).reshape(-1, 2)
+    ranges = ranges[ranges[:, 1] > ranges[:, 0]]
+    if len(ranges) == 0:
+        return ranges
+
+    # Bir aralık, kendinden önceki tüm aralıkların en büyük bitişinden sonra başlıyorsa yeni grup açar
+    previous_end = np.concatenate(([-np.inf], np.maximum.accumulate(ranges[:-1, 1])))
+    group = np.cumsum(ranges[:, 0] > previous_end) - 1
+    starts = ranges[np.flatnonzero(np.diff(np.concatenate(([-1], group)))), 0]
+    ends = np.zeros(group[-1] + 1)
+    np.maximum.at(ends, group, ranges[:, 1])
+    return np.column_stack((starts, ends))
+
+
+def frame_bounds(keep_ranges, frame_times, tolerance):
+    """Her aralıkta tutulan ilk karenin ve bitiş (hariç) karesinin indeksleri"""
+    first_frames = np.searchsorted(frame_times, keep_ranges[:, 0] - tolerance, side='left')
+    end_frames = np.searchsorted(frame_times, keep_ranges[:, 1] - tolerance, side='left')
+    return first_frames, end_frames
+
+
+def snap_to_frames(keep_ranges, frame_times, tolerance, frame_duration):
+    """Aralıkları videoda tutulan karelerin sınırlarına yuvarla
+
+    Başlangıç ilk tutulan karenin, bitiş son tutulan kareden sonraki karenin
+    zamanıdır; ses bu sınırlarla kesildiğinde her aralıkta kareler kadar sürer
+    ve aralıklar boyunca kayma birikmez. Kare içermeyen aralıklar atılır.
+    """
+    if len(keep_ranges) == 0 or len(frame_times) == 0:
+        return np.zeros((0, 2))
+
+    first_frames, end_frames = frame_bounds(keep_ranges, frame_times, tolerance)
+    boundaries = np.append(frame_times, frame_times[-1] + frame_duration)
+    kept = end_frames > first_frames
+    return np.column_stack((boundaries[first_frames[kept]], boundaries[end_frames[kept]]))
+
+
+def plan_pieces(keep_ranges, frame_times, keyframes, tolerance):
+    """Tutulan aralıkları kopyalanacak GOP dizilerine ve yeniden kodlanacak kenarlara böl
+
+    frame_times sunum sırasındaki kare zamanları, keyframes aynı uzunlukta
+    anahtar kare maskesidir. Aralıktaki ilk anahtar kare k1, son anahtar kare
+    (aralık sonundaki dahil) k2 ise [k1, k2) kareleri stream copy ile,
+    [başlangıç, k1) ve [k2, bitiş) yeniden kodlanarak alınır. Kapalı GOP'larda
+    tam GOP'lar kod çözme sırasında da ardışık olduğundan kopyalanan parça kare
+    sayısıyla kesin sınırlanır. (ilk kare zamanı, kare sayısı, 'copy' | 'encode')
+    listesi döndürür.
+    """
+    if len(keep_ranges) == 0 or len(frame_times) == 0:
+        return []
+
+    first_frames, end_frames = frame_bounds(keep_ranges, frame_times, tolerance)
+
+    # Kaynak sonu da bir GOP sınırıdır
+    key_positions = np.concatenate((np.flatnonzero(keyframes), [len(frame_times)]))
+    first_keys = key_positions[np.searchsorted(key_positions, first_frames, side='left')]
+    last_keys = key_positions[np.searchsorted(key_positions, end_frames, side='right') - 1]
+
+    def frame_time(index):
+        return float(frame_times[index])
+
+    pieces = []
+    for first, end, k1, k2 in zip(first_frames.tolist(), end_frames.tolist(), first_keys.tolist(), last_keys.tolist()):
+        if end <= first:
+            continue
+        if not first <= k1 < k2 <= end:
+            pieces.append((frame_time(first), end - first, 'encode'))
+            continue
+
+        if k1 > first:
+            pieces.append((frame_time(first), k1 - first, 'encode'))
+        pieces.append((frame_time(k1), k2 - k1, 'copy'))
+        if end > k2:
+            pieces.append((frame_time(k2), end - k2, 'encode'))
+    return pieces
+
+
+class SmartCutter:
+    """Anahtar kareler arasını kopyalayan, yalnızca kesim noktalarındaki GOP'ları kodlayan kesici
+
+    Video parçaları Annex B bit akışıyla (her anahtar karede SPS/PPS tekrarlanır)
+    Matroska olarak yazılır ve concat demuxer ile yeniden kodlanmadan birleştirilir. Ses
+    videonun kare sınırlarına yuvarlanmış aralıklarla, küçük bloklar halinde
+    tek geçişte kesilip kodlanır; ses kodlaması ucuzdur ve AAC çerçeve
+    sınırlarından kaynaklanan kaymaları önler.
+    """
+
+    def __init__(self, workers=None, crf=None, preset=None):
+        self.workers = workers or int(os.getenv('SMART_CUT_WORKERS', '0')) or (os.cpu_count() or 1)
+        self.crf = crf or int(os.getenv('SMART_CUT_CRF', '18'))
+        self.preset = preset or os.getenv('SMART_CUT_PRESET', 'medium')
+        self.keyframe_index = get_keyframe_index()
+
+    def cut(self, video_path, keep_ranges, output_path, runner=None):
+        """keep_ranges (saniye çiftleri) dışındaki kısımları atarak output_path'e yaz
+
+        runner verilirse süre sınırı ve iptal tüm parçalara uygulanır; ilerleme
+        yalnızca son birleştirme adımında bildirilir.
+        """
+        runner = runner or FFmpegRunner()
+        piece_runner = FFmpegRunner(timeout=runner.timeout, cancel_event=runner.cancel_event)
+        info = get_media_probe().probe(video_path)
+        keep_ranges = merge_ranges(keep_ranges, info.duration)
+        if len(keep_ranges) == 0:
+            raise ValueError("Kesim listesi boş")
+
+        frame_times, keyframes = self.keyframe_index.packets(video_path)
+        # Kesim aralıkları ve -ss dosya başlangıcına göredir; paket zamanları mutlaktır
+        video_stream = next((s for s in info.streams if s.get('codec_type') == 'video'), {})
+        frame_times = frame_times - float(video_stream.get('start_time') or 0.0)
+        frame_duration = 1.0 / info.fps if info.fps else 0.04
+        encoder = SMART_CUT_CODECS.get(info.video_codec)
+        if encoder is None:
+            logger.warning(f"{info.video_codec} için smart render desteklenmiyor, tamamı yeniden kodlanacak")
+            keyframes = np.zeros(len(frame_times), dtype=bool)
+            encoder = 'libx264'
+        pieces = plan_pieces(keep_ranges, frame_times, keyframes, frame_duration / 2)
+        if not pieces:
+            raise ValueError("Kesim listesinde kare yok")
+
+        copied = sum(count for _, count, mode in pieces if mode == 'copy')
+        total = sum(count for _, count, _ in pieces)
+        logger.info(f"Smart render: {len(keep_ranges)} aralık, {len(pieces)} parça, "
+                    f"{copied}/{total} kare stream copy")
+
+        work_dir = tempfile.mkdtemp(prefix='smart_cut_')
+        try:
+            piece_paths = [os.path.join(work_dir, f"piece_{i:05d}.mkv") for i in range(len(pieces))]
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(self._write_piece, piece_runner, video_path, info, encoder,
+                                    start, frame_count, mode, piece_path)
+                    for (start, frame_count, mode), piece_path in zip(pieces, piece_paths)
+                ]
+                for future in futures:
+                    future.result()
+
+            audio_ranges = snap_to_frames(keep_ranges, frame_times, frame_duration / 2, frame_duration)
+            self._join(runner, video_path, info, piece_paths, audio_ranges, work_dir, output_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return output_path
+
+    def _write_piece(self, runner, video_path, info, encoder, start, frame_count, mode, piece_path):
+        # Kesin sınır kare sayısıyla verilir; -t stream copy'de B-kareleri yüzünden taşabilir
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+               '-ss', f"{start:.6f}", '-i', video_path, '-frames:v', str(frame_count),
+               '-map', '0:v:0', '-an', '-sn', '-dn']
+        if mode == 'copy':
+            cmd += ['-c:v', 'copy']
+        else:
+            # Kaynakla aynı codec, profil, piksel formatı ve kare hızı
+            cmd += ['-c:v', encoder, '-preset', self.preset, '-crf', str(self.crf)]
+            profile = _X264_PROFILES.get((info.video_profile or '').lower())
+            if profile:
+                cmd += ['-profile:v', profile]
+            if info.pix_fmt:
+                cmd += ['-pix_fmt', info.pix_fmt]
+            if info.fps:
+                cmd += ['-r', str(Fraction(info.fps).limit_denominator(1001))]
+        # Parametre setleri her anahtar karede tekrarlanır; farklı SPS/PPS'li parçalar birleşebilir
+        cmd += ['-bsf:v', 'h264_mp4toannexb', '-f', 'matroska', piece_path]
+
+        try:
+            runner.run(cmd)
+        except FFmpegCancelled:
+            raise
+        except FFmpegRunError as e:
+            raise RuntimeError(f"Parça yazılamadı ({mode} {start:.2f}s, {frame_count} kare): {e.stderr_tail[-500:]}")
+
+    def _join(self, runner, video_path, info, piece_paths, audio_ranges, work_dir, output_path):
+        """Video parçalarını kopyalayarak birleştir, sesi kare sınırlı aralıklarla tek filtrede kesip ekle"""
+        list_path = os.path.join(work_dir, 'pieces.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for piece_path in piece_paths:
+                escaped = os.path.abspath(piece_path).replace('\\', '/').replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+               '-f', 'concat', '-safe', '0', '-i', list_path]
+        if info.has_audio:
+            # Blok, ortası aralıktaysa seçilir; sınırlar blok başlangıcına denk geldiğinde
+            # kayan nokta farkları bir blok kaydırmaz
+            half_block = AUDIO_SELECT_BLOCK / 2.0 / (info.sample_rate or 48000)
+            selection = '+'.join(
+                f"gte(t,{start - half_block:.6f})*lt(t,{end - half_block:.6f})"
+                for start, end in audio_ranges.tolist()
+            )
+            # Yüzlerce aralık komut satırı sınırını aşabileceğinden filtre dosyaya yazılır
+            filter_path = os.path.join(work_dir, 'audio_filter.txt')
+            with open(filter_path, 'w', encoding='utf-8') as f:
+                f.write(f"[1:a:0]asetnsamples=n={AUDIO_SELECT_BLOCK}:p=0,"
+                        f"aselect='{selection}',asetpts=N/SR/TB[a]")
+            cmd += ['-i', video_path,
+                    '-filter_complex_script', filter_path,
+                    '-map', '0:v:0', '-map', '[a]', '-c:a', 'aac', '-b:a', '192k']
+        else:
+            cmd += ['-map', '0:v:0']
+        cmd += ['-c:v', 'copy', '-movflags', 'faststart', output_path]
+
+        try:
+            runner.run(cmd, float((audio_ranges[:, 1] - audio_ranges[:, 0]).sum()))
+        except FFmpegCancelled:
+            raise
+        except FFmpegRunError as e:
+            raise RuntimeError(f"Parçalar birleştirilemedi: {e.stderr_tail[-500:]}")
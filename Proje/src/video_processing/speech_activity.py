@@ -0,0 +1,110 @@
+import logging
+import subprocess
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 16000
+DEFAULT_FRAME_LENGTH = 2048
+DEFAULT_HOP_LENGTH = 512
+
+
+def frame_rms(samples, frame_length=DEFAULT_FRAME_LENGTH, hop_length=DEFAULT_HOP_LENGTH):
+    """Örnek dizisinin kare başına RMS enerjisini kümülatif toplamla hesapla
+
+    Kare i, [i * hop_length, i * hop_length + frame_length) aralığını kapsar;
+    eksik kalan son kare hesaplanmaz. (rms dizisi, kullanılan örnek sayısı) döndürür.
+    """
+    if len(samples) < frame_length:
+        return np.zeros(0, dtype=np.float64), 0
+
+    frame_count = 1 + (len(samples) - frame_length) // hop_length
+    energy = np.concatenate(([0.0], np.cumsum(np.square(samples, dtype=np.float64))))
+    starts = np.arange(frame_count) * hop_length
+    sums = energy[starts + frame_length] - energy[starts]
+    rms = np.sqrt(np.maximum(sums, 0.0) / frame_length)
+    return rms, frame_count * hop_length
+
+
+def iter_audio_blocks(audio_path, sample_rate=DEFAULT_SAMPLE_RATE, block_seconds=60.0):
+    """Sesi ffmpeg ile mono float32 olarak çöz ve sabit boyutlu bloklar halinde üret"""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+        '-i', audio_path, '-f', 'f32le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'
+    ]
+    block_bytes = int(block_seconds * sample_rate) * 4
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.float32)
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode('utf-8', errors='ignore')
+        process.stderr.close()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise RuntimeError(f"Ses çözülemedi: {stderr[-500:]}")
+
+
+def stream_frame_rms(audio_path, sample_rate=DEFAULT_SAMPLE_RATE, frame_length=DEFAULT_FRAME_LENGTH,
+                     hop_length=DEFAULT_HOP_LENGTH, block_seconds=60.0):
+    """Sesi blok blok çözüp kare RMS dizisini üret
+
+    Ses tamamı belleğe alınmadan işlenir; yalnızca RMS dizisi (saatlik ses için
+    ~100 bin değer) tutulur. (rms dizisi, ses süresi) döndürür.
+    """
+    rms_blocks = []
+    carry = np.zeros(0, dtype=np.float32)
+    total_samples = 0
+
+    for block in iter_audio_blocks(audio_path, sample_rate, block_seconds):
+        total_samples += len(block)
+
+        buffer = np.concatenate((carry, block))
+        rms, consumed = frame_rms(buffer, frame_length, hop_length)
+        if len(rms):
+            rms_blocks.append(rms)
+        # Sonraki kareler bir önceki bloğun sonundaki örneklerle başlar
+        carry = buffer[consumed:]
+
+    rms = np.concatenate(rms_blocks) if rms_blocks else np.zeros(0, dtype=np.float64)
+    return rms, total_samples / sample_rate
+
+
+def detect_speech_segments(rms, threshold, sample_rate=DEFAULT_SAMPLE_RATE, hop_length=DEFAULT_HOP_LENGTH,
+                           frame_length=DEFAULT_FRAME_LENGTH, min_duration=0.5, total_duration=None):
+    """Eşiği aşan kare dizilerini (başlangıç, bitiş) saniye çiftlerine çevir
+
+    Koşu sınırları np.diff ile bulunur, tüm kare indeksleri tek işlemle zamana
+    çevrilir. Ses sonuna kadar süren son segment için total_duration kullanılır
+    ve minimum süre filtresi yalnızca kapanan segmentlere uygulanır.
+    """
+    if len(rms) == 0:
+        return []
+
+    active = np.empty(len(rms) + 2, dtype=np.int8)
+    active[0] = active[-1] = 0
+    active[1:-1] = rms > threshold
+    edges = np.diff(active)
+    start_frames = np.flatnonzero(edges == 1)
+    end_frames = np.flatnonzero(edges == -1)
+
+    # Kare zamanı karenin merkezidir
+    offset = frame_length / 2.0
+    starts = (start_frames * hop_length + offset) / sample_rate
+    ends = (end_frames * hop_length + offset) / sample_rate
+
+    open_ended = len(end_frames) > 0 and end_frames[-1] == len(rms)
+    if open_ended and total_duration is not None:
+        ends[-1] = total_duration
+
+    keep = (ends - starts) > min_duration
+    if open_ended:
+        keep[-1] = True
+
+    return [(float(start), float(end)) for start, end in zip(starts[keep], ends[keep])]
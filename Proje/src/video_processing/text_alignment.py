@@ -0,0 +1,226 @@
+import re
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MATCH_SCORE = 2.0
+PREFIX_SCORE = 1.0
+MISMATCH_SCORE = -1.0
+GAP_SCORE = -1.0
+PREFIX_LENGTH = 4
+
+_TOKEN_PATTERN = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def normalize_token(text):
+    """Kelimeyi karşılaştırma için küçük harfe çevir ve noktalamadan arındır"""
+    text = text.replace('İ', 'i').replace('I', 'ı').lower()
+    return _TOKEN_PATTERN.sub('', text)
+
+
+def tokenize(text):
+    """Metni normalize edilmiş kelimelere böl (boş kalanlar atılır)"""
+    tokens = (normalize_token(part) for part in text.split())
+    return [token for token in tokens if token]
+
+
+class _Vocabulary:
+    """Kelime ve önek tamsayı kimlikleri; karşılaştırmalar numpy üzerinde yapılır"""
+
+    def __init__(self):
+        self.ids = {}
+
+    def encode(self, tokens):
+        return np.array([self.ids.setdefault(token, len(self.ids)) for token in tokens], dtype=np.int64)
+
+    def encode_prefixes(self, tokens):
+        return self.encode([token[:PREFIX_LENGTH] for token in tokens])
+
+
+def _band_limits(row, rows, cols, width):
+    """row satırı için bant sınırları [lo, hi] (köşegen satır/sütun oranıyla ölçeklenir)"""
+    center = int(round(row * cols / rows)) if rows else 0
+    return max(0, center - width), min(cols, center + width)
+
+
+def align_token_streams(reference_ids, reference_prefixes, target_ids, target_prefixes, band_width):
+    """Referans dizisini hedef diziye bantlı global hizalamayla eşle
+
+    Needleman-Wunsch; hedef dizinin başındaki ve sonundaki fazlalıklar
+    cezasızdır (yarı-global). Satır içindeki yatay boşluk bağımlılığı
+    kümülatif maksimumla vektörel çözülür; yalnızca bant içindeki geri izleme
+    işaretçileri saklanır. Her referans kelimesi için eşlenen hedef indeksini
+    (-1: eşleşme yok) ve tam eşleşme bayrağını döndürür.
+    """
+    rows = len(reference_ids)
+    cols = len(target_ids)
+    matched = np.full(rows, -1, dtype=np.int64)
+    exact = np.zeros(rows, dtype=bool)
+    if rows == 0 or cols == 0:
+        return matched, exact
+
+    # Satır 0: hedefin başındaki kelimeler cezasız atlanır
+    prev_lo, prev_hi = _band_limits(0, rows, cols, band_width)
+    prev = np.zeros(prev_hi - prev_lo + 1)
+
+    pointers = []
+    lows = []
+    for i in range(1, rows + 1):
+        lo, hi = _band_limits(i, rows, cols, band_width)
+        lo = max(lo, prev_lo)  # yol monoton olduğundan bant geri gitmez
+        columns = np.arange(lo, hi + 1)
+
+        # Üst komşu (referans kelimesi atlanır)
+        up = np.full(len(columns), -np.inf)
+        overlap = (columns >= prev_lo) & (columns <= prev_hi)
+        up[overlap] = prev[columns[overlap] - prev_lo] + GAP_SCORE
+
+        # Çapraz komşu (eşleşme ya da değiştirme)
+        diag = np.full(len(columns), -np.inf)
+        diag_columns = columns - 1
+        valid = (diag_columns >= prev_lo) & (diag_columns <= prev_hi)
+        target_index = diag_columns[valid]
+        scores = np.where(
+            target_ids[target_index] == reference_ids[i - 1], MATCH_SCORE,
+            np.where(target_prefixes[target_index] == reference_prefixes[i - 1], PREFIX_SCORE, MISMATCH_SCORE)
+        )
+        diag[valid] = prev[target_index - prev_lo] + scores
+
+        best = np.maximum(diag, up)
+        pointer = np.where(diag >= up, 0, 1).astype(np.int8)
+
+        # Sol komşu: D[j] = max_k(C[k] + (j - k) * gap) = j * gap + cummax(C[k] - k * gap)
+        offsets = columns * GAP_SCORE
+        current = np.maximum.accumulate(best - offsets) + offsets
+        pointer[current > best] = 2
+
+        pointers.append(pointer)
+        lows.append(lo)
+        prev, prev_lo, prev_hi = current, lo, hi
+
+    # Son satırda en iyi sütundan geri izle (sondaki fazlalık cezasız)
+    j = prev_lo + int(np.argmax(prev))
+    i = rows
+    while i > 0:
+        pointer = pointers[i - 1][j - lows[i - 1]]
+        if pointer == 0:
+            matched[i - 1] = j - 1
+            exact[i - 1] = target_ids[j - 1] == reference_ids[i - 1]
+            i -= 1
+            j -= 1
+        elif pointer == 1:
+            i -= 1
+        else:
+            j -= 1
+
+    return matched, exact
+
+
+def align_cues_to_words(cue_texts, words, band_width=None):
+    """Tüm altyazı metinlerini tüm kelime akışına tek geçişte, monoton olarak hizala
+
+    words: {'text', 'start', 'end'} sözlükleri. Her altyazı için
+    {'start', 'end', 'confidence'} (hizalanan kelime yoksa None) listesi döndürür;
+    eşleşmeler sıralı olduğundan altyazı zamanları birbirini kesmez.
+    """
+    vocabulary = _Vocabulary()
+
+    cue_tokens = []
+    cue_ids = []
+    for cue_index, text in enumerate(cue_texts):
+        tokens = tokenize(text)
+        cue_tokens.extend(tokens)
+        cue_ids.extend([cue_index] * len(tokens))
+    cue_ids = np.array(cue_ids, dtype=np.int64)
+
+    word_tokens = [normalize_token(word['text']) for word in words]
+    word_starts = np.array([word['start'] for word in words], dtype=np.float64)
+    word_ends = np.array([word['end'] for word in words], dtype=np.float64)
+
+    if band_width is None:
+        band_width = max(50, abs(len(cue_tokens) - len(word_tokens)) + 20, int(0.05 * max(len(cue_tokens), len(word_tokens))))
+
+    matched, exact = align_token_streams(
+        vocabulary.encode(cue_tokens), vocabulary.encode_prefixes(cue_tokens),
+        vocabulary.encode(word_tokens), vocabulary.encode_prefixes(word_tokens),
+        band_width
+    )
+
+    results = [None] * len(cue_texts)
+    if len(cue_ids) == 0:
+        return results
+
+    # Altyazı başına ilk/son eşlenen kelime ve tam eşleşme oranı
+    token_counts = np.bincount(cue_ids, minlength=len(cue_texts))
+    exact_counts = np.bincount(cue_ids, weights=exact, minlength=len(cue_texts))
+    has_match = matched >= 0
+    aligned_cues = cue_ids[has_match]
+    aligned_words = matched[has_match]
+
+    first_word = np.full(len(cue_texts), np.iinfo(np.int64).max)
+    last_word = np.full(len(cue_texts), -1)
+    np.minimum.at(first_word, aligned_cues, aligned_words)
+    np.maximum.at(last_word, aligned_cues, aligned_words)
+
+    for cue_index in np.flatnonzero(last_word >= 0):
+        results[cue_index] = {
+            'start': float(word_starts[first_word[cue_index]]),
+            'end': float(word_ends[last_word[cue_index]]),
+            'confidence': float(exact_counts[cue_index] / token_counts[cue_index])
+        }
+    return results
+
+
+class SegmentIndex:
+    """Transkript segmentleri için ters indeks
+
+    Transkript başına bir kez kurulur: normalize kelime -> segment kimlikleri
+    ve segment başına önceden hesaplanmış kelime kümesi boyutları. Sorgularda
+    yalnızca ortak kelimesi olan segmentler puanlanır (Jaccard benzerliği).
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.starts = np.array([segment['start'] for segment in segments], dtype=np.float64)
+        self.ends = np.array([segment['end'] for segment in segments], dtype=np.float64)
+
+        postings = {}
+        sizes = []
+        for segment_id, segment in enumerate(segments):
+            if segment.get('words'):
+                text = ' '.join(word.get('word', word.get('text', '')) for word in segment['words'])
+            else:
+                text = segment.get('text', '')
+            tokens = set(tokenize(text))
+            sizes.append(len(tokens))
+            for token in tokens:
+                postings.setdefault(token, []).append(segment_id)
+
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.postings = {token: np.array(ids, dtype=np.int64) for token, ids in postings.items()}
+
+    def best_match(self, text, expected_time=None, window=None):
+        """Metne en benzer segmenti bul; (segment kimliği, benzerlik) ya da (None, 0.0)
+
+        expected_time ve window verilirse önce bu zaman penceresindeki adaylar
+        puanlanır, pencerede aday yoksa tüm adaylara bakılır.
+        """
+        tokens = set(tokenize(text))
+        hits = [self.postings[token] for token in tokens if token in self.postings]
+        if not hits:
+            return None, 0.0
+
+        # Her aday segmentin sorguyla ortak kelime sayısı
+        candidates, intersections = np.unique(np.concatenate(hits), return_counts=True)
+
+        if expected_time is not None and window is not None:
+            in_window = np.abs(self.starts[candidates] - expected_time) <= window
+            if in_window.any():
+                candidates = candidates[in_window]
+                intersections = intersections[in_window]
+
+        unions = len(tokens) + self.sizes[candidates] - intersections
+        scores = intersections / unions
+        best = int(np.argmax(scores))
+        return int(candidates[best]), float(scores[best])
@@ -1,53 +1,356 @@
 import os
+import time
+import shutil
+import threading
+import hashlib
 import logging
+import tempfile
 import ffmpeg
-from pydub import AudioSegment
 import subprocess
+import numpy as np
+from functools import partial
+from fractions import Fraction
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from ..media_probe import get_media_probe
+from .segmented_render import plan_chunks, concat_chunks, measure_ssim
+from .ffmpeg_runner import FFmpegRunner, FFmpegRunError, FFmpegCancelled
+from .text_alignment import align_cues_to_words, SegmentIndex
+from .dtw_alignment import align_audio
+from .offset_estimation import cue_activity_envelope, estimate_offset
+from .speech_activity import (
+    stream_frame_rms, detect_speech_segments,
+    DEFAULT_SAMPLE_RATE, DEFAULT_HOP_LENGTH, DEFAULT_FRAME_LENGTH
+)
+from .render_profiles import RenderProfileTuner, DEFAULT_PROFILE, get_profile
+from .youtube_compliance import YouTubeComplianceChecker, YOUTUBE_SAMPLE_RATES
+from .slideshow import SlideshowBuilder, list_images
+from .smart_cut import SmartCutter, merge_ranges
+from ..subtitles.subtitle_io import SubtitleTrack, format_srt_time
+from ..subtitles.subtitle_standards import SubtitleStandards, validate_track, fix_track
+from ..audio_synthesis.timing_model import TimingTrack
 
 logger = logging.getLogger(__name__)
 
 class VideoEditor:
+    # Yakılan altyazılar için ortak stil
+    SUBTITLE_FORCE_STYLE = 'FontName=Arial,FontSize=22,PrimaryColour=&Hffffff,SecondaryColour=&Hffffff,OutlineColour=&H000000,BackColour=&H80000000,Outline=2,Shadow=1,MarginV=30,Alignment=2'
+    
     def __init__(self):
         self.video_quality = os.getenv('VIDEO_QUALITY', '720p')
         self.output_dir = os.getenv('OUTPUT_VIDEOS_FOLDER', 'data/final_videos')
+        # Tüm dilleri tek ffmpeg sürecinde, ortak decode/scale ile render et
+        self.multi_output_render = os.getenv('MULTI_OUTPUT_RENDER', 'false').lower() == 'true'
+        # Ortak taban videoyu bir kez kodla, dilleri yalnızca mux ederek üret (soft altyazı)
+        self.shared_base_render = os.getenv('SHARED_BASE_RENDER', 'false').lower() == 'true'
+        self.base_video_dir = os.getenv('BASE_VIDEO_CACHE_DIR', 'data/cache/base_videos')
+        self.base_video_cache_max = int(os.getenv('BASE_VIDEO_CACHE_MAX', '4'))
+        # Uzun render'ları kare hizalı parçalar halinde paralel kodla
+        self.segmented_render = os.getenv('SEGMENTED_RENDER', 'false').lower() == 'true'
+        self.segment_seconds = float(os.getenv('SEGMENT_SECONDS', '30'))
+        self.segment_workers = int(os.getenv('SEGMENT_WORKERS', '0')) or (os.cpu_count() or 1)
+        self.segment_verify = os.getenv('SEGMENTED_RENDER_VERIFY', 'false').lower() == 'true'
+        self.segment_min_ssim = float(os.getenv('SEGMENTED_RENDER_MIN_SSIM', '0.98'))
+        # Kodlama profili: default, auto (kaynak üzerinde benchmark) ya da profil adı
+        self.render_profile_mode = os.getenv('RENDER_PROFILE', 'default').lower()
+        if self.render_profile_mode in ('default', 'auto'):
+            self.render_profile = DEFAULT_PROFILE
+        else:
+            self.render_profile = get_profile(self.render_profile_mode)
+        # İlerleme bildirimi, süre sınırı (0: sınırsız) ve iptal
+        self.progress_callback = None
+        self.render_timeout = float(os.getenv('RENDER_TIMEOUT_SECONDS', '0'))
+        self.cancel_event = threading.Event()
+        # Whisper segment eşleştirmesinde beklenen konum çevresindeki arama penceresi (saniye)
+        self.whisper_match_window = float(os.getenv('WHISPER_MATCH_WINDOW_SECONDS', '30'))
+        # Render öncesi altyazıları TTS kelime zamanlamalarına hizala (ASR geçişi yapılmaz)
+        self.subtitle_word_sync = os.getenv('SUBTITLE_WORD_SYNC', 'false').lower() == 'true'
+        # Çapraz korelasyonla offset tahmininde aranan en büyük kayma ve asgari güven
+        self.max_subtitle_offset = float(os.getenv('SUBTITLE_MAX_OFFSET_SECONDS', '30'))
+        self.min_offset_confidence = float(os.getenv('SUBTITLE_OFFSET_MIN_CONFIDENCE', '0.2'))
+        # Altyazı süre, boşluk, okuma hızı ve satır kuralları
+        self.subtitle_standards = SubtitleStandards.from_env()
+        # Yükleme öncesi uyumluluk denetimi: uyumlu dosyalar yeniden kodlanmaz
+        self.youtube_checker = YouTubeComplianceChecker()
+        # Arka plan: video (kaynak video), slideshow (resim klasörü) ya da
+        # auto (kaynak video ses kaydına göre döngüye girecekse slayt gösterisi)
+        self.background_mode = os.getenv('BACKGROUND_MODE', 'video').lower()
+        self.images_dir = os.getenv('IMAGES_FOLDER', 'data/images')
+        self.slide_min_seconds = float(os.getenv('SLIDESHOW_MIN_SECONDS', '4'))
+        self.slideshow_builder = SlideshowBuilder() if self.background_mode != 'video' else None
+        # Sessizlik kesimi: eşik (dBFS), kesilecek en kısa sessizlik ve konuşma çevresinde bırakılan pay
+        self.silence_threshold_db = float(os.getenv('SILENCE_THRESHOLD_DB', '-40'))
+        self.silence_min_seconds = float(os.getenv('SILENCE_MIN_SECONDS', '0.7'))
+        self.silence_padding = float(os.getenv('SILENCE_PADDING_SECONDS', '0.15'))
+        # Önizleme: düşük çözünürlük, ultrafast; ilk N saniye ya da örneklenen altyazılar çevresindeki pencereler
+        self.preview_mode = os.getenv('PREVIEW_MODE', 'false').lower() == 'true'
+        self.preview_dir = os.getenv('PREVIEW_OUTPUT_FOLDER', 'data/previews')
+        self.preview_height = int(os.getenv('PREVIEW_HEIGHT', '360'))
+        self.preview_seconds = float(os.getenv('PREVIEW_SECONDS', '0'))
+        self.preview_cue_samples = int(os.getenv('PREVIEW_CUE_SAMPLES', '0'))
+        self.preview_cue_padding = float(os.getenv('PREVIEW_CUE_PADDING_SECONDS', '2'))
+        self.preview_serve_port = int(os.getenv('PREVIEW_SERVE_PORT', '0'))
+        self.preview_serve_host = os.getenv('PREVIEW_SERVE_HOST', '127.0.0.1')
+        self.preview_server = None
         
     def create_multilang_videos(self, video_path, audio_files, subtitle_files):
-        """Her dil için video oluştur"""
+        """Her dil için yayına hazır video oluştur (önizleme için create_previews)"""
+        self._reset_cancel()
         final_videos = {}
         
-        for lang_code in audio_files.keys():
+        if self.render_profile_mode == 'auto':
+            self.render_profile = self._select_render_profile(video_path)
+        
+        jobs = self._build_render_jobs(audio_files, subtitle_files, self.output_dir, 'final_video')
+        
+        if self._use_slideshow_background(video_path, audio_files):
+            # Slayt geçişleri her dilin kendi zamanlamasına hizalandığından arka plan dile özeldir;
+            # ortak taban ve tek geçiş modları bu durumda kullanılmaz
+            for job in jobs:
+                try:
+                    logger.info(f"{job['language']} için slayt gösterisi arka planıyla video oluşturuluyor...")
+                    self._create_slideshow_video(audio_files[job['language']], job)
+                except Exception as e:
+                    logger.error(f"{job['language']} video oluşturma hatası: {str(e)}")
+                    raise
+        elif self.shared_base_render:
+            logger.info(f"{len(jobs)} dil ortak taban video üzerinden mux ediliyor...")
+            self._create_multilang_videos_from_base(video_path, jobs)
+        elif self.multi_output_render and len(jobs) > 1:
+            logger.info(f"{len(jobs)} dil tek ffmpeg sürecinde oluşturuluyor...")
+            self._create_multilang_videos_single_pass(video_path, jobs)
+        else:
+            for job in jobs:
+                try:
+                    logger.info(f"{job['language']} için video oluşturuluyor...")
+                    
+                    # Video oluştur
+                    self._create_video_with_audio_and_subtitles(
+                        video_path, job['audio_path'], job['subtitle_path'], job['output_path'],
+                        audio_prenormalized=job['audio_prenormalized']
+                    )
+                    
+                except Exception as e:
+                    logger.error(f"{job['language']} video oluşturma hatası: {str(e)}")
+                    raise
+        
+        for job in jobs:
+            final_videos[job['language']] = self._job_result(job)
+            logger.info(f"{job['language']} video oluşturuldu: {job['output_path']}")
+        
+        return final_videos
+    
+    def create_previews(self, video_path, audio_files, subtitle_files):
+        """Her dil için hızlı QA önizlemesi oluştur
+        
+        Tam render yerine düşük çözünürlük ve ultrafast ile, isteğe bağlı olarak
+        yalnızca ilk N saniye ya da örneklenen altyazılar çevresindeki pencereler
+        kodlanır. Çıktılar önizleme klasörüne yazılır ve 'preview' ile işaretlenir;
+        yükleme adımına verilmemelidir.
+        """
+        self._reset_cancel()
+        previews = {}
+        os.makedirs(self.preview_dir, exist_ok=True)
+        
+        jobs = self._build_render_jobs(audio_files, subtitle_files, self.preview_dir, 'preview_video')
+        for job in jobs:
             try:
-                logger.info(f"{lang_code} için video oluşturuluyor...")
-                
-                audio_path = audio_files[lang_code]['path']
-                subtitle_path = subtitle_files[lang_code]['path']
-                
-                output_path = os.path.join(
-                    self.output_dir, 
-                    f'final_video_{lang_code}.mp4'
-                )
-                
-                # Video oluştur
-                self._create_video_with_audio_and_subtitles(
-                    video_path, audio_path, subtitle_path, output_path
-                )
-                
-                final_videos[lang_code] = {
-                    'path': output_path,
-                    'language': lang_code,
-                    'audio_path': audio_path,
-                    'subtitle_path': subtitle_path
-                }
-                
-                logger.info(f"{lang_code} video oluşturuldu: {output_path}")
-                
+                logger.info(f"{job['language']} için önizleme oluşturuluyor...")
+                job['preview_windows'] = self._create_preview_video(video_path, job)
             except Exception as e:
-                logger.error(f"{lang_code} video oluşturma hatası: {str(e)}")
+                logger.error(f"{job['language']} önizleme oluşturma hatası: {str(e)}")
                 raise
+            
+            previews[job['language']] = dict(self._job_result(job), preview=True,
+                                              preview_windows=job['preview_windows'])
+            logger.info(f"{job['language']} önizleme oluşturuldu: {job['output_path']}")
         
-        return final_videos
+        if self.preview_serve_port:
+            base_url = self.serve_previews()
+            for video_data in previews.values():
+                video_data['preview_url'] = f"{base_url}/{os.path.basename(video_data['path'])}"
+                logger.info(f"Önizleme: {video_data['preview_url']}")
+        
+        return previews
+    
+    def _build_render_jobs(self, audio_files, subtitle_files, output_dir, file_prefix):
+        """Dil başına render işi: ses, (gerekirse kelimeye hizalanmış) altyazı ve çıktı yolu"""
+        jobs = []
+        for lang_code in audio_files.keys():
+            audio_path = audio_files[lang_code]['path']
+            subtitle_path = subtitle_files[lang_code]['path']
+            if self.subtitle_word_sync:
+                subtitle_path = self._sync_subtitles_to_word_timing(audio_files[lang_code], subtitle_path)
+            
+            jobs.append({
+                'language': lang_code,
+                'audio_path': audio_path,
+                'subtitle_path': subtitle_path,
+                'output_path': os.path.join(output_dir, f'{file_prefix}_{lang_code}.mp4'),
+                # Ses paketi aşamasında normalize edildiyse render'da loudnorm atlanır
+                'audio_prenormalized': bool(audio_files[lang_code].get('loudness'))
+            })
+        return jobs
+    
+    def _job_result(self, job):
+        return {
+            'path': job['output_path'],
+            'language': job['language'],
+            'audio_path': job['audio_path'],
+            'subtitle_path': job['subtitle_path']
+        }
+    
+    def _preview_windows(self, subtitle_path, duration):
+        """Önizlenecek (başlangıç, bitiş) pencereleri: örneklenen altyazılar, ilk N saniye ya da tamamı"""
+        if self.preview_cue_samples > 0:
+            track = SubtitleTrack.read(subtitle_path)
+            if len(track):
+                # Altyazılar dosya boyunca eşit aralıklarla örneklenir
+                rows = np.unique(np.linspace(0, len(track) - 1, self.preview_cue_samples).round().astype(np.int64))
+                windows = np.column_stack((track.starts[rows] - self.preview_cue_padding,
+                                           track.ends[rows] + self.preview_cue_padding))
+                return merge_ranges(windows, duration).tolist()
+        
+        if self.preview_seconds > 0:
+            return [[0.0, min(self.preview_seconds, duration)]]
+        return [[0.0, duration]]
+    
+    def _create_preview_video(self, video_path, job):
+        """Düşük çözünürlüklü, ultrafast önizleme render'ı; kullanılan pencereleri döndürür
+        
+        Her pencere girdi düzeyinde aranarak (-ss, -t) okunur, böylece yalnızca
+        önizlenen kısımlar çözülür. Pencere kareleri altyazı filtresinden önce
+        özgün zaman çizelgesine taşınır ki altyazılar gerçek zamanlarıyla yakılsın.
+        """
+        video_info = self._get_video_info(video_path)
+        audio_info = self._get_audio_info(job['audio_path'])
+        video_duration = video_info['duration']
+        windows = self._preview_windows(job['subtitle_path'], audio_info['duration'])
+        subtitle_path_fixed = job['subtitle_path'].replace('\\', '/')
+        
+        streams = []
+        for start, end in windows:
+            if audio_info['duration'] > video_duration:
+                # Ses videodan uzunsa video döngüdedir; pencere döngü içindeki konumdan okunur
+                input_video = ffmpeg.input(video_path, stream_loop=-1, ss=start % video_duration, t=end - start)
+            else:
+                input_video = ffmpeg.input(video_path, ss=start, t=end - start)
+            
+            video_stream = (
+                input_video['v']
+                .filter('scale', -2, self.preview_height)
+                .filter('setpts', f'PTS-STARTPTS+{start:.6f}/TB')
+                .filter('subtitles', subtitle_path_fixed, force_style=self.SUBTITLE_FORCE_STYLE)
+                .filter('setpts', 'PTS-STARTPTS')
+            )
+            audio_stream = ffmpeg.input(job['audio_path'], ss=start, t=end - start)['a'].filter('asetpts', 'PTS-STARTPTS')
+            streams.extend([video_stream, audio_stream])
+        
+        joined = ffmpeg.concat(*streams, v=1, a=1).node
+        out = ffmpeg.output(
+            joined[0], joined[1], job['output_path'],
+            vcodec='libx264',
+            preset='ultrafast',
+            crf=28,
+            pix_fmt='yuv420p',
+            acodec='aac',
+            audio_bitrate='96k',
+            movflags='faststart'
+        ).overwrite_output()
+        
+        preview_duration = sum(end - start for start, end in windows)
+        logger.info(f"Önizleme: {len(windows)} pencere, {preview_duration:.1f}s, {self.preview_height}p")
+        self._run_ffmpeg(out, job['output_path'], preview_duration)
+        return windows
+    
+    def serve_previews(self):
+        """Önizleme sunucusunun soketini aç; temel URL'i döndür
+
+        İstekler serve_previews_forever çağrılana kadar kuyrukta bekler.
+        """
+        if self.preview_server is None:
+            handler = partial(SimpleHTTPRequestHandler, directory=os.path.abspath(self.preview_dir))
+            self.preview_server = ThreadingHTTPServer((self.preview_serve_host, self.preview_serve_port), handler)
+            logger.info(f"Önizleme sunucusu başlatıldı: {self.preview_serve_host}:{self.preview_server.server_address[1]}")
+        return f"http://{self.preview_serve_host}:{self.preview_server.server_address[1]}"
     
-    def _create_video_with_audio_and_subtitles(self, video_path, audio_path, subtitle_path, output_path):
+    def serve_previews_forever(self):
+        """Önizlemeleri ön planda Ctrl+C'ye kadar yayınla, ardından sunucuyu kapat"""
+        if self.preview_server is None:
+            return
+        
+        logger.info("Önizlemeler yayınlanıyor, durdurmak için Ctrl+C")
+        try:
+            self.preview_server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Önizleme sunucusu durduruldu")
+        finally:
+            self.preview_server.server_close()
+            self.preview_server = None
+    
+    def _use_slideshow_background(self, video_path, audio_files):
+        """Arka plan moduna göre slayt gösterisi kullanılıp kullanılmayacağına karar ver"""
+        if self.background_mode not in ('slideshow', 'auto'):
+            return False
+        
+        if not list_images(self.images_dir):
+            logger.warning(f"Slayt gösterisi için resim bulunamadı: {self.images_dir}, kaynak video kullanılıyor")
+            return False
+        
+        if self.background_mode == 'slideshow':
+            return True
+        
+        # auto: kaynak video en uzun ses kaydından kısaysa döngü yerine slayt gösterisi
+        video_duration = self._get_video_info(video_path)['duration']
+        longest_audio = max(self._get_audio_info(audio['path'])['duration'] for audio in audio_files.values())
+        return longest_audio > video_duration
+    
+    def _slide_segment_starts(self, audio_data):
+        """Slayt geçişlerinin hizalanacağı segment başlangıçları"""
+        timing = audio_data.get('timing')
+        if timing is not None and len(timing):
+            return timing.starts
+        return [segment['start_time'] for segment in audio_data.get('segments', [])]
+    
+    def _create_slideshow_video(self, audio_data, job):
+        """Slayt gösterisini altyazı ve sesle tek kodlamada oluştur
+        
+        Hazır kareler concat demuxer ile doğrudan render grafiğine girer; ara
+        arka plan videosu kodlanmaz. Kareler hedef çözünürlükte hazırlandığından
+        ölçekleme yapılmaz.
+        """
+        audio_info = self._get_audio_info(job['audio_path'])
+        target_width, target_height = self._get_target_resolution()
+        list_path = self.slideshow_builder.prepare(
+            list_images(self.images_dir), self._slide_segment_starts(audio_data), audio_info['duration'],
+            target_width, target_height, job['output_path'] + '.concat.txt', self.slide_min_seconds
+        )
+        try:
+            video_with_subs = ffmpeg.filter(
+                self.slideshow_builder.input_stream(list_path),
+                'subtitles',
+                job['subtitle_path'].replace('\\', '/'),
+                force_style=self.SUBTITLE_FORCE_STYLE
+            )
+            
+            audio_stream = ffmpeg.input(job['audio_path'])['a']
+            if not job['audio_prenormalized']:
+                audio_stream = ffmpeg.filter(audio_stream, 'loudnorm')
+            
+            out = ffmpeg.output(
+                video_with_subs,
+                audio_stream,
+                job['output_path'],
+                t=f"{audio_info['duration']:.3f}",
+                **self._video_output_args(),
+                **self._audio_output_args(audio_info, job['audio_prenormalized'])
+            )
+            self._run_ffmpeg(out, job['output_path'], audio_info['duration'])
+        finally:
+            os.unlink(list_path)
+    
+    def _create_video_with_audio_and_subtitles(self, video_path, audio_path, subtitle_path, output_path,
+                                               audio_prenormalized=False, allow_segmented=True):
         """Video, ses ve altyazıyı profesyonel senkronizasyonla birleştir"""
         try:
             logger.info(f"Video oluşturuluyor: {output_path}")
@@ -62,48 +365,26 @@ class VideoEditor:
             logger.info(f"Video süresi: {video_info['duration']} saniye")
             logger.info(f"Ses süresi: {audio_info['duration']} saniye")
             
+            # Uzun render'lar parçalara bölünüp paralel kodlanır
+            if allow_segmented and self.segmented_render and audio_info['duration'] > 2 * self.segment_seconds:
+                self._create_video_segmented(
+                    video_path, audio_path, subtitle_path, output_path,
+                    video_info, audio_info, audio_prenormalized
+                )
+                return
+            
             # Altyazı dosyası zaten senkronize edilmiş durumda (AudioSegmenter tarafından)
             # Windows path'lerini FFmpeg için düzelt
             subtitle_path_fixed = subtitle_path.replace('\\', '/').replace('\\', '/')
             
-            # Video input
-            input_video = ffmpeg.input(video_path)
             # Ses input
             input_audio = ffmpeg.input(audio_path)
             
-            # Video stream'ini al (orijinal ses olmadan)
-            video_stream = input_video['v']
-            
             # Hedef çözünürlüğü al
             target_width, target_height = self._get_target_resolution()
             
-            # Kullanıcı gereksinimlerine göre ses-video uzunluk senkronizasyonu
-            video_duration = video_info['duration']
-            audio_duration = audio_info['duration']
-            
-            logger.info(f"Orijinal video süresi: {video_duration:.2f} saniye")
-            logger.info(f"Ses kaydı süresi: {audio_duration:.2f} saniye")
-            
-            # Video uzunluğu her zaman ses kaydının uzunluğuna göre ayarlanmalı
-            # Eğer ses kaydı videodan uzunsa, videoyu loop yaparak uzat
-            # Eğer ses kaydı videodan kısaysa, videoyu ses kaydı uzunluğuna kadar tekrarla
-            target_duration = audio_duration
-            
-            if audio_duration > video_duration:
-                # Ses kaydı videodan uzunsa, videoyu loop yaparak uzat
-                loop_count = int(audio_duration / video_duration) + 1
-                video_stream = ffmpeg.filter(video_stream, 'loop', loop=loop_count-1, size=32767)
-                video_stream = ffmpeg.filter(video_stream, 'trim', duration=target_duration)
-                video_stream = ffmpeg.filter(video_stream, 'setpts', 'PTS-STARTPTS')
-                logger.info(f"Video {loop_count} kez tekrarlanarak ses kaydı uzunluğuna ({target_duration:.2f} saniye) ayarlandı")
-            elif audio_duration < video_duration:
-                # Ses kaydı videodan kısaysa, videoyu ses kaydı uzunluğuna kadar kes
-                video_stream = ffmpeg.filter(video_stream, 'trim', duration=target_duration)
-                video_stream = ffmpeg.filter(video_stream, 'setpts', 'PTS-STARTPTS')
-                logger.info(f"Video süresi ses kaydına göre ayarlandı: {target_duration:.2f} saniye")
-            else:
-                # Ses ve video uzunlukları eşitse hiçbir şey yapma
-                logger.info(f"Ses ve video uzunlukları eşit: {target_duration:.2f} saniye")
+            # Video input (orijinal ses olmadan) - uzunluğu her zaman ses kaydının uzunluğuna göre ayarlanmalı
+            video_stream = self._open_fitted_video(video_path, video_info['duration'], audio_info['duration'])
             
             # Video çözünürlüğünü ayarla, altyazıları ekle (tek complex filtergraph)
             video_stream = ffmpeg.filter(video_stream, 'scale', target_width, target_height)
@@ -111,7 +392,7 @@ class VideoEditor:
                 video_stream, 
                 'subtitles', 
                 subtitle_path_fixed,
-                force_style='FontName=Arial,FontSize=22,PrimaryColour=&Hffffff,SecondaryColour=&Hffffff,OutlineColour=&H000000,BackColour=&H80000000,Outline=2,Shadow=1,MarginV=30,Alignment=2'
+                force_style=self.SUBTITLE_FORCE_STYLE
             )
             
             # Ses stream'ini al ve işle
@@ -120,53 +401,24 @@ class VideoEditor:
             # Ses kaydını target_duration'a göre ayarla (artık ses kaydının tam uzunluğu kullanılıyor)
             # Ses kaydı zaten hedef uzunluk olduğu için kesme işlemi yapmıyoruz
             
-            # Ses seviyesini normalize et
-            audio_stream = ffmpeg.filter(audio_stream, 'loudnorm')
+            # Ses seviyesini normalize et (ses paketi zaten normalize edildiyse atla)
+            if not audio_prenormalized:
+                audio_stream = ffmpeg.filter(audio_stream, 'loudnorm')
+            
+            # Normalize edilmiş AAC ses paketi yeniden kodlanmadan kopyalanır
+            audio_output_args = self._audio_output_args(audio_info, audio_prenormalized)
             
             # Output oluştur - Profesyonel senkronizasyon ayarları
             out = ffmpeg.output(
                 video_with_subs,
                 audio_stream,
                 output_path,
-                vcodec='libx264',
-                acodec='aac',
-                preset='medium',
-                crf=23,
-                pix_fmt='yuv420p',
-                audio_bitrate='128k',
-                # Profesyonel video-ses senkronizasyonu parametreleri
-                vsync='cfr',  # Sabit frame rate - senkronizasyon için kritik
-                video_track_timescale=90000,  # Yüksek hassasiyet zaman ölçeği
-                movflags='faststart',  # Web için optimize edilmiş başlangıç
-                fflags='+genpts',  # Presentation timestamp oluştur
-                avoid_negative_ts='make_zero'  # Negatif timestamp'leri önle
+                **self._video_output_args(),
+                **audio_output_args
             )
             
             # Mevcut dosyayı üzerine yaz ve çalıştır
-            try:
-                logger.info(f"FFmpeg komutu çalıştırılıyor: {output_path}")
-                ffmpeg.run(out, overwrite_output=True, capture_stdout=True, capture_stderr=True)
-                logger.info("FFmpeg komutu başarıyla tamamlandı")
-            except ffmpeg.Error as e:
-                stderr_output = e.stderr.decode('utf-8', errors='ignore') if e.stderr else 'Stderr çıktısı yok'
-                stdout_output = e.stdout.decode('utf-8', errors='ignore') if e.stdout else 'Stdout çıktısı yok'
-                
-                logger.error(f"FFmpeg Error: {e}")
-                logger.error(f"FFmpeg stderr: {stderr_output}")
-                logger.error(f"FFmpeg stdout: {stdout_output}")
-                
-                # Yaygın hataları kontrol et ve çözüm öner
-                if 'Invalid data found when processing input' in stderr_output:
-                    logger.error("Video dosyası bozuk olabilir. Farklı bir video dosyası deneyin.")
-                elif 'No such file or directory' in stderr_output:
-                    logger.error("Dosya bulunamadı. Dosya yollarını kontrol edin.")
-                elif 'Permission denied' in stderr_output:
-                    logger.error("Dosya izin hatası. Dosyanın başka bir program tarafından kullanılmadığından emin olun.")
-                
-                raise Exception(f"FFmpeg video oluşturma hatası: {stderr_output[:500]}")
-            except Exception as e:
-                logger.error(f"Beklenmeyen FFmpeg hatası: {str(e)}")
-                raise
+            self._run_ffmpeg(out, output_path, audio_info['duration'])
             
             logger.info(f"Video başarıyla oluşturuldu: {output_path}")
             
@@ -180,6 +432,381 @@ class VideoEditor:
             logger.error(f"Video oluşturma hatası: {str(e)}")
             raise
     
+    def _create_multilang_videos_single_pass(self, video_path, jobs):
+        """Tüm dilleri tek ffmpeg sürecinde oluştur
+
+        Kaynak bir kez decode edilip ölçeklenir, split ile her dile bir dal
+        ayrılır; her dalda o dilin altyazısı yakılır ve sesi kendi çıktısına mux edilir.
+        """
+        try:
+            video_info = self._get_video_info(video_path)
+            for job in jobs:
+                job['audio_info'] = self._get_audio_info(job['audio_path'])
+            
+            longest_duration = max(job['audio_info']['duration'] for job in jobs)
+            target_width, target_height = self._get_target_resolution()
+            
+            # Ortak decode + süre ayarı + ölçekleme (en uzun dil süresine göre)
+            video_stream = self._open_fitted_video(video_path, video_info['duration'], longest_duration)
+            video_stream = ffmpeg.filter(video_stream, 'scale', target_width, target_height)
+            branches = video_stream.filter_multi_output('split', len(jobs))
+            
+            outputs = []
+            for i, job in enumerate(jobs):
+                duration = job['audio_info']['duration']
+                
+                # Her dal kendi süresine kesilir ve kendi altyazısını yakar
+                branch = branches.stream(i)
+                if duration < longest_duration:
+                    branch = ffmpeg.filter(branch, 'trim', duration=duration)
+                    branch = ffmpeg.filter(branch, 'setpts', 'PTS-STARTPTS')
+                branch = ffmpeg.filter(
+                    branch,
+                    'subtitles',
+                    job['subtitle_path'].replace('\\', '/'),
+                    force_style=self.SUBTITLE_FORCE_STYLE
+                )
+                
+                audio_stream = ffmpeg.input(job['audio_path'])['a']
+                if not job['audio_prenormalized']:
+                    audio_stream = ffmpeg.filter(audio_stream, 'loudnorm')
+                
+                outputs.append(ffmpeg.output(
+                    branch,
+                    audio_stream,
+                    job['output_path'],
+                    **self._video_output_args(),
+                    **self._audio_output_args(job['audio_info'], job['audio_prenormalized'])
+                ))
+            
+            self._run_ffmpeg(ffmpeg.merge_outputs(*outputs), ', '.join(job['output_path'] for job in jobs), longest_duration)
+            logger.info(f"Tek geçişte {len(jobs)} video oluşturuldu")
+            
+        except Exception as e:
+            logger.error(f"Tek geçişli çoklu dil render hatası: {str(e)}")
+            raise
+    
+    def _create_multilang_videos_from_base(self, video_path, jobs):
+        """Ortak taban videoyu bir kez kodla, her dili yeniden kodlamadan mux et"""
+        try:
+            for job in jobs:
+                job['audio_info'] = self._get_audio_info(job['audio_path'])
+            
+            longest_duration = max(job['audio_info']['duration'] for job in jobs)
+            base_path = self._render_base_video(video_path, longest_duration)
+            
+            for job in jobs:
+                logger.info(f"{job['language']} için taban video mux ediliyor...")
+                self._mux_language_output(base_path, job)
+            
+        except Exception as e:
+            logger.error(f"Taban video ile çoklu dil render hatası: {str(e)}")
+            raise
+    
+    def _render_base_video(self, video_path, duration):
+        """Döngüye alınmış/kesilmiş ve ölçeklenmiş sessiz taban videoyu oluştur
+        
+        Kaynak içeriği, çözünürlük, süre ve kodlama ayarlarına göre önbelleklenir;
+        aynı kaynak için tekrar çalıştırmalarda yeniden kodlanmaz. Önbellekte en
+        son kullanılan BASE_VIDEO_CACHE_MAX dosya tutulur.
+        """
+        target_width, target_height = self._get_target_resolution()
+        stat = os.stat(video_path)
+        encoder_args = sorted(self._video_output_args().items())
+        cache_key = (f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}|"
+                     f"{target_width}x{target_height}|{duration:.3f}|{encoder_args}")
+        digest = hashlib.sha1(cache_key.encode('utf-8')).hexdigest()[:16]
+        
+        os.makedirs(self.base_video_dir, exist_ok=True)
+        base_path = os.path.join(self.base_video_dir, f'base_{digest}.mp4')
+        if os.path.exists(base_path):
+            # Son kullanım zamanı budama sırasını belirler
+            os.utime(base_path)
+            logger.info(f"Önbellekteki taban video kullanılıyor: {base_path}")
+            return base_path
+        
+        video_info = self._get_video_info(video_path)
+        video_stream = self._open_fitted_video(video_path, video_info['duration'], duration)
+        video_stream = ffmpeg.filter(video_stream, 'scale', target_width, target_height)
+        
+        # Yarım kalan dosya önbelleğe girmesin diye geçici isimle yaz
+        temp_path = base_path + '.part.mp4'
+        out = ffmpeg.output(video_stream, temp_path, **self._video_output_args())
+        self._run_ffmpeg(out, temp_path, duration)
+        os.replace(temp_path, base_path)
+        
+        logger.info(f"Taban video oluşturuldu: {base_path} ({duration:.2f} saniye)")
+        self._prune_base_video_cache()
+        return base_path
+    
+    def _prune_base_video_cache(self):
+        """En son kullanılan BASE_VIDEO_CACHE_MAX taban video dışındakileri sil"""
+        try:
+            entries = [
+                os.path.join(self.base_video_dir, name) for name in os.listdir(self.base_video_dir)
+                if name.startswith('base_') and name.endswith('.mp4') and not name.endswith('.part.mp4')
+            ]
+            entries.sort(key=os.path.getmtime, reverse=True)
+            for stale_path in entries[max(self.base_video_cache_max, 1):]:
+                os.unlink(stale_path)
+                logger.info(f"Eski taban video önbellekten silindi: {stale_path}")
+        except Exception as e:
+            logger.warning(f"Taban video önbelleği budanamadı: {str(e)}")
+    
+    def _mux_language_output(self, base_path, job):
+        """Taban videoyu dil süresine kopyalayarak kes; ses ve mov_text altyazıyı ekle"""
+        audio_info = job['audio_info']
+        
+        video_stream = ffmpeg.input(base_path)['v']
+        audio_stream = ffmpeg.input(job['audio_path'])['a']
+        subtitle_stream = ffmpeg.input(job['subtitle_path'])['s']
+        
+        if not job['audio_prenormalized']:
+            audio_stream = ffmpeg.filter(audio_stream, 'loudnorm')
+        
+        out = ffmpeg.output(
+            video_stream,
+            audio_stream,
+            subtitle_stream,
+            job['output_path'],
+            vcodec='copy',
+            scodec='mov_text',
+            t=audio_info['duration'],
+            movflags='faststart',
+            **self._audio_output_args(audio_info, job['audio_prenormalized'])
+        )
+        self._run_ffmpeg(out, job['output_path'], audio_info['duration'])
+    
+    def _create_video_segmented(self, video_path, audio_path, subtitle_path, output_path,
+                                video_info, audio_info, audio_prenormalized=False):
+        """Videoyu kare hizalı parçalara bölüp paralel kodla, concat demuxer ile birleştir
+        
+        Her parça kaynağın kendi konumundan okunur ve altyazılar parçanın zaman
+        çizelgesindeki konumuna kaydırılarak yakılır. Ses tek parça halinde son
+        mux aşamasında eklenir.
+        """
+        fps = video_info['fps'] or 30.0
+        chunks = plan_chunks(audio_info['duration'], fps, self.segment_seconds)
+        workers = min(self.segment_workers, len(chunks))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        chunk_dir = tempfile.mkdtemp(prefix='segments_', dir=self.output_dir)
+        logger.info(f"Segmentli render: {len(chunks)} parça, {workers} işçi, işçi başına {threads} thread")
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._render_chunk, video_path, subtitle_path, video_info['duration'],
+                        start, frame_count, fps, threads,
+                        os.path.join(chunk_dir, f'chunk_{i:05d}.mp4')
+                    )
+                    for i, (start, frame_count) in enumerate(chunks)
+                ]
+                chunk_paths = [future.result() for future in futures]
+            
+            video_only_path = os.path.join(chunk_dir, 'video.mp4')
+            concat_chunks(chunk_paths, video_only_path, self._ffmpeg_runner(progress=False))
+            
+            # Birleştirilmiş görüntüye sesi ekle (görüntü yeniden kodlanmaz)
+            audio_stream = ffmpeg.input(audio_path)['a']
+            if not audio_prenormalized:
+                audio_stream = ffmpeg.filter(audio_stream, 'loudnorm')
+            out = ffmpeg.output(
+                ffmpeg.input(video_only_path)['v'],
+                audio_stream,
+                output_path,
+                vcodec='copy',
+                movflags='faststart',
+                **self._audio_output_args(audio_info, audio_prenormalized)
+            )
+            self._run_ffmpeg(out, output_path, audio_info['duration'])
+            
+            if self.segment_verify:
+                self._verify_segmented_output(
+                    video_path, audio_path, subtitle_path, output_path, chunk_dir, audio_prenormalized
+                )
+            
+            logger.info(f"Segmentli video başarıyla oluşturuldu: {output_path}")
+            
+        except Exception as e:
+            logger.error(f"Segmentli render hatası: {str(e)}")
+            raise
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+    def _render_chunk(self, video_path, subtitle_path, video_duration, start, frame_count, fps, threads, chunk_path):
+        """Zaman çizelgesinin [start, start + frame_count / fps) aralığını kodla"""
+        target_width, target_height = self._get_target_resolution()
+        chunk_duration = frame_count / fps
+        
+        # Döngüye alınan kaynakta parçanın kaynak içindeki konumu
+        source_offset = start % video_duration
+        input_args = {'ss': source_offset}
+        if source_offset + chunk_duration > video_duration:
+            input_args['stream_loop'] = -1
+        
+        video_stream = ffmpeg.input(video_path, **input_args)['v']
+        video_stream = ffmpeg.filter(video_stream, 'scale', target_width, target_height)
+        # Altyazılar zaman çizelgesindeki gerçek konuma göre yakılır, sonra parça sıfırdan başlar
+        video_stream = ffmpeg.filter(video_stream, 'setpts', f'PTS-STARTPTS+{start}/TB')
+        video_stream = ffmpeg.filter(
+            video_stream,
+            'subtitles',
+            subtitle_path.replace('\\', '/'),
+            force_style=self.SUBTITLE_FORCE_STYLE
+        )
+        video_stream = ffmpeg.filter(video_stream, 'setpts', 'PTS-STARTPTS')
+        
+        # setpts kare hızı bilgisini düşürdüğü için kaynak hızı açıkça verilir
+        out = ffmpeg.output(
+            video_stream,
+            chunk_path,
+            r=str(Fraction(fps).limit_denominator(1001)),
+            threads=threads,
+            **{'frames:v': frame_count},
+            **self._video_output_args()
+        )
+        self._run_ffmpeg(out, chunk_path, chunk_duration)
+        return chunk_path
+    
+    def _verify_segmented_output(self, video_path, audio_path, subtitle_path, output_path, work_dir,
+                                 audio_prenormalized=False):
+        """Segmentli çıktıyı tek süreçli render ile SSIM üzerinden karşılaştır
+        
+        Eşik altında kalırsa tek süreçli render çıktı olarak kullanılır.
+        """
+        reference_path = os.path.join(work_dir, 'reference.mp4')
+        self._create_video_with_audio_and_subtitles(
+            video_path, audio_path, subtitle_path, reference_path,
+            audio_prenormalized=audio_prenormalized, allow_segmented=False
+        )
+        
+        ssim = measure_ssim(reference_path, output_path, self._ffmpeg_runner(progress=False))
+        logger.info(f"Segmentli render SSIM: {ssim:.4f} (eşik {self.segment_min_ssim})")
+        if ssim < self.segment_min_ssim:
+            logger.warning("Segmentli render kalite eşiğinin altında, tek süreçli çıktı kullanılıyor")
+            shutil.move(reference_path, output_path)
+        return ssim
+    
+    def _open_fitted_video(self, video_path, video_duration, target_duration):
+        """Kaynağı hedef süreye göre döngüye alınmış ya da kesilmiş video stream'i olarak aç
+        
+        Döngü ve kesme girdi düzeyinde (-stream_loop, -t) yapılır; loop filtresi
+        gibi kareleri bellekte tutmadığı için bellek kullanımı kaynak uzunluğundan
+        ve döngü sayısından bağımsızdır.
+        """
+        logger.info(f"Orijinal video süresi: {video_duration:.2f} saniye")
+        logger.info(f"Ses kaydı süresi: {target_duration:.2f} saniye")
+        
+        if target_duration > video_duration:
+            # Ses kaydı videodan uzunsa, videoyu demuxer düzeyinde döngüye alarak uzat
+            loop_count = int(target_duration / video_duration) + 1
+            input_video = ffmpeg.input(video_path, stream_loop=loop_count - 1, t=target_duration)
+            logger.info(f"Video {loop_count} kez tekrarlanarak ses kaydı uzunluğuna ({target_duration:.2f} saniye) ayarlandı")
+        elif target_duration < video_duration:
+            # Ses kaydı videodan kısaysa, videoyu ses kaydı uzunluğuna kadar oku
+            input_video = ffmpeg.input(video_path, t=target_duration)
+            logger.info(f"Video süresi ses kaydına göre ayarlandı: {target_duration:.2f} saniye")
+        else:
+            # Ses ve video uzunlukları eşitse hiçbir şey yapma
+            input_video = ffmpeg.input(video_path)
+            logger.info(f"Ses ve video uzunlukları eşit: {target_duration:.2f} saniye")
+        
+        return input_video['v']
+    
+    def _select_render_profile(self, video_path):
+        """Kaynak ve makine için ölçülmüş render profilini seç"""
+        try:
+            target_width, target_height = self._get_target_resolution()
+            tuner = RenderProfileTuner(runner=self._ffmpeg_runner(progress=False))
+            return tuner.select(video_path, target_width, target_height)
+        except FFmpegCancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"Render profili seçilemedi, varsayılan kullanılıyor: {str(e)}")
+            return DEFAULT_PROFILE
+    
+    def _video_output_args(self):
+        """libx264 çıkış parametreleri - profesyonel senkronizasyon ayarları"""
+        return {
+            'vcodec': 'libx264',
+            **self.render_profile.output_args(),
+            'pix_fmt': 'yuv420p',
+            # Profesyonel video-ses senkronizasyonu parametreleri
+            'vsync': 'cfr',  # Sabit frame rate - senkronizasyon için kritik
+            'video_track_timescale': 90000,  # Yüksek hassasiyet zaman ölçeği
+            'movflags': 'faststart',  # Web için optimize edilmiş başlangıç
+            'fflags': '+genpts',  # Presentation timestamp oluştur
+            'avoid_negative_ts': 'make_zero'  # Negatif timestamp'leri önle
+        }
+    
+    def cancel_render(self):
+        """Çalışan ffmpeg render'larını iptal et"""
+        self.cancel_event.set()
+    
+    def _reset_cancel(self):
+        """Önceki iptal isteği yeni render'ı durdurmasın; her render başında çağrılır"""
+        self.cancel_event.clear()
+    
+    def _ffmpeg_runner(self, output_path=None, progress=True):
+        """Editörün süre sınırı ve iptal olayını paylaşan FFmpegRunner oluştur"""
+        progress_callback = None
+        if progress:
+            progress_callback = self.progress_callback or self._progress_logger(output_path)
+        return FFmpegRunner(
+            progress_callback=progress_callback,
+            timeout=self.render_timeout or None,
+            cancel_event=self.cancel_event
+        )
+    
+    def _run_ffmpeg(self, out, output_path, total_duration=None):
+        """FFmpeg komutunu ilerleme takibiyle çalıştır, hata durumunda anlamlı mesaj üret"""
+        try:
+            logger.info(f"FFmpeg komutu çalıştırılıyor: {output_path}")
+            self._ffmpeg_runner(output_path).run_stream(out, total_duration)
+            logger.info("FFmpeg komutu başarıyla tamamlandı")
+        except FFmpegCancelled as e:
+            logger.error(f"FFmpeg render durduruldu: {str(e)}")
+            raise
+        except FFmpegRunError as e:
+            stderr_output = e.stderr_tail or 'Stderr çıktısı yok'
+            
+            logger.error(f"FFmpeg Error: {e}")
+            logger.error(f"FFmpeg stderr (son satırlar): {stderr_output}")
+            
+            # Yaygın hataları kontrol et ve çözüm öner
+            if 'Invalid data found when processing input' in stderr_output:
+                logger.error("Video dosyası bozuk olabilir. Farklı bir video dosyası deneyin.")
+            elif 'No such file or directory' in stderr_output:
+                logger.error("Dosya bulunamadı. Dosya yollarını kontrol edin.")
+            elif 'Permission denied' in stderr_output:
+                logger.error("Dosya izin hatası. Dosyanın başka bir program tarafından kullanılmadığından emin olun.")
+            
+            raise Exception(f"FFmpeg video oluşturma hatası: {stderr_output[-500:]}")
+        except Exception as e:
+            logger.error(f"Beklenmeyen FFmpeg hatası: {str(e)}")
+            raise
+    
+    def _progress_logger(self, output_path, interval=10.0):
+        """Varsayılan ilerleme callback'i: belirli aralıklarla log yazar"""
+        last_logged = [0.0]
+        name = os.path.basename(output_path)
+        
+        def log_progress(progress):
+            now = time.monotonic()
+            if not progress['done'] and now - last_logged[0] < interval:
+                return
+            last_logged[0] = now
+            
+            percent = f"%{progress['percent']:.1f}" if progress['percent'] is not None else '-'
+            eta = f"{progress['eta']:.0f}s" if progress['eta'] is not None else '-'
+            speed = f"{progress['speed']}x" if progress['speed'] is not None else '-'
+            logger.info(f"{name}: {percent}, kare {progress['frame']}, {progress['fps']} fps, hız {speed}, ETA {eta}")
+        
+        return log_progress
+    
     def _get_target_resolution(self):
         """Hedef çözünürlüğü al"""
         if self.video_quality == '720p':
@@ -194,22 +821,16 @@ class VideoEditor:
     def _get_video_info(self, video_path):
         """Video bilgilerini al"""
         try:
-            probe = ffmpeg.probe(video_path)
-            video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
+            info = get_media_probe().probe(video_path)
             
-            if video_stream is None:
+            if not info.has_video:
                 raise ValueError("Video stream bulunamadı")
             
-            duration = float(probe['format']['duration'])
-            width = int(video_stream['width'])
-            height = int(video_stream['height'])
-            fps = eval(video_stream['r_frame_rate'])
-            
             return {
-                'duration': duration,
-                'width': width,
-                'height': height,
-                'fps': fps
+                'duration': info.duration,
+                'width': info.width,
+                'height': info.height,
+                'fps': info.fps
             }
             
         except Exception as e:
@@ -219,97 +840,52 @@ class VideoEditor:
     def _get_audio_info(self, audio_path):
         """Ses bilgilerini al"""
         try:
-            audio = AudioSegment.from_mp3(audio_path)
+            info = get_media_probe().probe(audio_path)
             return {
-                'duration': len(audio) / 1000.0,
-                'channels': audio.channels,
-                'frame_rate': audio.frame_rate
+                'duration': info.duration,
+                'channels': info.channels,
+                'frame_rate': info.sample_rate,
+                'codec': info.audio_codec
             }
         except Exception as e:
             logger.error(f"Ses bilgi alma hatası: {str(e)}")
             raise
     
+    def _audio_output_args(self, audio_info, audio_prenormalized):
+        """Ses çıkış parametreleri: mux'a hazır AAC ise kopyala, değilse AAC'ye kodla"""
+        if audio_prenormalized and audio_info.get('codec') == 'aac':
+            return {'acodec': 'copy'}
+        return {'acodec': 'aac', 'audio_bitrate': '128k'}
+    
     # Eski senkronizasyon metodları kaldırıldı - AudioSegmenter kullanılıyor
     
     def _parse_srt_file(self, subtitle_path):
         """SRT dosyasını parse et"""
         try:
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            import re
-            
-            # SRT formatını parse et
-            pattern = r'(\d+)\n(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})\n([\s\S]*?)(?=\n\d+\n|\Z)'
-            matches = re.findall(pattern, content)
-            
-            subtitles = []
-            for match in matches:
-                index, start_time, end_time, text = match
-                subtitles.append({
-                    'index': int(index),
-                    'start': self._time_to_seconds(start_time),
-                    'end': self._time_to_seconds(end_time),
-                    'text': text.strip()
-                })
-            
-            return subtitles
+            return SubtitleTrack.read(subtitle_path).to_dicts()
         except Exception as e:
             logger.error(f"SRT parse hatası: {str(e)}")
             return []
     
-    def _time_to_seconds(self, time_str):
-        """SRT zaman formatını saniyeye çevir"""
-        try:
-            time_part, ms_part = time_str.split(',')
-            h, m, s = map(int, time_part.split(':'))
-            ms = int(ms_part)
-            return h * 3600 + m * 60 + s + ms / 1000.0
-        except:
-            return 0.0
-    
-    def _seconds_to_time(self, seconds):
-        """Saniyeyi SRT zaman formatına çevir"""
-        try:
-            h = int(seconds // 3600)
-            m = int((seconds % 3600) // 60)
-            s = int(seconds % 60)
-            ms = int((seconds % 1) * 1000)
-            return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-        except:
-            return "00:00:00,000"
-    
-    def _align_subtitles_with_whisper(self, original_subtitles, whisper_result):
+    def _align_subtitles_with_whisper(self, original_subtitles, whisper_result, window=None):
         """Whisper sonuçlarını kullanarak altyazıları hizala"""
         try:
             if not whisper_result.get('segments'):
                 logger.warning("Whisper segmentleri bulunamadı")
                 return original_subtitles
             
-            whisper_segments = whisper_result['segments']
+            # Transkript başına bir kez ters indeks kur
+            index = SegmentIndex(whisper_result['segments'])
+            window = window if window is not None else self.whisper_match_window
             aligned_subtitles = []
             
-            # Her orijinal altyazı için en uygun Whisper segmentini bul
-            for i, subtitle in enumerate(original_subtitles):
-                best_match = None
-                best_score = 0
-                
-                # Metin benzerliği ile eşleştir
-                for segment in whisper_segments:
-                    if 'words' in segment:
-                        segment_text = ' '.join([word['word'] for word in segment['words']]).strip()
-                    else:
-                        segment_text = segment.get('text', '').strip()
-                    
-                    # Basit metin benzerliği hesapla
-                    similarity = self._calculate_text_similarity(subtitle['text'], segment_text)
-                    
-                    if similarity > best_score:
-                        best_score = similarity
-                        best_match = segment
+            # Her orijinal altyazı için beklenen konum çevresindeki en uygun Whisper segmentini bul
+            for subtitle in original_subtitles:
+                segment_id, best_score = index.best_match(subtitle['text'], subtitle.get('start'), window)
                 
                 # En iyi eşleşmeyi kullan
-                if best_match and best_score > 0.3:  # %30 benzerlik eşiği
+                if segment_id is not None and best_score > 0.3:  # %30 benzerlik eşiği
+                    best_match = index.segments[segment_id]
                     aligned_subtitle = {
                         'index': subtitle['index'],
                         'start': best_match['start'],
@@ -328,55 +904,12 @@ class VideoEditor:
             logger.error(f"Whisper hizalama hatası: {str(e)}")
             return original_subtitles
     
-    def _calculate_text_similarity(self, text1, text2):
-        """İki metin arasındaki benzerliği hesapla"""
-        try:
-            # Basit kelime tabanlı benzerlik
-            words1 = set(text1.lower().split())
-            words2 = set(text2.lower().split())
-            
-            if not words1 and not words2:
-                return 1.0
-            if not words1 or not words2:
-                return 0.0
-            
-            intersection = len(words1.intersection(words2))
-            union = len(words1.union(words2))
-            
-            return intersection / union if union > 0 else 0.0
-        except:
-            return 0.0
-    
     def _optimize_for_netflix_standards(self, subtitles):
         """Netflix standartlarına göre altyazıları optimize et"""
         try:
-            optimized = []
-            
-            for i, subtitle in enumerate(subtitles):
-                duration = subtitle['end'] - subtitle['start']
-                
-                # Netflix minimum süre: 0.833 saniye
-                if duration < 0.833:
-                    subtitle['end'] = subtitle['start'] + 0.833
-                
-                # Netflix maksimum süre: 7 saniye
-                elif duration > 7.0:
-                    subtitle['end'] = subtitle['start'] + 7.0
-                
-                # Minimum boşluk kontrolü (0.125 saniye)
-                if i < len(subtitles) - 1:
-                    next_subtitle = subtitles[i + 1]
-                    gap = next_subtitle['start'] - subtitle['end']
-                    
-                    if gap < 0.125:
-                        # Boşluğu ayarla
-                        mid_point = (subtitle['end'] + next_subtitle['start']) / 2
-                        subtitle['end'] = mid_point - 0.0625
-                        next_subtitle['start'] = mid_point + 0.0625
-                
-                optimized.append(subtitle)
-            
-            return optimized
+            fixed, report = fix_track(SubtitleTrack.from_dicts(subtitles), self.subtitle_standards)
+            logger.info(f"Netflix optimizasyonu: {report.summary()}")
+            return fixed.to_dicts()
             
         except Exception as e:
             logger.error(f"Netflix optimizasyon hatası: {str(e)}")
@@ -385,11 +918,7 @@ class VideoEditor:
     def _write_srt_file(self, subtitles, output_path):
         """Altyazıları SRT formatında kaydet"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                for subtitle in subtitles:
-                    f.write(f"{subtitle['index']}\n")
-                    f.write(f"{self._seconds_to_time(subtitle['start'])} --> {self._seconds_to_time(subtitle['end'])}\n")
-                    f.write(f"{subtitle['text']}\n\n")
+            SubtitleTrack.from_dicts(subtitles).write(output_path)
             
             logger.info(f"SRT dosyası kaydedildi: {output_path}")
             
@@ -414,66 +943,15 @@ class VideoEditor:
             return subtitle_path
     
     def _validate_netflix_standards(self, subtitle_path, audio_duration):
-        """Netflix standartlarına göre altyazı kalitesini doğrula"""
+        """Netflix standartlarına göre altyazı kalitesini doğrula
+        
+        Süre, boşluk, çakışma, okuma hızı ve satır kuralları vektörel denetlenir;
+        son altyazı ses süresiyle %95 uyumlu ve süre/boşluk uyumu %80 olmalıdır.
+        """
         try:
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            import re
-            
-            # Zaman formatını kontrol et
-            time_pattern = r'(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})'
-            times = re.findall(time_pattern, content)
-            
-            if not times:
-                return False
-            
-            # Netflix standartları:
-            # 1. Minimum altyazı süresi: 0.833 saniye (20 frame @ 24fps)
-            # 2. Maksimum altyazı süresi: 7 saniye
-            # 3. Minimum boşluk: 0.125 saniye (3 frame @ 24fps)
-            # 4. Maksimum karakter: 42 per line, 2 lines max
-            
-            valid_count = 0
-            total_count = len(times)
-            
-            for i, time_match in enumerate(times):
-                start_h, start_m, start_s, start_ms, end_h, end_m, end_s, end_ms = time_match
-                
-                start_total = int(start_h) * 3600 + int(start_m) * 60 + int(start_s) + int(start_ms) / 1000
-                end_total = int(end_h) * 3600 + int(end_m) * 60 + int(end_s) + int(end_ms) / 1000
-                
-                duration = end_total - start_total
-                
-                # Süre kontrolü
-                if 0.833 <= duration <= 7.0:
-                    valid_count += 1
-                
-                # Boşluk kontrolü (bir sonraki altyazıyla)
-                if i < len(times) - 1:
-                    next_time = times[i + 1]
-                    next_start = (int(next_time[0]) * 3600 + int(next_time[1]) * 60 + 
-                                int(next_time[2]) + int(next_time[3]) / 1000)
-                    gap = next_start - end_total
-                    if gap < 0.125:
-                        valid_count -= 0.5  # Penaltı
-            
-            # Son altyazının ses süresiyle uyumu
-            if times:
-                last_time = times[-1]
-                last_end = (int(last_time[4]) * 3600 + int(last_time[5]) * 60 + 
-                          int(last_time[6]) + int(last_time[7]) / 1000)
-                
-                # %95 uyum oranı
-                sync_ratio = min(last_end, audio_duration) / max(last_end, audio_duration)
-                if sync_ratio < 0.95:
-                    return False
-            
-            # %80 geçerlilik oranı
-            validity_ratio = valid_count / total_count
-            logger.info(f"Netflix standart uyumu: {validity_ratio:.2%}")
-            
-            return validity_ratio >= 0.80
+            report = validate_track(SubtitleTrack.read(subtitle_path), self.subtitle_standards, audio_duration)
+            logger.info(f"Netflix standart uyumu: {report.summary()}")
+            return report.passed
             
         except Exception as e:
             logger.error(f"Netflix standart doğrulama hatası: {str(e)}")
@@ -550,17 +1028,7 @@ class VideoEditor:
                         end_total += offset_fix
                     
                     # Zaman formatına çevir
-                    start_h = int(start_total // 3600)
-                    start_m = int((start_total % 3600) // 60)
-                    start_s = int(start_total % 60)
-                    start_ms = int((start_total % 1) * 1000)
-                    
-                    end_h = int(end_total // 3600)
-                    end_m = int((end_total % 3600) // 60)
-                    end_s = int(end_total % 60)
-                    end_ms = int((end_total % 1) * 1000)
-                    
-                    return f"{start_h:02d}:{start_m:02d}:{start_s:02d},{start_ms:03d} --> {end_h:02d}:{end_m:02d}:{end_s:02d},{end_ms:03d}"
+                    return f"{format_srt_time(start_total)} --> {format_srt_time(end_total)}"
                 
                 content = re.sub(time_pattern, adjust_time_netflix, content)
             
@@ -584,59 +1052,53 @@ class VideoEditor:
             return subtitle_path
     
     def _calculate_smart_offset(self, audio_path, subtitle_path):
-        """Whisper tabanlı profesyonel ses tanıma ile akıllı offset hesaplama"""
+        """Ses aktivitesi ile altyazı zarfının FFT çapraz korelasyonundan akıllı offset hesaplama
+        
+        Tüm altyazı aralıkları birlikte kullanılır; ASR modeli gerekmez. Güven
+        düşükse ilk konuşma ile ilk altyazı başlangıcı arasındaki fark kullanılır.
+        """
         try:
-            logger.info(f"Whisper ile ses tanıma başlıyor: {audio_path}")
-            
-            # Whisper ile ses dosyasını analiz et
-            import whisper_timestamped as whisper
-            
-            # Küçük model kullan (hızlı)
-            model = whisper.load_model("base")
+            logger.info(f"Çapraz korelasyon ile offset hesaplanıyor: {audio_path}")
             
-            # Ses dosyasını analiz et
-            result = whisper.transcribe(model, audio_path, language="tr")
-            
-            if not result or 'segments' not in result:
-                logger.warning("Whisper analizi başarısız")
+            # Altyazı aralıklarını oku
+            track = SubtitleTrack.read(subtitle_path)
+            if not len(track):
                 return 0.0
             
-            # İlk konuşma segmentini bul
-            first_speech_start = None
-            for segment in result['segments']:
-                if segment.get('start') is not None:
-                    first_speech_start = segment['start']
-                    break
+            starts = track.starts
+            ends = track.ends
             
-            if first_speech_start is None:
-                logger.warning("İlk konuşma segmenti bulunamadı")
+            # Ses aktivitesi zarfı (VAD ile aynı RMS kareleri)
+            rms, audio_duration = stream_frame_rms(audio_path)
+            if len(rms) == 0:
                 return 0.0
             
-            # Altyazı dosyasından ilk altyazının başlangıcını al
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            import re
-            time_pattern = r'(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})'
-            times = re.findall(time_pattern, content)
-            
-            if not times:
-                return 0.0
+            rms_threshold = np.percentile(rms, 30)
+            activity = (rms > rms_threshold).astype(np.float64)
             
-            first_subtitle_start = (int(times[0][0]) * 3600 + 
-                                  int(times[0][1]) * 60 + 
-                                  int(times[0][2]) + 
-                                  int(times[0][3]) / 1000)
+            # Altyazı zarfı aynı kare ızgarasında, altyazıların sonuna kadar
+            frame_rate = DEFAULT_SAMPLE_RATE / DEFAULT_HOP_LENGTH
+            frame_count = max(len(rms), int(np.ceil(ends.max() * frame_rate)) + 1)
+            frame_times = (np.arange(frame_count) * DEFAULT_HOP_LENGTH + DEFAULT_FRAME_LENGTH / 2) / DEFAULT_SAMPLE_RATE
+            expected = cue_activity_envelope(starts, ends, frame_times)
             
-            # Offset hesapla
-            offset = first_speech_start - first_subtitle_start
+            offset, confidence = estimate_offset(activity, expected, frame_rate, self.max_subtitle_offset)
+            logger.info(f"Çapraz korelasyon: Offset {offset:.3f}s, güven {confidence:.2f}")
             
-            logger.info(f"Whisper analizi: İlk konuşma {first_speech_start:.2f}s, İlk altyazı {first_subtitle_start:.2f}s, Offset: {offset:.2f}s")
+            if confidence < self.min_offset_confidence:
+                # Düşük güven: ilk konuşma segmenti ile ilk altyazıyı eşle
+                speech_segments = detect_speech_segments(rms, rms_threshold, total_duration=audio_duration)
+                if not speech_segments:
+                    logger.warning("İlk konuşma segmenti bulunamadı")
+                    return 0.0
+                
+                offset = speech_segments[0][0] - float(starts.min())
+                logger.info(f"Düşük güven, ilk konuşma ({speech_segments[0][0]:.2f}s) ile ilk altyazı eşlendi: Offset {offset:.2f}s")
             
             return offset
             
         except Exception as e:
-            logger.error(f"Whisper offset hesaplama hatası: {str(e)}")
+            logger.error(f"Offset hesaplama hatası: {str(e)}")
             return 0.0
     
     def _apply_netflix_formatting(self, content):
@@ -676,48 +1138,19 @@ class VideoEditor:
             logger.info(f"Aeneas benzeri forced alignment başlıyor: {audio_path}")
             
             # Gerekli kütüphaneleri import et
-            import librosa
-            import numpy as np
-            from scipy.signal import correlate
             import re
              
-            # Ses dosyasını yükle
-            audio, sr = librosa.load(audio_path, sr=16000)
-            
-            # Ses özelliklerini çıkar (MFCC)
-            mfcc_features = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            
             # Ses aktivitesi tespiti (Voice Activity Detection)
-            frame_length = 2048
-            hop_length = 512
-            
-            # RMS enerji hesapla
-            rms = librosa.feature.rms(y=audio, frame_length=frame_length, hop_length=hop_length)[0]
+            # RMS enerji ses blok blok çözülerek hesaplanır (ses tamamı belleğe alınmaz)
+            rms, audio_duration = stream_frame_rms(audio_path)
             
             # Ses aktivitesi eşiği
-            rms_threshold = np.percentile(rms, 30)  # Alt %30'luk dilim sessizlik
+            rms_threshold = np.percentile(rms, 30) if len(rms) else 0.0  # Alt %30'luk dilim sessizlik
             
-            # Ses segmentlerini tespit et
-            speech_segments = []
-            in_speech = False
-            segment_start = 0
-            
-            for i, energy in enumerate(rms):
-                time_pos = librosa.frames_to_time(i, sr=sr, hop_length=hop_length)
-                
-                if energy > rms_threshold and not in_speech:
-                    # Konuşma başlangıcı
-                    segment_start = time_pos
-                    in_speech = True
-                elif energy <= rms_threshold and in_speech:
-                    # Konuşma bitişi
-                    if time_pos - segment_start > 0.5:  # Minimum 0.5 saniye
-                        speech_segments.append((segment_start, time_pos))
-                    in_speech = False
-            
-            # Son segment kontrolü
-            if in_speech:
-                speech_segments.append((segment_start, len(audio) / sr))
+            # Ses segmentlerini tespit et (Minimum 0.5 saniye)
+            speech_segments = detect_speech_segments(
+                rms, rms_threshold, min_duration=0.5, total_duration=audio_duration
+            )
             
             logger.info(f"Tespit edilen konuşma segmentleri: {len(speech_segments)}")
             
@@ -771,17 +1204,7 @@ class VideoEditor:
                 # Hizalanmış altyazıları oluştur
                 for i, (text, (start_time, end_time)) in enumerate(zip(subtitle_texts, aligned_segments)):
                     # SRT formatına çevir
-                    start_h = int(start_time // 3600)
-                    start_m = int((start_time % 3600) // 60)
-                    start_s = int(start_time % 60)
-                    start_ms = int((start_time % 1) * 1000)
-                    
-                    end_h = int(end_time // 3600)
-                    end_m = int((end_time % 3600) // 60)
-                    end_s = int(end_time % 60)
-                    end_ms = int((end_time % 1) * 1000)
-                    
-                    time_str = f"{start_h:02d}:{start_m:02d}:{start_s:02d},{start_ms:03d} --> {end_h:02d}:{end_m:02d}:{end_s:02d},{end_ms:03d}"
+                    time_str = f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}"
                     
                     aligned_subtitles.append(f"{i+1}\n{time_str}\n{text}")
             
@@ -800,22 +1223,42 @@ class VideoEditor:
             logger.error(f"Aeneas benzeri forced alignment hatası: {str(e)}")
             return False
      
-    def _whisper_based_sync(self, audio_path, subtitle_path, output_path):
-         """Whisper tabanlı tam profesyonel senkronizasyon"""
+    def _whisper_based_sync(self, audio_path, subtitle_path, output_path, timing=None):
+         """Whisper tabanlı tam profesyonel senkronizasyon
+
+         TTS zamanlamasında (TimingTrack ya da dosya yolu) kelime hizalaması varsa
+         ikinci bir ASR geçişi yapılmaz.
+         """
          try:
-             logger.info(f"Whisper ile tam senkronizasyon başlıyor: {audio_path}")
-             
-             import whisper_timestamped as whisper
+             whisper_words = self._load_tts_word_timings(timing) if timing is not None else []
              
-             # Orta seviye model kullan (daha iyi doğruluk)
-             model = whisper.load_model("small")
-             
-             # Ses dosyasını analiz et
-             result = whisper.transcribe(model, audio_path, language="tr", word_timestamps=True)
-             
-             if not result or 'segments' not in result:
-                 logger.error("Whisper transkripsiyon başarısız")
-                 return False
+             if whisper_words:
+                 logger.info("TTS kelime zamanlamaları kullanılıyor, Whisper atlanıyor")
+             else:
+                 logger.info(f"Whisper ile tam senkronizasyon başlıyor: {audio_path}")
+                 
+                 import whisper_timestamped as whisper
+                 
+                 # Orta seviye model kullan (daha iyi doğruluk)
+                 model = whisper.load_model("small")
+                 
+                 # Ses dosyasını analiz et
+                 result = whisper.transcribe(model, audio_path, language="tr", word_timestamps=True)
+                 
+                 if not result or 'segments' not in result:
+                     logger.error("Whisper transkripsiyon başarısız")
+                     return False
+                 
+                 # Whisper kelimelerini topla
+                 for segment in result['segments']:
+                     if 'words' in segment:
+                         for word in segment['words']:
+                             if word.get('start') is not None and word.get('end') is not None:
+                                 whisper_words.append({
+                                     'text': word['text'].strip(),
+                                     'start': word['start'],
+                                     'end': word['end']
+                                 })
              
              # Orijinal altyazıları oku
              with open(subtitle_path, 'r', encoding='utf-8') as f:
@@ -826,22 +1269,10 @@ class VideoEditor:
              subtitle_blocks = re.split(r'\n\s*\n', subtitle_content.strip())
              
              new_subtitles = []
-             whisper_words = []
              
-             # Whisper kelimelerini topla
-             for segment in result['segments']:
-                 if 'words' in segment:
-                     for word in segment['words']:
-                         if word.get('start') is not None and word.get('end') is not None:
-                             whisper_words.append({
-                                 'text': word['text'].strip(),
-                                 'start': word['start'],
-                                 'end': word['end']
-                             })
+             logger.info(f"Hizalama için {len(whisper_words)} kelime kullanılıyor")
              
-             logger.info(f"Whisper {len(whisper_words)} kelime tespit etti")
-             
-             # Her altyazı bloğunu Whisper kelimelerine hizala
+             cues = []
              for i, block in enumerate(subtitle_blocks):
                  if not block.strip():
                      continue
@@ -850,31 +1281,26 @@ class VideoEditor:
                  if len(lines) < 3:
                      continue
                  
-                 subtitle_number = lines[0]
-                 subtitle_text = ' '.join(lines[2:]).strip()
-                 
-                 # Bu altyazı metnini Whisper kelimelerine hizala
-                 aligned_times = self._align_subtitle_to_whisper(subtitle_text, whisper_words)
-                 
+                 cues.append((i, ' '.join(lines[2:]).strip()))
+             
+             # Tüm altyazı metnini tüm kelime akışına tek geçişte, sıralı hizala
+             alignments = align_cues_to_words([text for _, text in cues], whisper_words)
+             
+             confidences = []
+             for (i, subtitle_text), aligned_times in zip(cues, alignments):
                  if aligned_times:
                      start_time = aligned_times['start']
                      end_time = aligned_times['end']
+                     confidences.append(aligned_times['confidence'])
                      
                      # SRT formatına çevir
-                     start_h = int(start_time // 3600)
-                     start_m = int((start_time % 3600) // 60)
-                     start_s = int(start_time % 60)
-                     start_ms = int((start_time % 1) * 1000)
-                     
-                     end_h = int(end_time // 3600)
-                     end_m = int((end_time % 3600) // 60)
-                     end_s = int(end_time % 60)
-                     end_ms = int((end_time % 1) * 1000)
-                     
-                     time_str = f"{start_h:02d}:{start_m:02d}:{start_s:02d},{start_ms:03d} --> {end_h:02d}:{end_m:02d}:{end_s:02d},{end_ms:03d}"
+                     time_str = f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}"
                      
                      new_subtitles.append(f"{i+1}\n{time_str}\n{subtitle_text}")
              
+             if confidences:
+                 logger.info(f"Ortalama hizalama güveni: {sum(confidences) / len(confidences):.2f}")
+             
              # Yeni altyazıları kaydet
              if new_subtitles:
                  with open(output_path, 'w', encoding='utf-8') as f:
@@ -890,50 +1316,58 @@ class VideoEditor:
              logger.error(f"Whisper senkronizasyon hatası: {str(e)}")
              return False
      
-    def _align_subtitle_to_whisper(self, subtitle_text, whisper_words):
-         """Altyazı metnini Whisper kelimelerine hizala"""
+    def _sync_subtitles_to_word_timing(self, audio_data, subtitle_path):
+         """Altyazıları ses paketinin kelime zamanlamalarına hizala; kullanılacak altyazı yolunu döndür
+         
+         Kelime zamanlaması yoksa (ör. gTTS) Whisper'a düşülmez, özgün altyazı kullanılır.
+         """
+         timing = audio_data.get('timing')
+         if timing is None:
+             timing = audio_data.get('timing_path')
+         if timing is None or not audio_data.get('has_word_timing'):
+             logger.info("Kelime zamanlaması yok, altyazılar olduğu gibi kullanılıyor")
+             return subtitle_path
+         
+         root, ext = os.path.splitext(subtitle_path)
+         synced_path = f"{root}_words{ext}"
+         if self._whisper_based_sync(audio_data['path'], subtitle_path, synced_path, timing=timing):
+             return synced_path
+         
+         logger.warning("Kelime zamanlamasıyla hizalama başarısız, özgün altyazı kullanılıyor")
+         return subtitle_path
+     
+    def _load_tts_word_timings(self, timing):
+         """AudioSegmenter zamanlamasından kelime zamanlamalarını al"""
          try:
-             import difflib
-             
-             # Altyazı kelimelerini temizle
-             subtitle_words = subtitle_text.lower().split()
-             
-             best_match_start = None
-             best_match_end = None
-             best_ratio = 0
-             
-             # Sliding window ile en iyi eşleşmeyi bul
-             for i in range(len(whisper_words) - len(subtitle_words) + 1):
-                 window_words = whisper_words[i:i + len(subtitle_words)]
-                 window_text = ' '.join([w['text'].lower() for w in window_words])
-                 
-                 ratio = difflib.SequenceMatcher(None, ' '.join(subtitle_words), window_text).ratio()
-                 
-                 if ratio > best_ratio and ratio > 0.6:  # Minimum %60 benzerlik
-                     best_ratio = ratio
-                     best_match_start = window_words[0]['start']
-                     best_match_end = window_words[-1]['end']
-             
-             if best_match_start is not None:
-                 return {
-                     'start': best_match_start,
-                     'end': best_match_end,
-                     'confidence': best_ratio
-                 }
-             
-             return None
+             if not isinstance(timing, TimingTrack):
+                 timing = TimingTrack.load(timing)
+             return timing.words()
              
          except Exception as e:
-             logger.error(f"Kelime hizalama hatası: {str(e)}")
-             return None
+             logger.warning(f"TTS kelime zamanlaması okunamadı: {str(e)}")
+             return []
      
-    def _dtw_enhanced_sync(self, audio_path, subtitle_path, output_path, audio_duration):
-         """DTW (Dynamic Time Warping) ile gelişmiş senkronizasyon"""
+    def _dtw_enhanced_sync(self, audio_path, subtitle_path, output_path, audio_duration, reference_audio_path=None):
+         """DTW (Dynamic Time Warping) ile gelişmiş senkronizasyon
+         
+         Altyazı zamanları reference_audio_path (altyazının üretildiği TTS sesi)
+         zaman çizelgesindedir; referans ve hedef sesin MFCC özellikleri arasındaki
+         DTW yolu ile hedef sese taşınır. ASR modeli gerekmez.
+         """
          try:
              logger.info(f"DTW ile gelişmiş senkronizasyon başlıyor: {audio_path}")
              
-             # Önce Whisper offset hesapla
-             offset = self._calculate_smart_offset(audio_path, subtitle_path)
+             if reference_audio_path:
+                 # Referans -> hedef zaman eşlemesi (monoton)
+                 reference_times, target_times = align_audio(reference_audio_path, audio_path)
+                 remap_time = lambda t: float(np.interp(t, reference_times, target_times))
+                 sync_method = "DTW yolu"
+             else:
+                 # Referans ses yoksa yalnızca global offset uygulanabilir
+                 logger.warning("DTW için referans ses verilmedi, global offset kullanılıyor")
+                 offset = self._calculate_smart_offset(audio_path, subtitle_path)
+                 remap_time = lambda t: t + offset
+                 sync_method = f"offset {offset:.2f}s"
              
              # Orijinal altyazıları oku
              with open(subtitle_path, 'r', encoding='utf-8') as f:
@@ -956,27 +1390,18 @@ class VideoEditor:
                                int(last_time[6]) + 
                                int(last_time[7]) / 1000)
              
-             logger.info(f"DTW analizi: Altyazı süresi {last_end_seconds:.2f}s, Ses süresi {audio_duration:.2f}s, Offset {offset:.2f}s")
+             logger.info(f"DTW analizi: Altyazı süresi {last_end_seconds:.2f}s, Ses süresi {audio_duration:.2f}s, Eşleme: {sync_method}")
              
-             # DTW tabanlı adaptif senkronizasyon
+             # DTW tabanlı senkronizasyon
              def dtw_adjust_time(match):
                  start_h, start_m, start_s, start_ms, end_h, end_m, end_s, end_ms = match.groups()
                  
                  start_total = int(start_h) * 3600 + int(start_m) * 60 + int(start_s) + int(start_ms) / 1000
                  end_total = int(end_h) * 3600 + int(end_m) * 60 + int(end_s) + int(end_ms) / 1000
                  
-                 # Offset uygula
-                 start_total += offset
-                 end_total += offset
-                 
-                 # DTW tabanlı adaptif ölçekleme
-                 if abs(last_end_seconds - audio_duration) > 5:  # 5 saniye fark varsa
-                     # Doğrusal olmayan ölçekleme (başlangıçta az, sonda çok)
-                     progress = start_total / last_end_seconds if last_end_seconds > 0 else 0
-                     scale_factor = 1 + (audio_duration / last_end_seconds - 1) * (progress ** 1.5)
-                     
-                     start_total *= scale_factor
-                     end_total *= scale_factor
+                 # Referans zamanlarını hedef sese taşı
+                 start_total = remap_time(start_total)
+                 end_total = remap_time(end_total)
                  
                  # Netflix standartları uygula
                  duration = end_total - start_total
@@ -992,17 +1417,7 @@ class VideoEditor:
                      end_total += offset_fix
                  
                  # Zaman formatına çevir
-                 start_h = int(start_total // 3600)
-                 start_m = int((start_total % 3600) // 60)
-                 start_s = int(start_total % 60)
-                 start_ms = int((start_total % 1) * 1000)
-                 
-                 end_h = int(end_total // 3600)
-                 end_m = int((end_total % 3600) // 60)
-                 end_s = int(end_total % 60)
-                 end_ms = int((end_total % 1) * 1000)
-                 
-                 return f"{start_h:02d}:{start_m:02d}:{start_s:02d},{start_ms:03d} --> {end_h:02d}:{end_m:02d}:{end_s:02d},{end_ms:03d}"
+                 return f"{format_srt_time(start_total)} --> {format_srt_time(end_total)}"
              
              # DTW senkronizasyonu uygula
              content = re.sub(time_pattern, dtw_adjust_time, content)
@@ -1029,22 +1444,15 @@ class VideoEditor:
     def _manual_subtitle_sync(self, subtitle_path, audio_duration):
         """Manuel altyazı senkronizasyon yöntemi (fallback)"""
         try:
-            import srt
-            from datetime import timedelta
-            
             # Orijinal altyazı dosyasını oku
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                subtitle_content = f.read()
+            track = SubtitleTrack.read(subtitle_path)
             
-            # SRT formatını parse et
-            subtitles = list(srt.parse(subtitle_content))
-            
-            if not subtitles:
+            if not len(track):
                 logger.warning("Altyazı dosyası boş")
                 return subtitle_path
             
             # Orijinal toplam süreyi hesapla
-            original_duration = subtitles[-1].end.total_seconds()
+            original_duration = float(track.ends[-1])
             
             logger.info(f"Orijinal altyazı süresi: {original_duration} saniye")
             logger.info(f"Hedef ses süresi: {audio_duration} saniye")
@@ -1058,31 +1466,12 @@ class VideoEditor:
             sync_ratio = audio_duration / original_duration
             logger.info(f"Senkronizasyon oranı: {sync_ratio}")
             
-            # Her altyazı segmentini yeniden zamanla
-            synced_subtitles = []
-            for subtitle in subtitles:
-                # Başlangıç ve bitiş zamanlarını oranla
-                new_start_seconds = subtitle.start.total_seconds() * sync_ratio
-                new_end_seconds = subtitle.end.total_seconds() * sync_ratio
-                
-                # Yeni zaman damgalarını oluştur
-                new_start = timedelta(seconds=new_start_seconds)
-                new_end = timedelta(seconds=new_end_seconds)
-                
-                # Yeni altyazı segmenti oluştur
-                synced_subtitle = srt.Subtitle(
-                    index=subtitle.index,
-                    start=new_start,
-                    end=new_end,
-                    content=subtitle.content
-                )
-                synced_subtitles.append(synced_subtitle)
+            # Tüm başlangıç ve bitiş zamanlarını tek seferde oranla
+            synced_track = track.with_times(track.starts * sync_ratio, track.ends * sync_ratio)
             
             # Senkronize edilmiş altyazı dosyasını kaydet
             synced_subtitle_path = subtitle_path.replace('.srt', '_synced.srt')
-            
-            with open(synced_subtitle_path, 'w', encoding='utf-8') as f:
-                f.write(srt.compose(synced_subtitles))
+            synced_track.write(synced_subtitle_path)
             
             logger.info(f"Manuel senkronize altyazı dosyası oluşturuldu: {synced_subtitle_path}")
             return synced_subtitle_path
@@ -1091,16 +1480,96 @@ class VideoEditor:
             logger.error(f"Manuel altyazı senkronizasyon hatası: {str(e)}")
             return subtitle_path
     
+    def cut_video(self, video_path, keep_ranges, output_path):
+        """Yalnızca keep_ranges (saniye çiftleri) kalacak şekilde smart render ile kes
+        
+        Tamamen tutulan GOP'lar stream copy ile alınır; yalnızca kesim
+        noktalarındaki kısmi GOP'lar kaynakla aynı parametrelerle kodlanır.
+        """
+        try:
+            logger.info(f"Video kesiliyor: {video_path} -> {output_path}")
+            self._reset_cancel()
+            SmartCutter().cut(video_path, keep_ranges, output_path, self._ffmpeg_runner(output_path))
+            logger.info(f"Video kesildi: {output_path}")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"Video kesme hatası: {str(e)}")
+            raise
+    
+    def remove_silence(self, video_path, output_path=None):
+        """Ses enerjisi eşiğin altında kalan bölümleri smart render ile çıkar"""
+        try:
+            output_path = output_path or video_path.replace('.mp4', '_processed.mp4')
+            
+            rms, audio_duration = stream_frame_rms(video_path)
+            threshold = 10 ** (self.silence_threshold_db / 20.0)
+            speech_segments = detect_speech_segments(rms, threshold, min_duration=0.0, total_duration=audio_duration)
+            if not speech_segments:
+                logger.warning("Konuşma bulunamadı, video kesilmeden kullanılıyor")
+                return video_path
+            
+            # Konuşma çevresine pay bırak; min süreden kısa sessizlikler kapanır (genişlet, birleştir, daralt)
+            segments = np.array(speech_segments)
+            half_gap = self.silence_min_seconds / 2.0
+            closed = merge_ranges(
+                np.column_stack((segments[:, 0] - self.silence_padding - half_gap,
+                                 segments[:, 1] + self.silence_padding + half_gap)),
+                audio_duration + half_gap
+            )
+            keep_ranges = merge_ranges(
+                np.column_stack((closed[:, 0] + half_gap, closed[:, 1] - half_gap)), audio_duration
+            )
+            # Baştaki genişletme 0'a kırpıldığından ilk aralık yeniden 0'dan başlatılır
+            keep_ranges[0, 0] = max(float(segments[0, 0]) - self.silence_padding, 0.0)
+            
+            removed = audio_duration - float((keep_ranges[:, 1] - keep_ranges[:, 0]).sum())
+            logger.info(f"Sessizlik: {len(keep_ranges)} aralık tutuluyor, {removed:.2f}s kesilecek")
+            if removed < self.silence_min_seconds:
+                return video_path
+            
+            return self.cut_video(video_path, keep_ranges, output_path)
+            
+        except Exception as e:
+            logger.error(f"Sessizlik kesme hatası: {str(e)}")
+            return video_path
+    
     def optimize_video_for_youtube(self, video_path):
-        """YouTube için video optimizasyonu"""
+        """YouTube için video optimizasyonu
+        
+        Dosya önce denetlenir; uyumluysa olduğu gibi döndürülür, yalnızca moov
+        kutusu sondaysa kopyalanarak yeniden mux edilir, yalnızca ses uyumsuzsa
+        video kopyalanıp ses kodlanır. Tam yeniden kodlama sadece video ya da
+        konteyner uyumsuzsa yapılır.
+        """
         try:
+            self._reset_cancel()
             optimized_path = video_path.replace('.mp4', '_optimized.mp4')
             
-            # YouTube önerilen ayarlar
-            (
-                ffmpeg
-                .input(video_path)
-                .output(
+            report = self.youtube_checker.check(video_path)
+            logger.info(f"YouTube uyumluluk denetimi ({report.action}): {report.summary()}")
+            
+            if report.action == 'none':
+                return video_path
+            
+            info = get_media_probe().probe(video_path)
+            stream = ffmpeg.input(video_path)
+            
+            if report.action == 'remux':
+                # Yeniden kodlama yok: akışlar kopyalanır, moov başa taşınır
+                out = stream.output(optimized_path, c='copy', movflags='faststart')
+            elif report.action == 'audio':
+                out = ffmpeg.output(
+                    stream.video, stream.audio, optimized_path,
+                    vcodec='copy',
+                    acodec='aac',
+                    audio_bitrate='128k',
+                    ar=info.sample_rate if info.sample_rate in YOUTUBE_SAMPLE_RATES else 48000,
+                    movflags='faststart'
+                )
+            else:
+                # YouTube önerilen ayarlar
+                out = stream.output(
                     optimized_path,
                     vcodec='libx264',
                     acodec='aac',
@@ -1111,12 +1580,10 @@ class VideoEditor:
                     video_bitrate='4000k',
                     audio_bitrate='128k'
                 )
-                .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True)
-            )
             
+            self._run_ffmpeg(out.overwrite_output(), optimized_path, info.duration)
             return optimized_path
             
         except Exception as e:
             logger.error(f"Video optimizasyon hatası: {str(e)}")
-            return video_path  # Hata durumunda orijinal dosyayı döndür
\ No newline at end of file
+            return video_path  # Hata durumunda orijinal dosyayı döndür
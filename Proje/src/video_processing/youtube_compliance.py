@@ -0,0 +1,143 @@
+import os
+import struct
+import logging
+import numpy as np
+from dataclasses import dataclass, field
+from ..media_probe import get_media_probe
+from .keyframe_index import get_keyframe_index
+
+logger = logging.getLogger(__name__)
+
+# YouTube yükleme önerileri (https://support.google.com/youtube/answer/1722171)
+YOUTUBE_VIDEO_CODECS = ('h264',)
+YOUTUBE_VIDEO_PROFILES = ('High', 'Main')
+YOUTUBE_PIX_FMTS = ('yuv420p', 'yuvj420p')
+YOUTUBE_AUDIO_CODECS = ('aac',)
+# YouTube 48/96 kHz önerir; 44.1 kHz de sorunsuz kabul edilir ve yeniden örneklemeye değmez
+YOUTUBE_SAMPLE_RATES = (44100, 48000, 96000)
+
+# Ölçülen bit hızı, sessiz ya da basit içerikte hedefin altında kalabilir (ffmpeg AAC)
+_AUDIO_BITRATE_TOLERANCE = 0.75
+
+
+def is_faststart(video_path):
+    """MP4 üst seviye kutularını okuyarak moov kutusunun mdat'tan önce olup olmadığını bul"""
+    file_size = os.path.getsize(video_path)
+    with open(video_path, 'rb') as f:
+        position = 0
+        while position + 8 <= file_size:
+            f.seek(position)
+            size, box_type = struct.unpack('>I4s', f.read(8))
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+            elif size == 0:
+                size = file_size - position
+
+            if box_type == b'moov':
+                return True
+            if box_type == b'mdat':
+                return False
+            if size < 8:
+                break
+            position += size
+    return False
+
+
+@dataclass
+class ComplianceReport:
+    """YouTube uyumluluk sonucu; sorunlar video, ses ve konteyner olarak ayrılır"""
+    path: str
+    video_issues: list = field(default_factory=list)
+    audio_issues: list = field(default_factory=list)
+    container_issues: list = field(default_factory=list)
+    faststart: bool = False
+
+    @property
+    def compliant(self):
+        return not (self.video_issues or self.audio_issues or self.container_issues) and self.faststart
+
+    @property
+    def action(self):
+        """Gereken en ucuz işlem: none, remux, audio (yalnızca ses kodlanır) ya da transcode"""
+        if self.video_issues or self.container_issues:
+            return 'transcode'
+        if self.audio_issues:
+            return 'audio'
+        if not self.faststart:
+            return 'remux'
+        return 'none'
+
+    def summary(self):
+        issues = self.video_issues + self.audio_issues + self.container_issues
+        if not self.faststart:
+            issues = issues + ['moov kutusu dosya sonunda']
+        return ', '.join(issues) if issues else 'uyumlu'
+
+
+class YouTubeComplianceChecker:
+    """Mevcut dosyanın YouTube önerilerine uyup uymadığını yeniden kodlamadan denetle"""
+
+    def __init__(self, max_gop_seconds=None, min_audio_bitrate=None):
+        # YouTube yarım saniyelik kapalı GOP önerir; libx264 varsayılanı (keyint=250)
+        # 25fps'te 10 saniyedir ve yükleme sonrası YouTube zaten yeniden kodlar
+        self.max_gop_seconds = max_gop_seconds or float(os.getenv('YOUTUBE_MAX_GOP_SECONDS', '10'))
+        self.min_audio_bitrate = min_audio_bitrate or int(os.getenv('YOUTUBE_MIN_AUDIO_BITRATE', '128000'))
+        self.media_probe = get_media_probe()
+
+    def check(self, video_path):
+        info = self.media_probe.probe(video_path)
+        report = ComplianceReport(path=video_path)
+
+        if 'mp4' not in info.format_name.split(',') and 'mov' not in info.format_name.split(','):
+            report.container_issues.append(f"konteyner {info.format_name}")
+            return report
+        report.faststart = is_faststart(video_path)
+
+        if not info.has_video:
+            report.video_issues.append("video akışı yok")
+        else:
+            self._check_video(info, report)
+            if not report.video_issues:
+                self._check_gop(video_path, info, report)
+
+        if not info.has_audio:
+            report.audio_issues.append("ses akışı yok")
+        else:
+            self._check_audio(info, report)
+
+        return report
+
+    def _check_video(self, info, report):
+        if info.video_codec not in YOUTUBE_VIDEO_CODECS:
+            report.video_issues.append(f"video codec {info.video_codec}")
+        if info.video_profile not in YOUTUBE_VIDEO_PROFILES:
+            report.video_issues.append(f"profil {info.video_profile}")
+        if info.pix_fmt not in YOUTUBE_PIX_FMTS:
+            report.video_issues.append(f"pix_fmt {info.pix_fmt}")
+
+        video_stream = next((s for s in info.streams if s.get('codec_type') == 'video'), {})
+        field_order = video_stream.get('field_order', 'progressive')
+        if field_order not in ('progressive', 'unknown'):
+            report.video_issues.append(f"geçmeli tarama ({field_order})")
+
+    def _check_gop(self, video_path, info, report):
+        keyframes = get_keyframe_index().keyframes(video_path)
+        if len(keyframes) == 0:
+            report.video_issues.append("anahtar kare bulunamadı")
+            return
+
+        intervals = np.diff(np.concatenate((keyframes, [info.duration])))
+        longest_gop = float(intervals.max()) if len(intervals) else 0.0
+        if longest_gop > self.max_gop_seconds:
+            report.video_issues.append(f"GOP {longest_gop:.1f}s > {self.max_gop_seconds:.1f}s")
+
+    def _check_audio(self, info, report):
+        if info.audio_codec not in YOUTUBE_AUDIO_CODECS:
+            report.audio_issues.append(f"ses codec {info.audio_codec}")
+        if info.sample_rate not in YOUTUBE_SAMPLE_RATES:
+            report.audio_issues.append(f"örnekleme hızı {info.sample_rate}")
+        if info.channels not in (1, 2, 6):
+            report.audio_issues.append(f"kanal sayısı {info.channels}")
+        # Bit hızı bilinmiyorsa (0) ses yeniden kodlanmaz
+        if info.audio_bit_rate and info.audio_bit_rate < self.min_audio_bitrate * _AUDIO_BITRATE_TOLERANCE:
+            report.audio_issues.append(f"ses bit hızı {info.audio_bit_rate // 1000}k")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Döngülü Render Bellek Testi
+Kaynak videonun ses kaydına göre döngüye alındığı render'da ffmpeg'in en yüksek
+bellek kullanımının (peak RSS) ne döngü sayısıyla ne de kaynak uzunluğuyla
+büyümediğini doğrular. Kaynak girdi düzeyinde (-stream_loop) döngüye alınır;
+eski loop filtresi kaynağın tüm karelerini bellekte tutuyordu.
+
+Kullanım (Proje klasöründen):
+    python test_looped_render_memory.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import resource
+import subprocess
+
+# (kaynak video süresi, ses süresi) saniye; ilk durum referanstır
+BASELINE_CASE = (2, 20)
+TEST_CASES = [
+    (2, 240),   # Çok sayıda döngü
+    (20, 60)    # Uzun kaynak (loop filtresi tüm kaynağı bellekte tutardı)
+]
+# Referans render'a göre izin verilen bellek artışı
+MAX_GROWTH = 1.25
+
+
+def _ffmpeg(*args):
+    subprocess.run(['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', *args], check=True)
+
+
+def _input_paths(work_dir, source_seconds, audio_seconds):
+    return (os.path.join(work_dir, f'source_{source_seconds}.mp4'),
+            os.path.join(work_dir, f'audio_{audio_seconds}.m4a'),
+            os.path.join(work_dir, 'subtitle.srt'))
+
+
+def create_inputs(work_dir, source_seconds, audio_seconds):
+    """720p kaynak video, istenen uzunlukta ses ve tek altyazılı SRT oluştur"""
+    video_path, audio_path, subtitle_path = _input_paths(work_dir, source_seconds, audio_seconds)
+    if not os.path.exists(video_path):
+        _ffmpeg('-f', 'lavfi', '-i', 'testsrc2=size=1280x720:rate=25', '-t', str(source_seconds),
+                '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', video_path)
+    if not os.path.exists(audio_path):
+        _ffmpeg('-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=48000', '-t', str(audio_seconds),
+                '-c:a', 'aac', '-b:a', '128k', audio_path)
+    with open(subtitle_path, 'w', encoding='utf-8') as f:
+        f.write("1\n00:00:00,500 --> 00:00:03,000\nDöngü testi\n")
+
+
+def render(source_seconds, audio_seconds, work_dir):
+    """Alt süreçte render yap; bu sürecin çocuklarının (ffmpeg) peak RSS değerini yazdır"""
+    from src.video_processing.video_editor import VideoEditor
+
+    video_path, audio_path, subtitle_path = _input_paths(work_dir, source_seconds, audio_seconds)
+    editor = VideoEditor()
+    editor._create_video_with_audio_and_subtitles(
+        video_path, audio_path, subtitle_path, os.path.join(work_dir, 'output.mp4'),
+        audio_prenormalized=True, allow_segmented=False
+    )
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir; oran için birim önemli değildir
+    print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def measure(source_seconds, audio_seconds, work_dir):
+    """Her ölçüm ayrı süreçte yapılır; RUSAGE_CHILDREN önceki render'lardan ve girdi üretiminden etkilenmez"""
+    create_inputs(work_dir, source_seconds, audio_seconds)
+    env = dict(os.environ, VIDEO_QUALITY='720p', RENDER_PROFILE='ultrafast', SEGMENTED_RENDER='false')
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--render', str(source_seconds), str(audio_seconds), work_dir],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-1000:])
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🚀 Döngülü render bellek testi başlıyor...")
+    work_dir = tempfile.mkdtemp(prefix='loop_memory_')
+    failures = 0
+    try:
+        baseline_peak = measure(*BASELINE_CASE, work_dir)
+        print(f"   Referans: {BASELINE_CASE[0]}s kaynak, {BASELINE_CASE[1]}s ses -> peak RSS {baseline_peak}")
+
+        for source_seconds, audio_seconds in TEST_CASES:
+            peak = measure(source_seconds, audio_seconds, work_dir)
+            growth = peak / baseline_peak
+            status = "✅" if growth <= MAX_GROWTH else "❌"
+            print(f"{status} {source_seconds}s kaynak, {audio_seconds}s ses -> peak RSS {peak} ({growth:.2f}x)")
+            if growth > MAX_GROWTH:
+                failures += 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if failures:
+        print(f"\n❌ Bellek kullanımı sınırı ({MAX_GROWTH}x) aşıldı")
+        sys.exit(1)
+    print(f"\n🎉 Bellek kullanımı döngü sayısı ve kaynak uzunluğundan bağımsız (sınır {MAX_GROWTH}x)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == '--render':
+        render(int(sys.argv[2]), int(sys.argv[3]), sys.argv[4])
+    else:
+        main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Altyazı G/Ç Testi
+SubtitleTrack'in SRT ve WebVTT (saat alanı olan ve olmayan) zaman kodlarını
+doğru ayrıştırdığını, SRT/VTT/ASS yazımının geri okunduğunda aynı zamanları
+verdiğini ve büyük dosyaların doğrusal sürede ayrıştırıldığını doğrular.
+
+Kullanım (Proje klasöründen):
+    python test_subtitle_io.py
+"""
+
+import sys
+import time
+
+from src.subtitles.subtitle_io import SubtitleTrack, parse_timestamp, format_srt_time
+
+# Doğrusallık ölçümü için altyazı sayıları; süre oranı sayı oranını fazla aşmamalı
+BENCHMARK_SIZES = (20000, 80000)
+MAX_TIME_RATIO_SLACK = 1.5
+
+
+def _check(label, condition, failures):
+    print(f"{'✅' if condition else '❌'} {label}")
+    if not condition:
+        failures.append(label)
+
+
+def _synthetic_srt(count):
+    """count adet, 1.5 saniye aralıklı SRT bloğu üret"""
+    starts = [i * 1.5 for i in range(count)]
+    return SubtitleTrack.from_cues(starts, [start + 1.2 for start in starts],
+                                   [f"Satır {i + 1}\nikinci satır" for i in range(count)]).to_srt()
+
+
+def check_parsing(failures):
+    srt = ("1\n00:00:01,000 --> 00:00:02,500\nMerhaba\n\n"
+           "2\n01:02:03,004 --> 01:02:04,000\nİki satırlı\naltyazı\n")
+    track = SubtitleTrack.parse(srt)
+    _check("SRT: iki blok okundu", len(track) == 2, failures)
+    _check("SRT: zamanlar milisaniye hassasiyetinde",
+           track.start_ms.tolist() == [1000, 3723004] and track.end_ms.tolist() == [2500, 3724000], failures)
+    _check("SRT: çok satırlı metin korundu", track.text(1) == "İki satırlı\naltyazı", failures)
+
+    vtt = ("WEBVTT\n\n"
+           "00:01.000 --> 00:02.500 align:start\nSaatsiz\n\n"
+           "giris\n00:03.250 --> 00:04.000\nKimlikli blok\n\n"
+           "01:00:00.000 --> 01:00:01.000\nSaatli\n")
+    track = SubtitleTrack.parse(vtt)
+    _check("VTT: saat alanı olmayan bloklar okundu", len(track) == 3, failures)
+    _check("VTT: zamanlar doğru",
+           track.start_ms.tolist() == [1000, 3250, 3600000] and track.end_ms.tolist() == [2500, 4000, 3601000],
+           failures)
+    _check("parse_timestamp: saatli ve saatsiz biçim",
+           parse_timestamp('00:01.250') == 1250 and parse_timestamp('01:00:01,000') == 3601000, failures)
+
+    broken = SubtitleTrack.parse("1\n00:00:01 --> 00:00:02,000\nBozuk\n\n2\n00:00:03,000 --> 00:00:04,000\nSağlam\n")
+    _check("Bozuk zaman kodlu blok atlandı, diğeri okundu", broken.texts() == ["Sağlam"], failures)
+
+
+def check_round_trip(failures):
+    track = SubtitleTrack.parse(_synthetic_srt(50))
+    for label, content in (("SRT", track.to_srt()), ("VTT", track.to_vtt())):
+        again = SubtitleTrack.parse(content)
+        _check(f"{label} yaz/oku: zamanlar ve metinler aynı",
+               again.start_ms.tolist() == track.start_ms.tolist()
+               and again.end_ms.tolist() == track.end_ms.tolist()
+               and again.texts() == track.texts(), failures)
+
+    ass = track.to_ass()
+    _check("ASS: her altyazı için Dialogue satırı", ass.count('\nDialogue: ') == len(track), failures)
+    _check("format_srt_time yuvarlama", format_srt_time(3723.0046) == '01:02:03,005', failures)
+
+
+def check_linear_time(failures):
+    timings = []
+    for count in BENCHMARK_SIZES:
+        content = _synthetic_srt(count)
+        started = time.perf_counter()
+        track = SubtitleTrack.parse(content)
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        print(f"   {count} altyazı: {elapsed * 1000:.1f} ms ({len(content) / elapsed / 1e6:.1f} MB/s)")
+        if len(track) != count:
+            _check(f"{count} altyazının tamamı okundu", False, failures)
+
+    size_ratio = BENCHMARK_SIZES[1] / BENCHMARK_SIZES[0]
+    time_ratio = timings[1] / timings[0]
+    _check(f"Doğrusal süre: {size_ratio:.0f}x veri -> {time_ratio:.2f}x süre",
+           time_ratio <= size_ratio * MAX_TIME_RATIO_SLACK, failures)
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🚀 Altyazı G/Ç testi başlıyor...")
+    failures = []
+    check_parsing(failures)
+    check_round_trip(failures)
+    check_linear_time(failures)
+
+    if failures:
+        print(f"\n❌ {len(failures)} kontrol başarısız")
+        sys.exit(1)
+    print("\n🎉 Tüm altyazı G/Ç kontrolleri başarılı")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ from datetime import datetime
 import logging
 import json
 import re
+import threading
+from collections import OrderedDict
 from mutagen import File as MutagenFile
 
 app = Flask(__name__)
@@ -43,21 +45,53 @@ def download_file(url, local_path):
         logger.error(f"Error downloading {url}: {str(e)}")
         return False
 
+# Probe cache keyed by (path, size, mtime); LRU-bounded since every request adds new temp files
+PROBE_CACHE_SIZE = 256
+_probe_cache = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
+def probe_media(file_path):
+    """Probe media file once with ffprobe and cache the result per (path, size, mtime)."""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _probe_cache_lock:
+        if key in _probe_cache:
+            _probe_cache.move_to_end(key)
+            return _probe_cache[key]
+
+    cmd = [
+        'ffprobe', '-v', 'error', '-show_format', '-show_streams',
+        '-of', 'json', file_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout)
+    with _probe_cache_lock:
+        _probe_cache[key] = probe
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    return probe
+
 def get_media_duration(file_path):
     """Get media file duration in seconds using ffprobe."""
     try:
-        cmd = [
-            'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1', file_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        duration = float(result.stdout.strip())
+        probe = probe_media(file_path)
+        duration = float(probe['format']['duration'])
         logger.info(f"Duration of {file_path}: {duration} seconds")
         return duration
     except Exception as e:
         logger.error(f"Error getting duration for {file_path}: {str(e)}")
         return None
 
+def is_mux_ready_audio(file_path):
+    """Check whether the audio is already AAC and can be copied into the MP4 output."""
+    try:
+        probe = probe_media(file_path)
+        audio_stream = next((s for s in probe['streams'] if s.get('codec_type') == 'audio'), None)
+        return audio_stream is not None and audio_stream.get('codec_name') == 'aac'
+    except Exception as e:
+        logger.warning(f"Could not inspect audio codec for {file_path}: {str(e)}")
+        return False
+
 def extract_audio_with_whisper(audio_path, language='tr'):
     """Extract transcript and SRT from audio using Whisper"""
     try:
@@ -105,9 +139,17 @@ def merge_video_audio_subtitle(video_path, audio_path, srt_path, output_path,
 
         cmd = ['ffmpeg', '-y', '-i', video_path, '-i', audio_path]
         
-        # Base filter complex for audio processing
-        audio_delay = f"{audio_offset_ms}ms" if audio_offset_ms != 0 else "0ms"
-        filter_complex = f"[1:a]volume={volume},adelay={audio_delay}[a_out];"
+        # Mux-ready AAC audio without volume/offset changes is stream-copied
+        copy_audio = is_mux_ready_audio(audio_path) and volume == 1.0 and audio_offset_ms == 0
+        
+        if copy_audio:
+            filter_complex = ""
+            audio_map = "1:a"
+        else:
+            # Base filter complex for audio processing
+            audio_delay = f"{audio_offset_ms}ms" if audio_offset_ms != 0 else "0ms"
+            filter_complex = f"[1:a]volume={volume},adelay={audio_delay}[a_out];"
+            audio_map = "[a_out]"
 
         # Video processing filters
         if audio_duration > video_duration:
@@ -129,7 +171,7 @@ def merge_video_audio_subtitle(video_path, audio_path, srt_path, output_path,
             video_map = "[v_out]"
 
         cmd.extend(['-filter_complex', filter_complex])
-        cmd.extend(['-map', video_map, '-map', '[a_out]'])
+        cmd.extend(['-map', video_map, '-map', audio_map])
 
         # Add soft subtitles if requested and not burning them
         if soft_subtitles and not burn_subtitles and srt_path:
@@ -139,15 +181,12 @@ def merge_video_audio_subtitle(video_path, audio_path, srt_path, output_path,
         cmd.extend(['-t', str(audio_duration)])
 
         # Output settings
-        cmd.extend([
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
-            '-c:a', 'aac',
-            '-b:a', '128k',
-            '-movflags', '+faststart',
-            output_path
-        ])
+        cmd.extend(['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'])
+        if copy_audio:
+            cmd.extend(['-c:a', 'copy'])
+        else:
+            cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+        cmd.extend(['-movflags', '+faststart', output_path])
 
         logger.info(f"FFmpeg command: {' '.join(cmd)}")
 
@@ -335,10 +374,11 @@ def create_subtitle_from_text(text, audio_url, output_path, language='tr'):
 
 def format_srt_time(seconds):
     """Format seconds to SRT time format (HH:MM:SS,mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millisecs = int((seconds % 1) * 1000)
+    # Round once to integer milliseconds so 1.9999 does not become 00:00:01,999
+    total_ms = max(int(round(seconds * 1000)), 0)
+    secs, millisecs = divmod(total_ms, 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millisecs:03d}"
 
 @app.route('/create_subtitle', methods=['POST'])